@@ -0,0 +1,35 @@
+"""
+Headless version of the DataStory_Baroque export pipeline.
+
+The notebook cells import their functions from these modules; the same code
+runs without Jupyter via ``python -m baroque_pipeline``:
+
+    python -m baroque_pipeline export --output-dir out/ --max-paintings 500
+    python -m baroque_pipeline bildindex --output-dir out/ --test-mode
+    python -m baroque_pipeline verify --output-dir out/
+
+Submodules are imported on first access, so ``import baroque_pipeline`` (and
+``--help``) stays fast; pandas, pyarrow and the network clients load only
+when a command needs them.
+"""
+
+import importlib
+
+__all__ = ['sparql', 'vocab', 'years', 'graph', 'coordinates', 'parquet', 'tables',
+           'stages', 'export', 'incremental', 'urlcheck', 'images', 'queries', 'bildindex', 'cli',
+           'run_parquet_export_pipeline', 'run_bildindex_pipeline', 'verify_parquet_database']
+
+# Entry points re-exported at package level -> defining submodule
+_ENTRY_POINTS = {
+    'run_parquet_export_pipeline': 'export',
+    'verify_parquet_database': 'export',
+    'run_bildindex_pipeline': 'bildindex',
+}
+
+
+def __getattr__(name):
+    if name in _ENTRY_POINTS:
+        return getattr(importlib.import_module(f'.{_ENTRY_POINTS[name]}', __name__), name)
+    if name in __all__:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
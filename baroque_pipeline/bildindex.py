@@ -0,0 +1,665 @@
+"""Bildindex der Kunst und Architektur: GND overlap with CbDD, collection and URL validation."""
+
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from . import parquet
+from .parquet import load_parquet_table, write_parquet_file
+from .sparql import BILDINDEX_FEED_URI, PREFIXES, run_sparql
+from .tables import split_multi_value
+from .urlcheck import URL_CHECK_CACHE_TTL, UrlCheckCache, iter_check_urls
+
+
+# =============================================================================
+# Step 6.2: Find Bildindex Overlaps via SPARQL
+# =============================================================================
+# Query which CbDD GNDs also exist in the Bildindex feed (n4c:E6161)
+
+
+def find_bildindex_overlapping_gnds(gnd_list, gnd_type='location', batch_size=50):
+    """
+    Check which GNDs from CbDD also exist in Bildindex.
+    
+    Args:
+        gnd_list: List of GND URIs to check
+        gnd_type: 'location' (buildings) or 'creator' (painters)
+        batch_size: Number of GNDs to check per query
+    
+    Returns:
+        Set of GNDs that exist in both CbDD and Bildindex
+    """
+    overlapping = set()
+    
+    # Property mapping
+    if gnd_type == 'location':
+        node_prop = 'cto:CTO_0001011'  # location node
+    else:  # creator
+        node_prop = 'cto:CTO_0001009'  # creator node
+    
+    total_batches = (len(gnd_list) + batch_size - 1) // batch_size
+    
+    for i in range(0, len(gnd_list), batch_size):
+        batch = gnd_list[i:i + batch_size]
+        batch_num = i // batch_size + 1
+        
+        # Format GNDs for VALUES clause
+        gnd_values = ' '.join(f'<{gnd}>' for gnd in batch)
+        
+        query = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?gnd
+        WHERE {{
+            VALUES ?gnd {{ {gnd_values} }}
+            {BILDINDEX_FEED_URI} schema:dataFeedElement ?feedItem .
+            ?feedItem schema:item ?item .
+            ?item {node_prop} ?node .
+            ?node ?pred ?gnd .
+        }}
+        """
+        
+        try:
+            df_result = run_sparql(query)
+            if not df_result.empty:
+                found_gnds = set(df_result['gnd'].tolist())
+                overlapping.update(found_gnds)
+        except Exception as e:
+            print(f"   ⚠ Error in batch {batch_num}: {e}")
+            continue
+        
+        if batch_num % 10 == 0:
+            print(f"   Progress: {batch_num}/{total_batches} batches, {len(overlapping)} overlaps found")
+    
+    return overlapping
+
+
+# =============================================================================
+# Step 6.3: Bildindex Data Collection Functions
+# =============================================================================
+# Tiered data collection from Bildindex using shared GNDs
+
+
+# Configuration
+BILDINDEX_TEST_MODE = False  # Set to False for full collection
+BILDINDEX_MAX_ITEMS = 1000 if BILDINDEX_TEST_MODE else 15000
+BILDINDEX_TIER1_RATIO = 0.3  # ~30% from building connections
+BILDINDEX_TIER2_RATIO = 0.7  # ~70% from painter connections
+
+BILDINDEX_URL_CACHE_NAME = "url_cache.sqlite"  # next to the bildindex_*.parquet files
+
+
+def get_url_cache_path() -> str:
+    """SQLite store of the URL validation results."""
+    return os.path.join(parquet.PARQUET_OUTPUT_DIR, f"{BILDINDEX_PARQUET_PREFIX}{BILDINDEX_URL_CACHE_NAME}")
+
+
+def validate_bildindex_url(url, timeout=10):
+    """
+    Validate a Bildindex URL with a HEAD request (see urlcheck.check_url).
+    Withdrawn objects redirect to the Bildindex start page and count as invalid.
+    Returns tuple: (url, is_valid, status_message)
+    """
+    if not url or pd.isna(url):
+        return (url, False, "Empty URL")
+    return tuple(next(iter_check_urls([url], timeout=timeout))[:3])
+
+def validate_urls_batch(urls, max_workers=5, delay=0.2, use_cache=True, cache_ttl=URL_CHECK_CACHE_TTL):
+    """
+    Validate multiple URLs concurrently, rate limited per host.
+
+    Args:
+        urls: URLs to check
+        max_workers: Concurrent requests per host
+        delay: Minimum seconds between two request starts on the same host
+        use_cache: Answer from / write to the SQLite store (get_url_cache_path());
+                   only new URLs and results older than ``cache_ttl`` are requested,
+                   the latter conditionally (ETag / Last-Modified)
+        cache_ttl: Seconds a stored result is used without revalidation
+    
+    Returns:
+        DataFrame with: url, is_valid, status, final_url, checked_at, source
+        ('cache' | 'revalidated' | 'network')
+    """
+    urls = [url for url in urls if url and not pd.isna(url)]
+    results = []
+    total = len(urls)
+    
+    print(f"🔍 Validating {total} URLs...")
+    if not total:
+        return pd.DataFrame(columns=['url', 'is_valid', 'status', 'final_url', 'checked_at', 'source'])
+    
+    cache = UrlCheckCache(get_url_cache_path(), ttl=cache_ttl) if use_cache else None
+    try:
+        for i, result in enumerate(iter_check_urls(urls, concurrency_per_host=max_workers,
+                                                   min_interval=delay, cache=cache), 1):
+            results.append({'url': result.url, 'is_valid': result.is_valid, 'status': result.status,
+                            'final_url': result.final_url, 'checked_at': result.checked_at,
+                            'source': result.source})
+            if i % 50 == 0 and result.source != 'cache':
+                print(f"   Progress: {i}/{total} ({100*i/total:.1f}%)")
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    df_results = pd.DataFrame(results)
+    df_results['checked_at'] = pd.to_datetime(df_results['checked_at'], unit='s')
+    valid_count = df_results['is_valid'].sum()
+    if use_cache:
+        sources = df_results['source'].value_counts()
+        print(f"   ⚡ {sources.get('cache', 0)} from cache, {sources.get('revalidated', 0)} unchanged (304), "
+              f"{sources.get('network', 0)} checked")
+    print(f"✅ Validation: {valid_count}/{total} valid URLs ({100*valid_count/total:.1f}%)")
+    
+    return df_results
+
+def fetch_bildindex_by_building_gnd(building_gnds, limit_per_building=50, total_limit=None):
+    """
+    Fetch Bildindex items located at buildings with given GNDs.
+    Uses pattern: locNode -> any predicate -> GND (discovered in prototype)
+    """
+    all_items = []
+    total_fetched = 0
+    
+    for i, gnd in enumerate(building_gnds, 1):
+        if total_limit and total_fetched >= total_limit:
+            break
+            
+        query = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?item ?label ?url ?creatorGnd ?creatorLabel ?iconclass
+        WHERE {{
+            n4c:E6161 schema:dataFeedElement ?feedItem .
+            ?feedItem schema:item ?item .
+            
+            # Location linked via any predicate to this GND
+            ?item cto:CTO_0001011 ?locNode .
+            ?locNode ?locPred <{gnd}> .
+            
+            OPTIONAL {{ ?item rdfs:label ?label }}
+            OPTIONAL {{ ?item nfdicore:NFDI_0001008 ?url }}
+            OPTIONAL {{ 
+                ?item cto:CTO_0001009 ?creatorNode .
+                ?creatorNode nfdicore:NFDI_0001006 ?creatorGnd .
+                OPTIONAL {{ ?creatorNode rdfs:label ?creatorLabel }}
+            }}
+            OPTIONAL {{ ?item cto:CTO_0001026 ?iconclass }}
+        }}
+        LIMIT {limit_per_building}
+        """
+        
+        try:
+            df_result = run_sparql(query)
+            if not df_result.empty:
+                df_result['source_building_gnd'] = gnd
+                df_result['tier'] = 1
+                all_items.append(df_result)
+                total_fetched += len(df_result)
+                
+            if i % 20 == 0:
+                print(f"   Buildings: {i}/{len(building_gnds)}, items: {total_fetched:,}")
+                
+        except Exception as e:
+            continue
+    
+    if all_items:
+        df = pd.concat(all_items, ignore_index=True)
+        return df.drop_duplicates(subset=['item'])
+    return pd.DataFrame()
+
+def fetch_bildindex_by_painter_gnd(painter_gnds, limit_per_painter=30, total_limit=None):
+    """
+    Fetch Bildindex items created by painters with given GNDs.
+    Uses pattern: creatorNode -> any predicate -> GND
+    """
+    all_items = []
+    total_fetched = 0
+    
+    for i, gnd in enumerate(painter_gnds, 1):
+        if total_limit and total_fetched >= total_limit:
+            break
+            
+        query = f"""
+        {PREFIXES}
+        SELECT DISTINCT ?item ?label ?url ?locationGnd ?locationLabel ?iconclass
+        WHERE {{
+            n4c:E6161 schema:dataFeedElement ?feedItem .
+            ?feedItem schema:item ?item .
+            
+            # Creator linked via any predicate to this GND
+            ?item cto:CTO_0001009 ?creatorNode .
+            ?creatorNode ?creatorPred <{gnd}> .
+            
+            OPTIONAL {{ ?item rdfs:label ?label }}
+            OPTIONAL {{ ?item nfdicore:NFDI_0001008 ?url }}
+            OPTIONAL {{ 
+                ?item cto:CTO_0001011 ?locNode .
+                ?locNode nfdicore:NFDI_0001006 ?locationGnd .
+                OPTIONAL {{ ?locNode rdfs:label ?locationLabel }}
+            }}
+            OPTIONAL {{ ?item cto:CTO_0001026 ?iconclass }}
+        }}
+        LIMIT {limit_per_painter}
+        """
+        
+        try:
+            df_result = run_sparql(query)
+            if not df_result.empty:
+                df_result['source_painter_gnd'] = gnd
+                df_result['tier'] = 2
+                all_items.append(df_result)
+                total_fetched += len(df_result)
+                
+            if i % 50 == 0:
+                print(f"   Painters: {i}/{len(painter_gnds)}, items: {total_fetched:,}")
+                
+        except Exception:
+            continue
+    
+    if all_items:
+        df = pd.concat(all_items, ignore_index=True)
+        return df.drop_duplicates(subset=['item'])
+    return pd.DataFrame()
+
+
+# =============================================================================
+# Bildindex Pipeline Steps (6.1 - 6.6)
+# =============================================================================
+# The notebook's Bildindex section as functions, so it can also run headless
+# (python -m baroque_pipeline bildindex).
+
+# Bildindex-specific parquet prefix
+BILDINDEX_PARQUET_PREFIX = "bildindex_"
+
+
+def extract_cbdd_gnds(df_paintings: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    """
+    Step 6.1: Unique creator and location GNDs of the CbDD paintings table.
+
+    Returns:
+        (creator GNDs, location GNDs)
+    """
+    def unique_gnds(column):
+        gnds = set()
+        for values in df_paintings[column].dropna():
+            for gnd in split_multi_value(values) or []:
+                if 'd-nb.info/gnd' in gnd:
+                    gnds.add(gnd)
+        return list(gnds)
+
+    return unique_gnds('creatorGnds'), unique_gnds('locationGnds')
+
+
+def find_shared_gnds(creator_gnds: List[str], location_gnds: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Step 6.2: GNDs that occur in both CbDD and Bildindex.
+
+    Returns:
+        (shared location GNDs, shared creator GNDs)
+    """
+    print(f"\n🏛️ Checking {len(location_gnds):,} location GNDs...")
+    shared_location_gnds = find_bildindex_overlapping_gnds(location_gnds, 'location')
+    print(f"   ✓ Found {len(shared_location_gnds):,} shared location GNDs")
+
+    print(f"\n🎨 Checking {len(creator_gnds):,} creator GNDs...")
+    shared_creator_gnds = find_bildindex_overlapping_gnds(creator_gnds, 'creator')
+    print(f"   ✓ Found {len(shared_creator_gnds):,} shared creator GNDs")
+
+    return list(shared_location_gnds), list(shared_creator_gnds)
+
+
+def collect_bildindex_items(shared_location_gnds: List[str], shared_creator_gnds: List[str],
+                            max_items: int = None, test_mode: bool = None) -> pd.DataFrame:
+    """
+    Step 6.4: Tiered collection - items at shared buildings (tier 1), then
+    items by shared painters (tier 2), deduplicated by item URI.
+
+    Args:
+        shared_location_gnds: Building GNDs shared with CbDD
+        shared_creator_gnds: Painter GNDs shared with CbDD
+        max_items: Total item budget (default: BILDINDEX_MAX_ITEMS)
+        test_mode: Only use the first 100 painters (default: BILDINDEX_TEST_MODE)
+
+    Returns:
+        DataFrame of collected items with tier, url and collection_method
+    """
+    max_items = max_items or BILDINDEX_MAX_ITEMS
+    test_mode = BILDINDEX_TEST_MODE if test_mode is None else test_mode
+    tier1_limit = int(max_items * BILDINDEX_TIER1_RATIO)
+    tier2_limit = int(max_items * BILDINDEX_TIER2_RATIO)
+
+    print(f"📊 Collection Plan:")
+    print(f"   Tier 1 (buildings): {len(shared_location_gnds):,} GNDs, limit {tier1_limit:,} items")
+    print(f"   Tier 2 (painters): {len(shared_creator_gnds):,} GNDs, limit {tier2_limit:,} items")
+
+    # Tier 1: Fetch by building GND
+    print(f"\n🏛️ Tier 1: Fetching items from {len(shared_location_gnds):,} shared buildings...")
+    df_bi_tier1 = fetch_bildindex_by_building_gnd(
+        shared_location_gnds,
+        limit_per_building=30,
+        total_limit=tier1_limit
+    )
+    print(f"   ✓ Tier 1 complete: {len(df_bi_tier1):,} unique items")
+
+    # Tier 2: Fetch by painter GND (in test mode, limit painters processed)
+    print(f"\n🎨 Tier 2: Fetching items from {len(shared_creator_gnds):,} shared painters...")
+    painters_to_use = shared_creator_gnds[:100] if test_mode else shared_creator_gnds
+    df_bi_tier2 = fetch_bildindex_by_painter_gnd(
+        painters_to_use,
+        limit_per_painter=20,
+        total_limit=tier2_limit
+    )
+    print(f"   ✓ Tier 2 complete: {len(df_bi_tier2):,} unique items")
+
+    # Combine and deduplicate
+    df_bildindex_raw = pd.concat([df_bi_tier1, df_bi_tier2], ignore_index=True)
+    if df_bildindex_raw.empty:
+        return df_bildindex_raw
+    df_bildindex_raw = df_bildindex_raw.drop_duplicates(subset=['item'])
+
+    # The item URI IS the Bildindex URL (discovered in prototype)
+    if 'bildindex.de' in str(df_bildindex_raw['item'].iloc[0]):
+        df_bildindex_raw['url'] = df_bildindex_raw['item']
+
+    # Add collection method
+    df_bildindex_raw['collection_method'] = df_bildindex_raw['tier'].apply(
+        lambda t: 'building_gnd' if t == 1 else 'painter_gnd'
+    )
+
+    print(f"\n📊 Collection Summary:")
+    print(f"   Total unique items: {len(df_bildindex_raw):,}")
+    print(f"   From Tier 1: {len(df_bi_tier1):,}")
+    print(f"   From Tier 2: {len(df_bi_tier2):,}")
+    print(f"   Overlap (deduplicated): {len(df_bi_tier1) + len(df_bi_tier2) - len(df_bildindex_raw):,}")
+    return df_bildindex_raw
+
+
+def validate_bildindex_items(df_bildindex_raw: pd.DataFrame,
+                             test_mode: bool = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Step 6.5: Validate the collected URLs and drop dead links (soft 404s).
+
+    Adds url_validated and validation_status to ``df_bildindex_raw`` (in place).
+
+    Returns:
+        (validated items, per-URL validation results)
+    """
+    test_mode = BILDINDEX_TEST_MODE if test_mode is None else test_mode
+    urls_to_validate = df_bildindex_raw['url'].dropna().unique().tolist()
+
+    print(f"🔍 Validating {len(urls_to_validate)} unique URLs...")
+    print("   (Rate limited to avoid server overload)")
+
+    # Validate (sample in test mode for speed)
+    if test_mode:
+        urls_sample = urls_to_validate[:min(len(urls_to_validate), 100)]
+        df_url_validation = validate_urls_batch(urls_sample, max_workers=3, delay=0.3)
+    else:
+        df_url_validation = validate_urls_batch(urls_to_validate, max_workers=5, delay=0.2)
+
+    valid_urls = set(df_url_validation[df_url_validation['is_valid']]['url'].tolist())
+    validated_urls = set(df_url_validation['url'].tolist())
+
+    df_bildindex_raw['url_validated'] = df_bildindex_raw['url'].apply(
+        lambda x: x in valid_urls if pd.notna(x) else False
+    )
+    df_bildindex_raw['validation_status'] = df_bildindex_raw['url'].apply(
+        lambda x: 'valid' if x in valid_urls
+                  else ('invalid' if x in validated_urls else 'not_tested')
+    )
+
+    # Keep validated items (valid or not yet tested)
+    df_bildindex_validated = df_bildindex_raw[
+        df_bildindex_raw['url_validated'] | (df_bildindex_raw['validation_status'] == 'not_tested')
+    ].copy()
+
+    print(f"\n📊 Validation Summary:")
+    print(f"   Total collected: {len(df_bildindex_raw):,}")
+    print(f"   Validated as working: {df_bildindex_raw['url_validated'].sum():,}")
+    print(f"   Not tested (assumed ok): {(df_bildindex_raw['validation_status'] == 'not_tested').sum():,}")
+    print(f"   Invalid (filtered out): {(df_bildindex_raw['validation_status'] == 'invalid').sum():,}")
+    print(f"   Final dataset size: {len(df_bildindex_validated):,}")
+    return df_bildindex_validated, df_url_validation
+
+
+def build_bildindex_tables(df_bildindex_validated: pd.DataFrame,
+                           shared_location_gnds: List[str], shared_creator_gnds: List[str],
+                           df_cbdd_paintings: pd.DataFrame = None) -> Dict[str, pd.DataFrame]:
+    """
+    Step 6.6: Normalized Bildindex tables (items, junctions, GND overlap summary).
+
+    Args:
+        df_bildindex_validated: Output of validate_bildindex_items()
+        shared_location_gnds: Building GNDs shared with CbDD
+        shared_creator_gnds: Painter GNDs shared with CbDD
+        df_cbdd_paintings: CbDD paintings table (for cbdd_count in gnd_overlaps)
+
+    Returns:
+        dict table name -> DataFrame (items, buildings, painters, subjects, gnd_overlaps)
+    """
+    # === Main Bildindex items table ===
+    df_bi_items = df_bildindex_validated[['item', 'label', 'url', 'tier',
+                                          'collection_method', 'url_validated',
+                                          'validation_status']].copy()
+    df_bi_items = df_bi_items.rename(columns={
+        'item': 'bildindex_uri',
+        'label': 'title',
+        'url': 'bildindex_url'
+    })
+    df_bi_items['source'] = 'bildindex'
+    df_bi_items['n4c_feed'] = BILDINDEX_FEED_URI
+
+    # === Bildindex-buildings junction table ===
+    df_bi_buildings = df_bildindex_validated[['item', 'source_building_gnd']].dropna(
+        subset=['source_building_gnd']
+    ).copy()
+    df_bi_buildings = df_bi_buildings.rename(columns={
+        'item': 'bildindex_uri',
+        'source_building_gnd': 'building_gnd'
+    })
+
+    # === Bildindex-painters junction table ===
+    df_bi_painters = df_bildindex_validated[['item', 'source_painter_gnd']].dropna(
+        subset=['source_painter_gnd']
+    ).copy()
+    df_bi_painters = df_bi_painters.rename(columns={
+        'item': 'bildindex_uri',
+        'source_painter_gnd': 'painter_gnd'
+    })
+
+    # === Bildindex-subjects junction table ===
+    df_bi_subjects = df_bildindex_validated[['item', 'iconclass']].dropna(
+        subset=['iconclass']
+    ).copy()
+    df_bi_subjects = df_bi_subjects.rename(columns={
+        'item': 'bildindex_uri',
+        'iconclass': 'iconclass_code'
+    })
+
+    # === GND overlap summary table (for cross-referencing) ===
+    df_gnd_overlaps = compute_gnd_overlaps(df_cbdd_paintings, df_bi_buildings, df_bi_painters,
+                                           shared_location_gnds, shared_creator_gnds)
+
+    return {
+        'items': df_bi_items,
+        'buildings': df_bi_buildings,
+        'painters': df_bi_painters,
+        'subjects': df_bi_subjects,
+        'gnd_overlaps': df_gnd_overlaps,
+    }
+
+
+# =============================================================================
+# GND Overlap Counts (CbDD paintings <-> Bildindex items)
+# =============================================================================
+# One pass per GND type: the paintings' GND lists are exploded to one row per
+# (painting, GND) and grouped by GND, the Bildindex junction is counted with
+# value_counts(), and both are joined on the GND - instead of one scan over
+# all paintings per shared GND.
+
+# gnd_type -> (paintings column, Bildindex junction table, junction column)
+GND_OVERLAP_SOURCES = {
+    'building': ('locationGnds', 'buildings', 'building_gnd'),
+    'painter': ('creatorGnds', 'painters', 'painter_gnd'),
+}
+
+GND_OVERLAP_COLUMNS = ['gnd_uri', 'gnd_type', 'cbdd_count', 'bildindex_count', 'cbdd_painting_uris']
+
+
+def explode_gnds(df_paintings: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    One row per (nfdi_uri, gnd) of a GND list column (lists or pipe-joined
+    strings), without duplicates.
+    """
+    uri_column = 'nfdi_uri' if 'nfdi_uri' in df_paintings.columns else 'painting'
+    pairs = pd.DataFrame({
+        'nfdi_uri': df_paintings[uri_column].values,
+        'gnd': df_paintings[column].map(split_multi_value).values,
+    }).explode('gnd')
+    return pairs.dropna(subset=['gnd']).drop_duplicates(ignore_index=True)
+
+
+def compute_gnd_overlaps(df_cbdd_paintings: Optional[pd.DataFrame],
+                         df_bi_buildings: pd.DataFrame, df_bi_painters: pd.DataFrame,
+                         shared_location_gnds: List[str], shared_creator_gnds: List[str]) -> pd.DataFrame:
+    """
+    Overlap counts for all shared GNDs.
+
+    Args:
+        df_cbdd_paintings: CbDD paintings table (None -> cbdd_count 0)
+        df_bi_buildings: Bildindex-buildings junction (bildindex_uri, building_gnd)
+        df_bi_painters: Bildindex-painters junction (bildindex_uri, painter_gnd)
+        shared_location_gnds: Building GNDs shared with CbDD
+        shared_creator_gnds: Painter GNDs shared with CbDD
+
+    Returns:
+        DataFrame with: gnd_uri, gnd_type, cbdd_count, bildindex_count,
+        cbdd_painting_uris (sorted nfdi_uris of the matching paintings)
+    """
+    bi_tables = {'buildings': df_bi_buildings, 'painters': df_bi_painters}
+    shared = {'building': shared_location_gnds, 'painter': shared_creator_gnds}
+
+    frames = []
+    for gnd_type, (cbdd_column, bi_table, bi_column) in GND_OVERLAP_SOURCES.items():
+        overlap = pd.DataFrame({'gnd_uri': list(dict.fromkeys(shared[gnd_type]))})
+        overlap['gnd_type'] = gnd_type
+
+        if df_cbdd_paintings is not None and cbdd_column in df_cbdd_paintings.columns:
+            pairs = explode_gnds(df_cbdd_paintings, cbdd_column)
+            pairs = pairs[pairs['gnd'].isin(overlap['gnd_uri'])].sort_values(['gnd', 'nfdi_uri'])
+            cbdd = pairs.groupby('gnd')['nfdi_uri'].agg(['size', list])
+            overlap['cbdd_count'] = overlap['gnd_uri'].map(cbdd['size']).fillna(0).astype(int)
+            overlap['cbdd_painting_uris'] = [uris if isinstance(uris, list) else []
+                                             for uris in overlap['gnd_uri'].map(cbdd['list'])]
+        else:
+            overlap['cbdd_count'] = 0
+            overlap['cbdd_painting_uris'] = [[] for _ in range(len(overlap))]
+
+        bi_counts = bi_tables[bi_table][bi_column].value_counts()
+        overlap['bildindex_count'] = overlap['gnd_uri'].map(bi_counts).fillna(0).astype(int)
+        frames.append(overlap)
+
+    return pd.concat(frames, ignore_index=True)[GND_OVERLAP_COLUMNS]
+
+
+def _gnd_overlaps_loop(df_cbdd_paintings: pd.DataFrame, df_bi_buildings: pd.DataFrame,
+                       df_bi_painters: pd.DataFrame, shared_location_gnds: List[str],
+                       shared_creator_gnds: List[str]) -> pd.DataFrame:
+    """Previous per-GND implementation (one paintings scan per GND), kept for the benchmark."""
+    rows = []
+    for gnd_type, gnds, cbdd_column, bi_table, bi_column in [
+            ('building', shared_location_gnds, 'locationGnds', df_bi_buildings, 'building_gnd'),
+            ('painter', shared_creator_gnds, 'creatorGnds', df_bi_painters, 'painter_gnd')]:
+        for gnd in gnds:
+            cbdd_count = int(df_cbdd_paintings[cbdd_column].map(
+                lambda values: gnd in (split_multi_value(values) or [])).sum())
+            bi_count = bi_table[bi_table[bi_column] == gnd].shape[0]
+            rows.append({'gnd_uri': gnd, 'gnd_type': gnd_type,
+                         'cbdd_count': cbdd_count, 'bildindex_count': bi_count})
+    return pd.DataFrame(rows)
+
+
+def benchmark_gnd_overlaps(df_cbdd_paintings: pd.DataFrame, df_bi_buildings: pd.DataFrame,
+                           df_bi_painters: pd.DataFrame, shared_location_gnds: List[str],
+                           shared_creator_gnds: List[str], repeats: int = 3) -> pd.DataFrame:
+    """
+    Time compute_gnd_overlaps() against the per-GND loop and check that both
+    give the same counts.
+
+    Returns:
+        DataFrame with: method, seconds, speedup
+    """
+    args = (df_cbdd_paintings, df_bi_buildings, df_bi_painters, shared_location_gnds, shared_creator_gnds)
+    results, rows = {}, []
+    for method, func in [('loop', _gnd_overlaps_loop), ('vectorized', compute_gnd_overlaps)]:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results[method] = func(*args)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        rows.append({'method': method, 'seconds': round(best, 4)})
+        print(f"   {method:<10}: {best:.4f}s")
+
+    columns = ['gnd_uri', 'gnd_type', 'cbdd_count', 'bildindex_count']
+    same = results['loop'].reindex(columns=columns).reset_index(drop=True).equals(
+        results['vectorized'][columns].reset_index(drop=True))
+    print(f"   Same counts: {'✓' if same else '✗'}")
+
+    df = pd.DataFrame(rows)
+    df['speedup'] = (df['seconds'].iloc[0] / df['seconds']).round(1)
+    return df
+
+
+def get_bildindex_parquet_path(table_name: str) -> str:
+    """Get path for Bildindex parquet file."""
+    return os.path.join(parquet.PARQUET_OUTPUT_DIR, f"{BILDINDEX_PARQUET_PREFIX}{table_name}.parquet")
+
+
+def save_bildindex_parquet(df: pd.DataFrame, table_name: str) -> str:
+    """Save Bildindex DataFrame to parquet."""
+    path = write_parquet_file(df, get_bildindex_parquet_path(table_name), f"{BILDINDEX_PARQUET_PREFIX}{table_name}",
+                              metadata={'source': BILDINDEX_FEED_URI})
+    print(f"   ✓ Saved {table_name}: {len(df):,} rows → {os.path.basename(path)}")
+    return path
+
+
+def run_bildindex_pipeline(test_mode: bool = None, validate: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Run steps 6.1 - 6.6 end to end on the exported CbDD paintings table.
+
+    Args:
+        test_mode: Small collection for quick runs (default: BILDINDEX_TEST_MODE)
+        validate: Validate URLs (otherwise every item is kept as 'not_tested')
+
+    Returns:
+        dict table name -> DataFrame, as saved to bildindex_<table>.parquet
+    """
+    test_mode = BILDINDEX_TEST_MODE if test_mode is None else test_mode
+    df_cbdd_paintings = load_parquet_table('paintings')
+    if len(df_cbdd_paintings) == 0:
+        raise RuntimeError("Paintings table not found. Run the parquet export pipeline first.")
+
+    creator_gnds, location_gnds = extract_cbdd_gnds(df_cbdd_paintings)
+    print(f"📊 CbDD GNDs: {len(creator_gnds):,} creators, {len(location_gnds):,} locations")
+
+    shared_location_gnds, shared_creator_gnds = find_shared_gnds(creator_gnds, location_gnds)
+    df_bildindex_raw = collect_bildindex_items(
+        shared_location_gnds, shared_creator_gnds,
+        max_items=1000 if test_mode else BILDINDEX_MAX_ITEMS, test_mode=test_mode)
+    if df_bildindex_raw.empty:
+        raise RuntimeError("No Bildindex items collected.")
+
+    if validate:
+        df_bildindex_validated, _ = validate_bildindex_items(df_bildindex_raw, test_mode=test_mode)
+    else:
+        df_bildindex_validated = df_bildindex_raw.assign(url_validated=False,
+                                                         validation_status='not_tested')
+
+    bildindex_tables = build_bildindex_tables(df_bildindex_validated, shared_location_gnds,
+                                              shared_creator_gnds, df_cbdd_paintings)
+    print("\n💾 Saving Bildindex tables to parquet...")
+    for table_name, df in bildindex_tables.items():
+        save_bildindex_parquet(df, table_name)
+    return bildindex_tables
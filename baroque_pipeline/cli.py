@@ -0,0 +1,148 @@
+"""Command line interface: ``python -m baroque_pipeline {export,bildindex,verify}``."""
+
+import argparse
+import os
+import sys
+from typing import List
+
+# Same as export.PIPELINE_STAGE_NAMES (not imported, so --help does not load pandas)
+PIPELINE_STAGE_NAMES = ['fetch', 'enrich', 'coordinates', 'subjects', 'entities', 'junctions', 'export']
+
+
+def configure(output_dir: str = None, graph_path: str = None, gazetteer_path: str = None) -> None:
+    """Point the pipeline modules at the given output directory and input files."""
+    from . import coordinates, graph, parquet
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        parquet.PARQUET_OUTPUT_DIR = os.path.abspath(output_dir)
+    if graph_path:
+        graph.CBDD_GRAPH_PATH = os.path.abspath(graph_path)
+    if gazetteer_path:
+        coordinates.GAZETTEER_PATH = os.path.abspath(gazetteer_path)
+
+
+def _cmd_export(args) -> int:
+    from . import parquet
+    from .export import run_parquet_export_pipeline, run_parquet_export_streaming
+
+    if args.stream and args.incremental:
+        print("❌ --incremental needs the complete tables and cannot be combined with --stream")
+        return 2
+    if args.stream:
+        rows = run_parquet_export_streaming(
+            chunk_size=args.chunk_size or args.batch_size,
+            max_paintings=args.max_paintings,
+            skip_subject_resolution=args.skip_subjects,
+            verbose=args.verbose,
+            profile=args.profile,
+            partitioned=args.partitioned,
+        )
+        return 0 if rows else 1
+
+    checkpoint_dir = args.checkpoint_dir or os.path.join(parquet.PARQUET_OUTPUT_DIR, '.pipeline_checkpoints')
+    tables = run_parquet_export_pipeline(
+        batch_size=args.batch_size,
+        max_paintings=args.max_paintings,
+        skip_subject_resolution=args.skip_subjects,
+        parallel_workers=args.workers,
+        resume=not args.no_resume,
+        force_stages=args.force,
+        max_concurrent_stages=args.max_concurrent_stages,
+        checkpoint_dir=checkpoint_dir,
+        profile=args.profile,
+        partitioned=args.partitioned,
+        incremental=args.incremental,
+    )
+    return 0 if tables else 1
+
+
+def _cmd_bildindex(args) -> int:
+    from .bildindex import run_bildindex_pipeline
+
+    try:
+        run_bildindex_pipeline(test_mode=args.test_mode, validate=not args.no_validate)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+def _cmd_verify(args) -> int:
+    from .export import verify_parquet_database
+
+    loaded_tables = verify_parquet_database()
+    return 0 if 'paintings' in loaded_tables else 1
+
+
+def _workers(value: str):
+    """--workers: a positive integer or 'auto' (CPU count)."""
+    if value == 'auto':
+        return None
+    workers = int(value)
+    if workers < 1:
+        raise argparse.ArgumentTypeError("must be >= 1 or 'auto'")
+    return workers
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m baroque_pipeline',
+        description='Export the CbDD baroque ceiling paintings (NFDI4Culture KG + CbDD graph) to Parquet.')
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output-dir', help='Directory for the Parquet files (default: repository root)')
+    common.add_argument('--graph', dest='graph_path', help='CbDD graphData.json (default: next to the notebooks)')
+    common.add_argument('--gazetteer', dest='gazetteer_path',
+                        help='Building gazetteer JSON (default: nfdi_gazetteer.json next to the notebooks)')
+
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', parents=[common], help='Run the Parquet export pipeline')
+    export.add_argument('--batch-size', type=int, default=500, help='Paintings per SPARQL query (default: 500)')
+    export.add_argument('--max-paintings', type=int, help='Only fetch the first N paintings')
+    export.add_argument('--skip-subjects', action='store_true', help='Skip ICONCLASS/AAT subject resolution')
+    export.add_argument('--workers', type=_workers, default=1,
+                        help="Processes for the entity/junction extractors (default: 1, 'auto' = CPU count)")
+    export.add_argument('--no-resume', action='store_true', help='Ignore completed stage checkpoints')
+    export.add_argument('--force', nargs='+', choices=PIPELINE_STAGE_NAMES, metavar='STAGE',
+                        help=f"Recompute these stages ({', '.join(PIPELINE_STAGE_NAMES)})")
+    export.add_argument('--max-concurrent-stages', type=int, default=2,
+                        help='Independent stages run at the same time (default: 2)')
+    export.add_argument('--checkpoint-dir', help='Stage checkpoints (default: <output-dir>/.pipeline_checkpoints)')
+    export.add_argument('--profile', action='store_true', help='Add a cProfile breakdown to the run report')
+    export.add_argument('--partitioned', action='store_true',
+                        help='Also write paintings and their junctions as a Hive-partitioned dataset '
+                             '(<output-dir>/baroque_dataset/<table>/location_state=.../decade=...)')
+    export.add_argument('--incremental', action='store_true',
+                        help='Write only changed rows and tombstones of deleted keys as delta files '
+                             '(<output-dir>/baroque_delta/<table>/) plus a change log '
+                             '(<output-dir>/baroque_changelog/<run_id>.parquet)')
+    export.add_argument('--stream', action='store_true',
+                        help='Constant-memory mode: process and write one chunk of paintings at a time '
+                             '(no checkpoints; --workers/--force/--no-resume do not apply)')
+    export.add_argument('--chunk-size', type=int, help='Paintings per chunk in --stream mode (default: --batch-size)')
+    export.add_argument('--verbose', action='store_true', help='Full log of every chunk in --stream mode')
+    export.set_defaults(handler=_cmd_export)
+
+    bildindex = commands.add_parser('bildindex', parents=[common],
+                                    help='Collect Bildindex items linked to the exported paintings')
+    bildindex.add_argument('--test-mode', action='store_true', default=None,
+                           help='Small collection (1,000 items, 100 painters, 100 URL checks)')
+    bildindex.add_argument('--no-validate', action='store_true', help='Skip URL validation')
+    bildindex.set_defaults(handler=_cmd_bildindex)
+
+    verify = commands.add_parser('verify', parents=[common], help='Check the exported Parquet tables')
+    verify.set_defaults(handler=_cmd_verify)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # Heavy imports (pandas, pyarrow, the graph) happen only from here on
+    configure(args.output_dir, args.graph_path, args.gazetteer_path)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
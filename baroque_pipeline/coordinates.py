@@ -0,0 +1,502 @@
+"""Building coordinates from a local gazetteer harvested from the NFDI4Culture KG."""
+
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .graph import normalize_name
+from .sparql import CBDD_FEED_URI, run_sparql
+
+
+# =============================================================================
+# Building Coordinates Lookup from NFDI4Culture KG
+# =============================================================================
+# The CbDD graph provides building names/addresses but not coordinates.
+# We query the NFDI4Culture KG to get lat/lon for buildings.
+#
+# Building names in CbDD follow patterns like:
+#   - "Bad Buchau, Stiftskirche" (City, Building)
+#   - "Altenburg, Haus Moritzstraße 6" (City, Street Address)
+#   - "München, Schloss Nymphenburg, Hauptschloss" (City, Complex, Building)
+#
+# Strategy:
+#   1. Harvest every labelled feed entity with coordinates (paintings and all
+#      their CTO_0001019 ancestors) in ONE bulk SPARQL query into a local
+#      gazetteer table, stored next to the notebook for offline reruns
+#   2. Index the gazetteer (normalized labels + token inverted index)
+#   3. Match building names locally: exact -> normalized -> partial -> city
+#      (no per-building network calls)
+
+
+# Local gazetteer file (harvest_building_gazetteer), next to graphData.json
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'nfdi_gazetteer.json')
+
+# Cache for building coordinates (label -> {lat, lon, uri, type})
+_building_coordinates_cache = {}
+_gazetteer_loaded = False       # set after the first successful load
+_gazetteer_failed_at = None     # time of the last failed load (retried after GAZETTEER_RETRY_SECONDS)
+GAZETTEER_RETRY_SECONDS = 300
+
+# Gazetteer index over _building_coordinates_cache (see build_coordinate_index)
+_coord_labels_by_norm = {}      # normalized label -> [labels] (sorted)
+_coord_token_index = {}         # token -> {labels}
+_coord_label_tokens = {}        # label -> set of tokens
+_coord_index_size = 0           # cache size the index was built from
+
+# Query token weights per address part: the building part is the most
+# specific, the city the least (every building in a city shares it)
+COORD_PART_WEIGHTS = {'building': 3.0, 'complex': 2.0, 'street': 2.0, 'city': 1.0}
+COORD_MIN_TOKEN_RECALL = 0.5
+
+
+def extract_address_parts(building_name: str) -> Dict[str, str]:
+    """
+    Extract city, street, and building parts from a CbDD building name.
+    
+    Examples:
+        "Bad Buchau, Stiftskirche" -> {city: "Bad Buchau", building: "Stiftskirche"}
+        "Altenburg, Haus Moritzstraße 6" -> {city: "Altenburg", street: "Moritzstraße 6", building: "Haus"}
+        "München, Schloss Nymphenburg, Hauptschloss" -> {city: "München", complex: "Schloss Nymphenburg", building: "Hauptschloss"}
+    """
+    if not building_name:
+        return {}
+    
+    parts = [p.strip() for p in building_name.split(',')]
+    result = {
+        'full_name': building_name,
+        'city': parts[0] if parts else None,
+        'building': parts[-1] if len(parts) > 1 else None,
+        'complex': parts[1] if len(parts) > 2 else None,
+    }
+    
+    # Check for street address patterns (contains numbers or street keywords)
+    street_patterns = ['straße', 'str.', 'gasse', 'platz', 'weg', 'allee']
+    for part in parts[1:]:
+        part_lower = part.lower()
+        if any(p in part_lower for p in street_patterns) or re.search(r'\d+', part):
+            result['street'] = part
+            break
+    
+    return result
+
+
+@lru_cache(maxsize=None)
+def get_building_coordinates_from_kg(building_name: str) -> Optional[Dict]:
+    """
+    Find coordinates for a building in the local gazetteer.
+    
+    The gazetteer is harvested once from the NFDI4Culture KG (see
+    harvest_building_gazetteer); lookups themselves never hit the network.
+    match_type is deterministic:
+        'exact'      - label equals the building name
+        'normalized' - equal after normalize_name (case, umlauts, punctuation)
+        'partial'    - best ranked token match (find_coordinate_candidates)
+        'city'       - only the city part could be matched
+    
+    Args:
+        building_name: Building name/address from CbDD (e.g., "Bad Buchau, Stiftskirche")
+    
+    Returns:
+        dict with lat, lon, uri, matched_label, match_type, or None if not found
+    """
+    if not building_name:
+        return None
+    if not _gazetteer_loaded:
+        load_all_building_coordinates()
+    if _coord_index_size != len(_building_coordinates_cache):
+        build_coordinate_index()
+    
+    def result(label: str, match_type: str) -> Dict:
+        coords = _building_coordinates_cache[label]
+        return {
+            'lat': coords['lat'],
+            'lon': coords['lon'],
+            'uri': coords['uri'],
+            'matched_label': label,
+            'match_type': match_type
+        }
+    
+    if building_name in _building_coordinates_cache:
+        return result(building_name, 'exact')
+    
+    labels = _coord_labels_by_norm.get(normalize_name(building_name))
+    if labels:
+        return result(labels[0], 'normalized')
+    
+    city = extract_address_parts(building_name).get('city')
+    city_tokens = set(_coord_tokens(city or ''))
+    
+    candidates = find_coordinate_candidates(building_name, limit=1)
+    if candidates:
+        label = candidates[0]['label']
+        # A label made of city tokens only (e.g. "München") is a city match
+        is_city = city != building_name and _coord_label_tokens[label] <= city_tokens
+        return result(label, 'city' if is_city else 'partial')
+    
+    # City fallback: a label for the city itself, else the best label in the city
+    if city and city != building_name:
+        labels = _coord_labels_by_norm.get(normalize_name(city))
+        if labels:
+            return result(labels[0], 'city')
+        in_city = [c for c in find_coordinate_candidates(city, limit=50)
+                   if city_tokens <= _coord_label_tokens[c['label']]]
+        if in_city:
+            return result(in_city[0]['label'], 'city')
+    
+    return None
+
+
+def get_coordinates_for_painting(painting_row: pd.Series) -> Dict:
+    """
+    Get coordinates for a painting, trying multiple sources:
+    1. Direct coordinates on painting (from NFDI4Culture)
+    2. Building coordinates (via CbDD building -> KG lookup)
+    
+    Args:
+        painting_row: DataFrame row with painting data
+    
+    Returns:
+        dict with lat, lon, source, building_name (if from building)
+    """
+    # First check if painting has direct coordinates
+    lat = painting_row.get('lat')
+    lon = painting_row.get('lon')
+    
+    if lat is not None and lon is not None and str(lat) != 'nan' and str(lon) != 'nan':
+        try:
+            return {
+                'lat': float(lat),
+                'lon': float(lon),
+                'source': 'painting',
+                'building_name': None
+            }
+        except (ValueError, TypeError):
+            pass
+    
+    # Try to get coordinates from building
+    building_name = painting_row.get('building')
+    if building_name:
+        coords = get_building_coordinates_from_kg(building_name)
+        if coords:
+            return {
+                'lat': coords['lat'],
+                'lon': coords['lon'],
+                'source': 'building',
+                'building_name': building_name,
+                'matched_label': coords.get('matched_label'),
+                'match_type': coords.get('match_type')
+            }
+    
+    return {'lat': None, 'lon': None, 'source': None, 'building_name': None}
+
+
+def enrich_dataframe_with_coordinates(df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+    """
+    Add coordinate columns to a DataFrame, trying painting then building coordinates.
+    
+    Args:
+        df: DataFrame with painting data (should have 'building' column from CbDD enrichment)
+        verbose: Print progress information
+    
+    Returns:
+        DataFrame with added/updated lat, lon, coord_source columns
+    """
+    if 'coord_source' not in df.columns:
+        df['coord_source'] = None
+    
+    direct_coords = 0
+    building_coords = 0
+    no_coords = 0
+    
+    for idx, row in df.iterrows():
+        coords = get_coordinates_for_painting(row)
+        
+        if coords['lat'] is not None:
+            df.at[idx, 'lat'] = coords['lat']
+            df.at[idx, 'lon'] = coords['lon']
+            df.at[idx, 'coord_source'] = coords['source']
+            
+            if coords['source'] == 'painting':
+                direct_coords += 1
+            else:
+                building_coords += 1
+        else:
+            no_coords += 1
+    
+    if verbose:
+        print(f"   ✓ Coordinates enrichment:")
+        print(f"      Direct (painting): {direct_coords}")
+        print(f"      From building: {building_coords}")
+        print(f"      No coordinates: {no_coords}")
+    
+    return df
+
+
+# =============================================================================
+# Bulk gazetteer harvest (one SPARQL query for the whole feed)
+# =============================================================================
+def harvest_building_gazetteer(force_refresh: bool = False, timeout: int = 300) -> pd.DataFrame:
+    """
+    Harvest every labelled entity with coordinates in the CbDD feed - the
+    paintings and all their CTO_0001019 ancestors - into a gazetteer table.
+    
+    The result is stored at GAZETTEER_PATH and reused on later runs, so
+    coordinate enrichment works offline after the first harvest.
+    
+    Args:
+        force_refresh: Re-query the KG even if the local gazetteer exists
+        timeout: SPARQL timeout in seconds for the bulk query
+    
+    Returns:
+        DataFrame with: label, lat, lon, uri, type ('painting' or 'parent'),
+        one row per label (sorted by label)
+    """
+    if not force_refresh and os.path.exists(GAZETTEER_PATH):
+        with open(GAZETTEER_PATH, encoding='utf-8') as f:
+            return pd.DataFrame(json.load(f))
+    
+    query = f"""
+    SELECT DISTINCT ?item ?label ?lat ?lon ?itemType
+    WHERE {{
+      {CBDD_FEED_URI} schema:dataFeedElement ?feedItem .
+      ?feedItem schema:item ?painting .
+      
+      {{
+        BIND(?painting AS ?item)
+        BIND("painting" AS ?itemType)
+      }}
+      UNION
+      {{
+        ?painting <https://nfdi4culture.de/ontology/CTO_0001019>+ ?item .
+        BIND("parent" AS ?itemType)
+      }}
+      ?item rdfs:label ?label .
+      ?item schema:latitude ?lat .
+      ?item schema:longitude ?lon .
+    }}
+    """
+    df = run_sparql(query, timeout=timeout)
+    if df.empty:
+        return pd.DataFrame(columns=['label', 'lat', 'lon', 'uri', 'type'])
+    
+    df = df.rename(columns={'item': 'uri', 'itemType': 'type'})
+    df['lat'] = pd.to_numeric(df['lat'], errors='coerce')
+    df['lon'] = pd.to_numeric(df['lon'], errors='coerce')
+    df = df.dropna(subset=['label', 'lat', 'lon'])
+    df = df[df['label'].str.strip() != '']
+    
+    # One row per label; parents win over paintings, then lowest URI (deterministic)
+    df['_type_rank'] = (df['type'] != 'parent').astype(int)
+    df = (df.sort_values(['label', '_type_rank', 'uri'])
+            .drop_duplicates('label')
+            .drop(columns='_type_rank')
+            [['label', 'lat', 'lon', 'uri', 'type']]
+            .reset_index(drop=True))
+    
+    with open(GAZETTEER_PATH, 'w', encoding='utf-8') as f:
+        json.dump(df.to_dict(orient='records'), f, ensure_ascii=False)
+    return df
+
+
+def load_all_building_coordinates(force_refresh: bool = False) -> Dict[str, Dict]:
+    """
+    Load the gazetteer into the coordinate cache and index it.
+    
+    Args:
+        force_refresh: Re-harvest from the KG instead of using GAZETTEER_PATH
+    
+    Returns:
+        dict mapping label -> {lat, lon, uri, type}
+    """
+    global _building_coordinates_cache, _gazetteer_loaded, _gazetteer_failed_at
+    
+    if _gazetteer_loaded and not force_refresh:
+        return _building_coordinates_cache
+    # After a failed harvest, don't retry on every building lookup
+    if (not force_refresh and _gazetteer_failed_at is not None
+            and time.time() - _gazetteer_failed_at < GAZETTEER_RETRY_SECONDS):
+        return _building_coordinates_cache
+    
+    print("📍 Loading building gazetteer...")
+    
+    try:
+        from_file = os.path.exists(GAZETTEER_PATH) and not force_refresh
+        gazetteer = harvest_building_gazetteer(force_refresh=force_refresh)
+        
+        if not gazetteer.empty:
+            _building_coordinates_cache = {
+                row['label']: {
+                    'lat': float(row['lat']),
+                    'lon': float(row['lon']),
+                    'uri': row['uri'],
+                    'type': row.get('type', 'unknown')
+                }
+                for row in gazetteer.to_dict(orient='records')
+            }
+            build_coordinate_index()
+            get_building_coordinates_from_kg.cache_clear()
+            source = GAZETTEER_PATH if from_file else 'NFDI4Culture KG (bulk harvest)'
+            print(f"   ✓ Loaded coordinates for {len(_building_coordinates_cache)} items from {source}")
+            _gazetteer_loaded = True
+            _gazetteer_failed_at = None
+        else:
+            print("   ⚠ No coordinate data found")
+            _gazetteer_failed_at = time.time()
+            
+    except Exception as e:
+        print(f"   ⚠ Error loading coordinates: {e}")
+        _gazetteer_failed_at = time.time()
+    
+    return _building_coordinates_cache
+
+
+def _coord_tokens(text: str) -> List[str]:
+    """Normalized tokens of a name (single characters are dropped)."""
+    return [t for t in normalize_name(text).split() if len(t) > 1]
+
+
+def build_coordinate_index() -> int:
+    """
+    Build the gazetteer index over _building_coordinates_cache.
+    
+    Two structures are built:
+      - normalized label -> labels (exact lookup, independent of case/umlauts/punctuation)
+      - token -> labels (inverted index for ranked partial matches)
+    
+    Returns:
+        Number of indexed labels
+    """
+    global _coord_labels_by_norm, _coord_token_index, _coord_label_tokens, _coord_index_size
+    
+    labels_by_norm = defaultdict(list)
+    token_index = defaultdict(set)
+    label_tokens = {}
+    for label in _building_coordinates_cache:
+        norm = normalize_name(label)
+        if not norm:
+            continue
+        labels_by_norm[norm].append(label)
+        tokens = set(_coord_tokens(label))
+        label_tokens[label] = tokens
+        for token in tokens:
+            token_index[token].add(label)
+    
+    _coord_labels_by_norm = {norm: sorted(labels) for norm, labels in labels_by_norm.items()}
+    _coord_token_index = dict(token_index)
+    _coord_label_tokens = label_tokens
+    _coord_index_size = len(_building_coordinates_cache)
+    return len(label_tokens)
+
+
+def _weighted_query_tokens(name: str) -> Dict[str, float]:
+    """
+    Query tokens weighted by the address part they come from
+    (building > complex/street > city, see COORD_PART_WEIGHTS).
+    """
+    addr = extract_address_parts(name)
+    weights = {}
+    for part, weight in COORD_PART_WEIGHTS.items():
+        for token in _coord_tokens(addr.get(part) or ''):
+            weights[token] = max(weights.get(token, 0.0), weight)
+    # Names without commas only have a city part - still use all their tokens
+    for token in _coord_tokens(name):
+        weights.setdefault(token, COORD_PART_WEIGHTS['city'])
+    return weights
+
+
+def find_coordinate_candidates(name: str, limit: int = 5) -> List[Dict]:
+    """
+    Ranked gazetteer candidates for a building/place name.
+    
+    Candidates share at least one token with the query.  If the query names
+    a city ("Kempten, Residenz"), a candidate must contain all city tokens or
+    have the same city part - a matching building type in another town
+    ("Würzburg, Residenz") is no candidate.  Ranking (all deterministic,
+    ties broken by the label itself):
+      1. normalized containment (query inside label or label inside query)
+      2. weighted token recall (share of the query's weight found in the label)
+      3. token precision (share of the label's tokens found in the query)
+      4. parent entities before paintings, then label
+    
+    Args:
+        name: Building name/address (e.g., "München, Schloss Nymphenburg, Hauptschloss")
+        limit: Maximum number of candidates
+    
+    Returns:
+        list of dicts: label, score, recall, precision, contained
+    """
+    if _coord_index_size != len(_building_coordinates_cache):
+        build_coordinate_index()
+    
+    weights = _weighted_query_tokens(name)
+    total_weight = sum(weights.values())
+    if not total_weight:
+        return []
+    
+    candidates = set()
+    for token in weights:
+        candidates |= _coord_token_index.get(token, set())
+    
+    addr = extract_address_parts(name)
+    city = addr.get('city') if addr.get('building') else None
+    city_tokens = set(_coord_tokens(city or ''))
+    norm_city = normalize_name(city) if city else None
+    
+    padded_query = f" {normalize_name(name)} "
+    scored = []
+    for label in candidates:
+        tokens = _coord_label_tokens[label]
+        if city and not city_tokens <= tokens and \
+                normalize_name(extract_address_parts(label).get('city') or '') != norm_city:
+            continue
+        matched = tokens.intersection(weights)
+        recall = sum(weights[t] for t in matched) / total_weight
+        precision = len(matched) / len(tokens)
+        padded_label = f" {normalize_name(label)} "
+        contained = padded_query in padded_label or padded_label in padded_query
+        if not contained and recall < COORD_MIN_TOKEN_RECALL:
+            continue
+        is_parent = _building_coordinates_cache[label].get('type') == 'parent'
+        scored.append(((-contained, -recall, -precision, -is_parent, label),
+                       {'label': label, 'score': round(recall * precision, 3),
+                        'recall': round(recall, 3), 'precision': round(precision, 3),
+                        'contained': contained}))
+    
+    scored.sort(key=lambda item: item[0])
+    return [info for _, info in scored[:limit]]
+
+
+def get_cached_coordinates(name: str) -> Optional[Dict]:
+    """
+    Get coordinates from cache: exact label, then normalized label, then the
+    best-ranked token match (see find_coordinate_candidates).
+    """
+    if not _gazetteer_loaded:
+        load_all_building_coordinates()
+    if not name:
+        return None
+    
+    # Try exact match
+    if name in _building_coordinates_cache:
+        return _building_coordinates_cache[name]
+    
+    if _coord_index_size != len(_building_coordinates_cache):
+        build_coordinate_index()
+    
+    # Try normalized match (case, umlauts, punctuation)
+    labels = _coord_labels_by_norm.get(normalize_name(name))
+    if labels:
+        return _building_coordinates_cache[labels[0]]
+    
+    # Try ranked partial match
+    candidates = find_coordinate_candidates(name, limit=1)
+    if candidates:
+        return _building_coordinates_cache[candidates[0]['label']]
+    
+    return None
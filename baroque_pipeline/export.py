@@ -0,0 +1,906 @@
+"""The Parquet export pipeline: SPARQL fetch, subject resolution, stages and verification."""
+
+import contextlib
+import io
+import os
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from . import coordinates, graph, parquet, vocab
+from .graph import _traverse_to_building, enrich_dataframe_from_graph, load_cbdd_graph, parents
+from .incremental import apply_upsert
+from .parquet import (API_DELAY_SECONDS, SPARQL_BATCH_SIZE, SUBJECT_BATCH_SIZE,
+                      ParquetChunkWriter, enrich_coordinates, load_parquet_table, read_parquet_metadata,
+                      save_parquet_with_metadata, write_partitioned_dataset)
+from .sparql import CBDD_FEED_URI, run_sparql
+from .stages import (PIPELINE_CHECKPOINT_DIR, _count_rows, _measure_stage, _merge_stage_metrics,
+                     _peak_rss_mb, hash_file, run_report_summary, run_stage_dag, write_run_report)
+from .tables import (create_paintings_table, extract_building_persons_junction,
+                     extract_buildings_table, extract_ensembles_table,
+                     extract_painting_persons_junction, extract_painting_subjects_junction,
+                     extract_persons_table, extract_room_persons_junction, extract_rooms_table,
+                     extract_subjects_table, extract_tables_parallel)
+from .vocab import query_getty_sparql, query_iconclass_sparql
+
+
+# =============================================================================
+# Fetch ALL Paintings from SPARQL (Paginated)
+# =============================================================================
+# Uses OFFSET/LIMIT pagination to fetch all ~6,228 paintings from the 
+# NFDI4Culture SPARQL endpoint in batches.
+
+PAINTING_OPTIONAL_COLUMNS = ['parentLabel', 'parentUri', 'subjects', 'lat', 'lon', 'license',
+                             'creatorGnds', 'locationGnds']
+
+
+def _normalize_painting_page(df: pd.DataFrame) -> pd.DataFrame:
+    """Ensure optional columns exist and coordinates are numeric."""
+    for col in PAINTING_OPTIONAL_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    for col in ['lat', 'lon']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def iter_painting_pages(batch_size: int = SPARQL_BATCH_SIZE,
+                        max_paintings: int = None,
+                        verbose: bool = True):
+    """
+    Yield the paintings of the CbDD feed page by page (OFFSET/LIMIT pagination).
+
+    Args:
+        batch_size: Number of paintings per SPARQL query (default: 500)
+        max_paintings: Optional limit for testing (None = fetch all)
+        verbose: Print progress information
+
+    Yields:
+        One DataFrame per page (optional columns present, lat/lon numeric)
+    """
+    offset = 0
+    total_fetched = 0
+    batch_num = 0
+    
+    while True:
+        # Build paginated query - preserves painting URI as primary key
+        # Enhanced to include GNDs for Bildindex cross-referencing
+        query = f"""
+SELECT DISTINCT ?painting ?label ?year ?lat ?lon ?imageUrl ?license
+       (GROUP_CONCAT(DISTINCT ?subject; separator="|") AS ?subjects)
+       ?parentUri ?parentLabel
+       (GROUP_CONCAT(DISTINCT ?creatorGnd; separator="|") AS ?creatorGnds)
+       (GROUP_CONCAT(DISTINCT ?locationGnd; separator="|") AS ?locationGnds)
+WHERE {{
+  {CBDD_FEED_URI} schema:dataFeedElement ?feedItem .
+  ?feedItem schema:item ?painting .
+  ?painting rdfs:label ?label .
+  
+  # Image URL (required for display)
+  ?painting schema:associatedMedia ?image .
+  ?image <https://nfdi4culture.de/ontology/CTO_0001021> ?imageUrl .
+  
+  # Optional fields from NFDI4Culture
+  OPTIONAL {{ ?image <https://nfdi4culture.de/ontology/CTO_0001007> ?license . }}
+  OPTIONAL {{ ?painting <https://nfdi4culture.de/ontology/CTO_0001073> ?year . }}
+  OPTIONAL {{ ?painting schema:latitude ?lat . ?painting schema:longitude ?lon . }}
+  OPTIONAL {{ ?painting <https://nfdi4culture.de/ontology/CTO_0001026> ?subject . }}
+  OPTIONAL {{
+    ?painting <https://nfdi4culture.de/ontology/CTO_0001019> ?parentUri .
+    FILTER(?parentUri != ?painting)
+    ?parentUri rdfs:label ?parentLabel .
+  }}
+  
+  # Creator/Painter GND (for Bildindex cross-referencing)
+  # CORRECT: GND is stored via NFDI_0001006 from nfdi.fiz-karlsruhe.de ontology (not nfdi4culture.de/id)
+  OPTIONAL {{
+    ?painting <https://nfdi4culture.de/ontology/CTO_0001009> ?creatorNode .
+    ?creatorNode <https://nfdi.fiz-karlsruhe.de/ontology/NFDI_0001006> ?creatorGnd .
+    FILTER(CONTAINS(STR(?creatorGnd), "d-nb.info/gnd"))
+  }}
+  
+  # Location/Building GND (for Bildindex cross-referencing)
+  # CORRECT: GND is stored via NFDI_0001006 from nfdi.fiz-karlsruhe.de ontology (not nfdi4culture.de/id)
+  OPTIONAL {{
+    ?painting <https://nfdi4culture.de/ontology/CTO_0001011> ?locNode .
+    ?locNode <https://nfdi.fiz-karlsruhe.de/ontology/NFDI_0001006> ?locationGnd .
+    FILTER(CONTAINS(STR(?locationGnd), "d-nb.info/gnd"))
+  }}
+}}
+GROUP BY ?painting ?label ?year ?lat ?lon ?imageUrl ?license ?parentUri ?parentLabel
+ORDER BY ?painting
+LIMIT {batch_size}
+OFFSET {offset}
+"""
+        
+        df_batch = run_sparql(query)
+        
+        if df_batch.empty:
+            if verbose:
+                print(f"   ✓ Completed at offset {offset}")
+            return
+        
+        batch_num += 1
+        total_fetched += len(df_batch)
+        
+        if verbose:
+            print(f"   Batch {batch_num:3d}: +{len(df_batch):4d} paintings (total: {total_fetched:,})")
+        
+        yield _normalize_painting_page(df_batch)
+        
+        # Check limits
+        if max_paintings and total_fetched >= max_paintings:
+            if verbose:
+                print(f"   ✓ Reached max_paintings limit: {max_paintings}")
+            return
+        
+        if len(df_batch) < batch_size:
+            if verbose:
+                print(f"   ✓ Last batch (got {len(df_batch)} < {batch_size})")
+            return
+        
+        offset += batch_size
+        time.sleep(0.1)  # Be nice to the endpoint
+
+
+def fetch_all_paintings_sparql(batch_size: int = SPARQL_BATCH_SIZE, 
+                               max_paintings: int = None,
+                               verbose: bool = True) -> pd.DataFrame:
+    """
+    Fetch ALL paintings from the NFDI4Culture SPARQL endpoint using pagination.
+    
+    Args:
+        batch_size: Number of paintings per SPARQL query (default: 500)
+        max_paintings: Optional limit for testing (None = fetch all)
+        verbose: Print progress information
+    
+    Returns:
+        DataFrame with all paintings and their SPARQL properties
+    """
+    if verbose:
+        print(f"📥 Fetching paintings from SPARQL endpoint...")
+        print(f"   Batch size: {batch_size}, Max: {max_paintings or 'unlimited'}")
+    
+    all_dfs = list(iter_painting_pages(batch_size, max_paintings, verbose))
+    
+    if not all_dfs:
+        print("   ⚠ No paintings found!")
+        return pd.DataFrame()
+    
+    # Combine all batches
+    df_all = _normalize_painting_page(pd.concat(all_dfs, ignore_index=True))
+    
+    if verbose:
+        print(f"\n📊 SPARQL Fetch Summary:")
+        print(f"   Total paintings: {len(df_all):,}")
+        print(f"   With coordinates: {df_all['lat'].notna().sum():,} ({100*df_all['lat'].notna().sum()/len(df_all):.1f}%)")
+        print(f"   With subjects: {(df_all['subjects'].notna() & (df_all['subjects'] != '')).sum():,}")
+        print(f"   With year: {df_all['year'].notna().sum():,}")
+        print(f"   Unique painting URIs: {df_all['painting'].nunique():,}")
+        # GND statistics for Bildindex integration
+        print(f"   With creator GNDs: {(df_all['creatorGnds'].notna() & (df_all['creatorGnds'] != '')).sum():,}")
+        print(f"   With location GNDs: {(df_all['locationGnds'].notna() & (df_all['locationGnds'] != '')).sum():,}")
+    
+    return df_all
+
+
+# =============================================================================
+# Batch Subject Resolution for Full Dataset
+# =============================================================================
+# Efficiently resolves all unique ICONCLASS/Getty AAT subjects and creates
+# normalized tables for the relational database.
+
+# subject_uri -> resolved subject, shared by all calls of batch_resolve_subjects()
+# (the streaming export calls it once per chunk).  Subjects whose lookup
+# failed are not kept, so a later chunk retries them.
+_resolved_subjects = {}
+
+
+def batch_resolve_subjects(df: pd.DataFrame, 
+                          uri_column: str = 'subject_uris',
+                          verbose: bool = True) -> pd.DataFrame:
+    """
+    Resolve all unique subjects in the DataFrame and add resolved data.
+
+    Subjects resolved by an earlier call are reused; the rate-limiting delay
+    follows only lookups that actually queried an endpoint.
+    
+    Args:
+        df: DataFrame with a column containing subject URIs (list or pipe-separated string)
+        uri_column: Name of the column containing subject URIs
+        verbose: Print progress information
+    
+    Returns:
+        DataFrame with 'subjects_resolved' column added (list of dicts with uri, label, source)
+    """
+    if verbose:
+        print(f"📚 Resolving subjects from {len(df):,} paintings...")
+    
+    # Extract all unique subject URIs
+    all_subjects = set()
+    
+    for idx, row in df.iterrows():
+        subjects_val = row.get(uri_column, [])
+        
+        if subjects_val is None:
+            continue
+        
+        # Handle both list and string formats
+        if isinstance(subjects_val, list):
+            uris = subjects_val
+        elif isinstance(subjects_val, str):
+            uris = [u.strip() for u in str(subjects_val).split('|') if u.strip()]
+        else:
+            continue
+        
+        for uri in uris:
+            if uri:
+                all_subjects.add(uri)
+    
+    if verbose:
+        print(f"   Found {len(all_subjects):,} unique subjects")
+    
+    if len(all_subjects) == 0:
+        df['subjects_resolved'] = [[] for _ in range(len(df))]
+        print("   ⚠ No subjects to resolve")
+        return df
+    
+    # Resolve each unique subject not seen before - build lookup dict
+    resolved_lookup = {uri: _resolved_subjects[uri] for uri in all_subjects if uri in _resolved_subjects}
+    subjects_list = [uri for uri in all_subjects if uri not in _resolved_subjects]
+    if verbose and resolved_lookup:
+        print(f"   {len(resolved_lookup):,} already resolved, {len(subjects_list):,} new")
+    
+    for i, subj_uri in enumerate(subjects_list):
+        if verbose and (i + 1) % SUBJECT_BATCH_SIZE == 0:
+            print(f"   Resolving: {i+1:,}/{len(subjects_list):,} ({100*(i+1)/len(subjects_list):.1f}%)")
+        
+        # Determine source and extract code
+        code = subj_uri.split('/')[-1]
+        label = None
+        source = 'UNKNOWN'
+        cache, queried = {}, False
+        
+        if 'iconclass.org' in subj_uri:
+            source = 'ICONCLASS'
+            cache = vocab._iconclass_cache
+            queried = code not in cache
+            try:
+                label = query_iconclass_sparql(code)
+            except Exception:
+                pass
+        elif 'vocab.getty.edu' in subj_uri or 'getty.edu' in subj_uri:
+            source = 'GETTY_AAT'
+            cache = vocab._getty_cache
+            queried = code not in cache
+            try:
+                label = query_getty_sparql(code)
+            except Exception:
+                pass
+        
+        resolved_lookup[subj_uri] = {
+            'uri': subj_uri,
+            'code': code,
+            'label': label if label else f'[{code}]',
+            'source': source,
+        }
+        if source == 'UNKNOWN' or code in cache:
+            _resolved_subjects[subj_uri] = resolved_lookup[subj_uri]
+        
+        if queried:
+            time.sleep(API_DELAY_SECONDS)  # Rate limiting
+    
+    # Add resolved subjects to each row
+    def resolve_row_subjects(subjects_val):
+        if subjects_val is None:
+            return []
+        
+        if isinstance(subjects_val, list):
+            uris = subjects_val
+        elif isinstance(subjects_val, str):
+            uris = [u.strip() for u in str(subjects_val).split('|') if u.strip()]
+        else:
+            return []
+        
+        return [resolved_lookup.get(uri, {'uri': uri, 'label': uri, 'source': 'UNKNOWN'}) for uri in uris if uri]
+    
+    df['subjects_resolved'] = df[uri_column].apply(resolve_row_subjects)
+    
+    if verbose:
+        resolved_count = sum(1 for v in resolved_lookup.values() if v['label'] and not v['label'].startswith('['))
+        print(f"\n   ✓ Resolved {resolved_count:,}/{len(resolved_lookup):,} subject labels ({100*resolved_count/len(resolved_lookup):.1f}%)")
+        source_counts = {}
+        for v in resolved_lookup.values():
+            source_counts[v['source']] = source_counts.get(v['source'], 0) + 1
+        for src, cnt in source_counts.items():
+            print(f"      {src}: {cnt:,}")
+    
+    return df
+
+
+# =============================================================================
+# MAIN PIPELINE: Full Dataset Extraction to Parquet
+# =============================================================================
+# This is the main execution pipeline, run as a DAG of checkpointed stages
+# (see run_stage_dag):
+#
+#   fetch ──> enrich ──┬──> coordinates ──┐
+#                      └──> subjects ─────┼──> junctions ──> export
+#   entities (graph only) ────────────────┴──────────────────┘
+#
+# 1. fetch:       ALL paintings from SPARQL (paginated); the feed has no
+#                 version to hash, so its checkpoint is keyed by the run date
+#                 and a scheduled run re-queries it once per day
+# 2. enrich:      CbDD graph data, person edges, room/building foreign keys
+# 3. coordinates: lat/lon from buildings (local gazetteer)
+# 4. subjects:    ICONCLASS/AAT resolution (runs alongside 3 and entities)
+# 5. entities:    persons, buildings, rooms, ensembles from the graph
+# 6. junctions:   painting/building/room persons, painting subjects
+# 7. export:      Parquet files (always runs)
+
+PIPELINE_STAGE_NAMES = ['fetch', 'enrich', 'coordinates', 'subjects', 'entities', 'junctions', 'export']
+
+
+def _graph_file_hash() -> Optional[str]:
+    return hash_file(graph.CBDD_GRAPH_PATH)
+
+
+def _fetch_run_date() -> str:
+    return date.today().isoformat()
+
+
+def _stage_fetch(inputs: dict, params: dict) -> Dict[str, pd.DataFrame]:
+    print("📥 Fetching paintings from SPARQL...")
+    df_all = fetch_all_paintings_sparql(batch_size=params['batch_size'],
+                                        max_paintings=params['max_paintings'])
+    if len(df_all) == 0:
+        raise RuntimeError("No paintings fetched!")
+    return {'paintings_raw': df_all}
+
+
+def _stage_enrich(inputs: dict, params: dict) -> Dict[str, pd.DataFrame]:
+    print("🔗 Enriching with CbDD graph data...")
+    load_cbdd_graph()
+    df_enriched, person_edges = enrich_dataframe_from_graph(
+        inputs['fetch']['paintings_raw'].copy(), return_person_edges=True)
+    
+    # enrich_dataframe_from_graph populates 'room' and 'building' names;
+    # we need the actual node IDs for foreign keys
+    def get_room_id_from_cbdd(cbdd_id):
+        """Get room node ID: the painting's PART parent (PART links go parent → child)."""
+        if not cbdd_id:
+            return None
+        rooms = parents(cbdd_id, 'PART', node_type='OBJECT_ROOM')
+        return rooms[0]['id'] if rooms else None
+    
+    def get_building_id_from_cbdd(cbdd_id):
+        """Get building node ID by traversing PART links (painting -> room -> building)."""
+        if not cbdd_id:
+            return None
+        building = _traverse_to_building(cbdd_id)
+        # _traverse_to_building returns the full node dict, extract just the ID
+        return building['id'] if building else None
+    
+    # Add foreign key IDs
+    df_enriched['room_id'] = df_enriched['cbdd_id'].apply(get_room_id_from_cbdd)
+    df_enriched['building_id'] = df_enriched['cbdd_id'].apply(get_building_id_from_cbdd)
+    
+    # Add _name versions of the 'room' and 'building' columns for clarity
+    df_enriched['room_name'] = df_enriched['room']
+    df_enriched['building_name'] = df_enriched['building']
+    return {'enriched': df_enriched, 'person_edges': person_edges}
+
+
+def _stage_coordinates(inputs: dict, params: dict) -> Dict[str, pd.DataFrame]:
+    print("📍 Enriching coordinates...")
+    df = enrich_coordinates(inputs['enrich']['enriched'].copy())
+    has_coords = df[['lat', 'lon']].notna().all(axis=1).sum()
+    print(f"   ✓ {has_coords:,}/{len(df):,} paintings have coordinates ({100*has_coords/len(df):.1f}%)")
+    return {'enriched': df}
+
+
+def _extract_subject_uris(subjects_str) -> List[str]:
+    """ICONCLASS/AAT URIs from the pipe-separated 'subjects' column."""
+    if pd.isna(subjects_str) or not subjects_str:
+        return []
+    uris = []
+    for uri in str(subjects_str).split('|'):
+        uri = uri.strip()
+        if uri and ('iconclass.org' in uri or 'vocab.getty.edu' in uri):
+            uris.append(uri)
+    return uris
+
+
+def _stage_subjects(inputs: dict, params: dict) -> Dict[str, pd.DataFrame]:
+    # Only the subject columns - joined back by row position in 'junctions'
+    df = inputs['enrich']['enriched'][['painting', 'subjects']].copy()
+    if params['skip_subject_resolution']:
+        print("⏭ Skipping subject resolution")
+        df['subject_uris'] = [[] for _ in range(len(df))]
+        df['subjects_resolved'] = [[] for _ in range(len(df))]
+    else:
+        print("📖 Resolving subjects (ICONCLASS/AAT)...")
+        df['subject_uris'] = df['subjects'].apply(_extract_subject_uris)
+        df = batch_resolve_subjects(df, uri_column='subject_uris')
+    return {'subjects': df[['painting', 'subject_uris', 'subjects_resolved']]}
+
+
+def _final_paintings_frame(inputs: dict) -> pd.DataFrame:
+    """Coordinates-enriched paintings with the resolved subjects joined back."""
+    df = inputs['coordinates']['enriched'].copy()
+    subjects = inputs['subjects']['subjects']
+    df['subject_uris'] = subjects['subject_uris'].values
+    df['subjects_resolved'] = subjects['subjects_resolved'].values
+    return df
+
+
+def _stage_entities(inputs: dict, params: dict) -> Dict[str, pd.DataFrame]:
+    print("📊 Extracting entity tables from CbDD graph...")
+    load_cbdd_graph()
+    names = ['persons', 'buildings', 'rooms', 'ensembles']
+    workers = params['parallel_workers']
+    if workers is None or workers > 1:
+        extracted = extract_tables_parallel(None, max_workers=workers, names=names)
+        return {name: extracted[name].to_pandas() for name in names}
+    return {
+        'persons': extract_persons_table(),
+        'buildings': extract_buildings_table(),
+        'rooms': extract_rooms_table(),
+        'ensembles': extract_ensembles_table(),
+    }
+
+
+def _stage_junctions(inputs: dict, params: dict) -> Dict[str, pd.DataFrame]:
+    print("📊 Extracting junction tables...")
+    df_final = _final_paintings_frame(inputs)
+    person_edges = inputs['enrich']['person_edges']
+    workers = params['parallel_workers']
+    if workers is None or workers > 1:
+        names = ['painting_persons', 'painting_subjects', 'building_persons', 'room_persons']
+        extracted = {name: table.to_pandas() for name, table in
+                     extract_tables_parallel(df_final, person_edges, max_workers=workers, names=names).items()}
+    else:
+        extracted = {
+            'painting_persons': extract_painting_persons_junction(df_final, person_edges),
+            'painting_subjects': extract_painting_subjects_junction(df_final),
+            'building_persons': extract_building_persons_junction(),
+            'room_persons': extract_room_persons_junction(),
+        }
+    extracted['subjects'] = extract_subjects_table(extracted['painting_subjects'])
+    return extracted
+
+
+def _stage_export(inputs: dict, params: dict) -> Dict[str, pd.DataFrame]:
+    print("💾 Exporting to Parquet files...")
+    tables = {'paintings': create_paintings_table(_final_paintings_frame(inputs))}
+    tables.update(inputs['entities'])
+    junctions = inputs['junctions']
+    for name in ['painting_persons', 'painting_subjects', 'subjects', 'building_persons', 'room_persons']:
+        tables[name] = junctions[name]
+    
+    os.makedirs(parquet.PARQUET_OUTPUT_DIR, exist_ok=True)
+    metadata = {'source_feed': CBDD_FEED_URI, 'pipeline_params': params}
+    if params.get('incremental'):
+        apply_upsert(tables, metadata=metadata)
+        return tables
+    for table_name, df in tables.items():
+        save_parquet_with_metadata(df, table_name, metadata)
+    return tables
+
+
+EXPORT_PIPELINE_STAGES = {
+    'fetch': {'deps': [], 'run': _stage_fetch, 'params': ['batch_size', 'max_paintings'],
+              'external': _fetch_run_date},
+    'enrich': {'deps': ['fetch'], 'run': _stage_enrich, 'external': _graph_file_hash},
+    'coordinates': {'deps': ['enrich'], 'run': _stage_coordinates,
+                    'external': lambda: hash_file(coordinates.GAZETTEER_PATH)},
+    'subjects': {'deps': ['enrich'], 'run': _stage_subjects, 'params': ['skip_subject_resolution']},
+    'entities': {'deps': [], 'run': _stage_entities, 'external': _graph_file_hash},
+    'junctions': {'deps': ['enrich', 'coordinates', 'subjects'], 'run': _stage_junctions},
+    'export': {'deps': ['coordinates', 'subjects', 'entities', 'junctions'],
+               'run': _stage_export, 'cache': False},
+}
+
+
+def run_parquet_export_pipeline(
+    batch_size: int = 500,
+    max_paintings: int = None,
+    skip_subject_resolution: bool = False,
+    parallel_workers: int = 1,
+    resume: bool = True,
+    force_stages: List[str] = None,
+    max_concurrent_stages: int = 2,
+    checkpoint_dir: str = PIPELINE_CHECKPOINT_DIR,
+    profile: bool = False,
+    partitioned: bool = False,
+    incremental: bool = False,
+) -> dict:
+    """
+    Run the complete Parquet export pipeline.
+    
+    Args:
+        batch_size: Number of paintings per SPARQL query batch
+        max_paintings: Maximum paintings to fetch (None = all)
+        skip_subject_resolution: Skip ICONCLASS/AAT resolution (faster)
+        parallel_workers: Processes for the entity/junction extractors (1 = sequential,
+                          None = CPU count), see extract_tables_parallel()
+        resume: Reuse completed stage checkpoints (False = recompute everything);
+                the fetch checkpoint is only reused on the day it was written
+        force_stages: Stages to recompute even if unchanged, e.g. ['fetch'] to
+                      re-query SPARQL; downstream stages re-run only if the data changed
+        max_concurrent_stages: Independent stages run at the same time
+        checkpoint_dir: Directory for the stage artifacts
+        profile: Add a per-stage cProfile breakdown to the run report
+        partitioned: Also write paintings and their junctions as a Hive-partitioned
+                     dataset (location_state / decade), see write_partitioned_dataset()
+        incremental: Write only inserted/updated rows and tombstones of deleted keys
+                     as delta files, plus a change log of the run, see apply_upsert()
+    
+    The run report (per-stage timings, memory, rows, requests, bytes, retries,
+    cache hit rates) is written as JSON next to the Parquet files.
+    
+    Returns:
+        Dictionary with all DataFrames: {'paintings': df, 'persons': df, ...}
+    """
+    print("=" * 70)
+    print("PARQUET DATABASE EXPORT PIPELINE")
+    print("=" * 70)
+    
+    if parallel_workers is None or parallel_workers > 1:
+        # Process pools fork the kernel - don't fork while other stage threads run
+        max_concurrent_stages = 1
+    
+    params = {
+        'batch_size': batch_size,
+        'max_paintings': max_paintings,
+        'skip_subject_resolution': skip_subject_resolution,
+        'parallel_workers': parallel_workers,
+        'incremental': incremental,
+    }
+    report = {
+        'pipeline': 'export',
+        'started_at': datetime.now().isoformat(),
+        'params': {**params, 'resume': resume, 'force_stages': force_stages,
+                   'max_concurrent_stages': max_concurrent_stages},
+        'status': 'failed',
+    }
+    run_start = time.perf_counter()
+    try:
+        results = run_stage_dag(EXPORT_PIPELINE_STAGES, params, checkpoint_dir=checkpoint_dir,
+                                resume=resume, force=force_stages,
+                                max_concurrent=max_concurrent_stages,
+                                report=report, profile=profile)
+        report['status'] = 'completed'
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return {}
+    finally:
+        report['wall_s'] = round(time.perf_counter() - run_start, 3)
+        report_path = write_run_report(report)
+    tables = results['export']
+    if partitioned:
+        write_partitioned_dataset()
+    
+    # Summary
+    print("\n" + "=" * 70)
+    print("✅ PIPELINE COMPLETE")
+    print("=" * 70)
+    print(f"\nOutput directory: {parquet.PARQUET_OUTPUT_DIR}")
+    print("\nTable Summary:")
+    print("-" * 50)
+    for name, df in tables.items():
+        print(f"   {name:25} {len(df):>8,} rows, {len(df.columns):>3} cols")
+    
+    total_rows = sum(len(df) for df in tables.values())
+    print("-" * 50)
+    print(f"   {'TOTAL':25} {total_rows:>8,} rows")
+    
+    print(f"\n⏱ Stage report ({report['wall_s']:.1f}s total) → {os.path.basename(report_path)}")
+    print(run_report_summary(report).to_string(index=False))
+    
+    return tables
+
+
+# =============================================================================
+# Streaming Mode: Constant-Memory Export in Chunks
+# =============================================================================
+# run_parquet_export_pipeline() holds the whole feed in memory several times
+# (raw pages, enriched frame, resolved subjects) and writes at the end.  The
+# streaming mode runs the same stage functions on one SPARQL page at a time:
+#
+#   fetch page -> enrich -> coordinates -> subjects -> paintings/junction rows
+#              -> appended as one Parquet row group per table
+#
+# Only the current chunk is in memory, plus what is bounded by the graph and
+# the vocabularies rather than by the feed: the graph-only entity tables
+# (written once up front) and the unique subjects (written at the end).
+# Per-phase metrics are summed over the chunks into the usual run report, so
+# diff_run_reports() can compare a streaming run with a batch run.
+
+STREAMING_CHUNK_TABLES = ['paintings', 'painting_persons', 'painting_subjects']
+
+
+def _process_painting_chunk(df_page: pd.DataFrame, params: dict, stage_reports: dict,
+                            profile: bool = False) -> Dict[str, pd.DataFrame]:
+    """Run enrich -> coordinates -> subjects -> chunk tables on one page, measuring each phase."""
+    inputs = {'fetch': {'paintings_raw': df_page}}
+    for name, run in [('enrich', _stage_enrich), ('coordinates', _stage_coordinates),
+                      ('subjects', _stage_subjects)]:
+        deps = EXPORT_PIPELINE_STAGES[name]['deps']
+        tables, metrics = _measure_stage(lambda: run({dep: inputs[dep] for dep in deps}, params), profile)
+        _merge_stage_metrics(stage_reports, name, metrics,
+                             rows_in=sum(_count_rows(inputs[dep]) for dep in deps),
+                             rows_out=_count_rows(tables))
+        inputs[name] = tables
+
+    def chunk_tables() -> Dict[str, pd.DataFrame]:
+        df_final = _final_paintings_frame(inputs)
+        return {
+            'paintings': create_paintings_table(df_final),
+            'painting_persons': extract_painting_persons_junction(df_final, inputs['enrich']['person_edges']),
+            'painting_subjects': extract_painting_subjects_junction(df_final),
+        }
+
+    tables, metrics = _measure_stage(chunk_tables, profile)
+    _merge_stage_metrics(stage_reports, 'junctions', metrics,
+                         rows_in=len(df_page), rows_out=_count_rows(tables))
+    return tables
+
+
+def run_parquet_export_streaming(
+    chunk_size: int = 500,
+    max_paintings: int = None,
+    skip_subject_resolution: bool = False,
+    verbose: bool = False,
+    profile: bool = False,
+    partitioned: bool = False,
+) -> Dict[str, int]:
+    """
+    Run the Parquet export in constant memory, one chunk of paintings at a time.
+
+    Produces the same tables as run_parquet_export_pipeline(); every chunk is
+    appended to the paintings / painting_persons / painting_subjects files as
+    one Parquet row group.  There are no stage checkpoints in this mode.
+
+    Args:
+        chunk_size: Paintings per chunk (= SPARQL page size and row group size)
+        max_paintings: Maximum paintings to fetch (None = all)
+        skip_subject_resolution: Skip ICONCLASS/AAT resolution (faster)
+        verbose: Print the full log of every chunk (default: one line per chunk)
+        profile: Add a per-phase cProfile breakdown to the run report
+        partitioned: Also write the Hive-partitioned dataset, see write_partitioned_dataset()
+
+    Returns:
+        dict table name -> rows written
+    """
+    print("=" * 70)
+    print("PARQUET DATABASE EXPORT PIPELINE (STREAMING)")
+    print("=" * 70)
+    
+    params = {
+        'batch_size': chunk_size,
+        'max_paintings': max_paintings,
+        'skip_subject_resolution': skip_subject_resolution,
+        'parallel_workers': 1,
+    }
+    report = {
+        'pipeline': 'export_streaming',
+        'started_at': datetime.now().isoformat(),
+        'params': {**params, 'chunk_size': chunk_size},
+        'status': 'failed',
+        'chunks': [],
+    }
+    stage_reports = report['stages'] = {}
+    subjects = {}  # subject_uri -> row; bounded by the vocabularies, not the feed
+    run_start = time.perf_counter()
+    
+    load_cbdd_graph()
+    os.makedirs(parquet.PARQUET_OUTPUT_DIR, exist_ok=True)
+    try:
+        with ParquetChunkWriter(metadata={'source_feed': CBDD_FEED_URI, 'pipeline_params': params}) as writer:
+            # Graph-only tables do not depend on the feed - write them once
+            print("📊 Extracting entity tables from CbDD graph...")
+            entities, metrics = _measure_stage(lambda: {
+                **_stage_entities({}, params),
+                'building_persons': extract_building_persons_junction(),
+                'room_persons': extract_room_persons_junction(),
+            }, profile)
+            _merge_stage_metrics(stage_reports, 'entities', metrics, rows_in=0, rows_out=_count_rows(entities))
+            for table_name, df in entities.items():
+                writer.write(table_name, df)
+            del entities
+            
+            print(f"\n📥 Streaming paintings in chunks of {chunk_size}...")
+            pages = iter_painting_pages(chunk_size, max_paintings, verbose=verbose)
+            while True:
+                chunk_start = time.perf_counter()
+                df_page, metrics = _measure_stage(lambda: next(pages, None), profile)
+                if df_page is None:
+                    break
+                _merge_stage_metrics(stage_reports, 'fetch', metrics, rows_in=0, rows_out=len(df_page))
+                
+                log = io.StringIO()
+                with (contextlib.nullcontext() if verbose else contextlib.redirect_stdout(log)):
+                    tables = _process_painting_chunk(df_page, params, stage_reports, profile)
+                
+                _, metrics = _measure_stage(lambda: [writer.write(table_name, tables[table_name])
+                                                     for table_name in STREAMING_CHUNK_TABLES], profile)
+                _merge_stage_metrics(stage_reports, 'export', metrics,
+                                     rows_in=_count_rows(tables), rows_out=_count_rows(tables))
+                for row in tables['painting_subjects'].itertuples(index=False):
+                    subjects.setdefault(row.subject_uri, {'subject_uri': row.subject_uri,
+                                                          'subject_label': row.subject_label,
+                                                          'subject_source': row.subject_source})
+                
+                chunk = {
+                    'chunk': len(report['chunks']) + 1,
+                    'paintings': len(df_page),
+                    'seconds': round(time.perf_counter() - chunk_start, 3),
+                    'peak_rss_mb': _peak_rss_mb(),
+                }
+                report['chunks'].append(chunk)
+                print(f"   Chunk {chunk['chunk']:3d}: {len(df_page):4d} paintings, "
+                      f"{len(tables['painting_persons']):5d} person links, "
+                      f"{len(tables['painting_subjects']):5d} subject links "
+                      f"({chunk['seconds']:.1f}s, peak RSS {chunk['peak_rss_mb']} MB)")
+                del df_page, tables
+            
+            if not writer.rows.get('paintings'):
+                raise RuntimeError("No paintings fetched!")
+            
+            print(f"   ✓ Extracted {len(subjects):,} unique subjects")
+            writer.write('subjects', pd.DataFrame(list(subjects.values()),
+                                                  columns=['subject_uri', 'subject_label', 'subject_source']))
+        report['status'] = 'completed'
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return {}
+    finally:
+        report['wall_s'] = round(time.perf_counter() - run_start, 3)
+        report_path = write_run_report(report)
+    if partitioned:
+        write_partitioned_dataset()
+    
+    print("\n" + "=" * 70)
+    print("✅ STREAMING PIPELINE COMPLETE")
+    print("=" * 70)
+    print(f"\nOutput directory: {parquet.PARQUET_OUTPUT_DIR}")
+    print("\nTable Summary:")
+    print("-" * 50)
+    for name, rows in writer.rows.items():
+        print(f"   {name:25} {rows:>8,} rows")
+    print("-" * 50)
+    print(f"   {'TOTAL':25} {sum(writer.rows.values()):>8,} rows")
+    
+    print(f"\n⏱ Stage report ({report['wall_s']:.1f}s total, {len(report['chunks'])} chunks) "
+          f"→ {os.path.basename(report_path)}")
+    print(run_report_summary(report).to_string(index=False))
+    
+    return dict(writer.rows)
+
+
+# =============================================================================
+# Verification and Quality Checks
+# =============================================================================
+
+def verify_parquet_database():
+    """
+    Verify the exported Parquet database integrity and show statistics.
+    """
+    print("=" * 70)
+    print("PARQUET DATABASE VERIFICATION")
+    print("=" * 70)
+    
+    # Load all tables
+    table_names = [
+        'paintings', 'persons', 'buildings', 'rooms', 'ensembles',
+        'painting_persons', 'painting_subjects', 'subjects',
+        'building_persons', 'room_persons'
+    ]
+    
+    loaded_tables = {}
+    export_dates = set()
+    
+    print("\n📊 Table Statistics:")
+    print("-" * 60)
+    
+    for name in table_names:
+        try:
+            df = load_parquet_table(name)
+            loaded_tables[name] = df
+            nulls = df.isnull().sum().sum()
+            print(f"   {name:25} {len(df):>8,} rows, {len(df.columns):>3} cols, {nulls:>6,} nulls")
+            if len(df.columns):
+                export_dates.add(read_parquet_metadata(name).get('export_date', 'unknown')[:19])
+        except FileNotFoundError:
+            print(f"   {name:25} ❌ NOT FOUND")
+    
+    if export_dates:
+        print(f"   Exported: {', '.join(sorted(export_dates))}")
+    
+    # Referential Integrity Checks
+    print("\n\n🔗 Referential Integrity Checks:")
+    print("-" * 60)
+    
+    if 'paintings' in loaded_tables and 'painting_persons' in loaded_tables:
+        pp = loaded_tables['painting_persons']
+        p = loaded_tables['paintings']
+        
+        # Check painting URIs in junction exist in paintings (use nfdi_uri or painting_uri)
+        uri_col_pp = 'nfdi_uri' if 'nfdi_uri' in pp.columns else 'painting_uri'
+        uri_col_p = 'nfdi_uri' if 'nfdi_uri' in p.columns else 'painting_uri'
+        if uri_col_pp in pp.columns and uri_col_p in p.columns:
+            pp_uris = set(pp[uri_col_pp].dropna())
+            p_uris = set(p[uri_col_p].dropna())
+            orphan_pp = pp_uris - p_uris
+            print(f"   painting_persons → paintings: {len(pp_uris - orphan_pp):,} valid, {len(orphan_pp):,} orphan")
+    
+    if 'painting_persons' in loaded_tables and 'persons' in loaded_tables:
+        pp = loaded_tables['painting_persons']
+        pers = loaded_tables['persons']
+        
+        if 'person_id' in pp.columns and 'person_id' in pers.columns:
+            pp_pids = set(pp['person_id'].dropna())
+            pers_pids = set(pers['person_id'].dropna())
+            orphan_pers = pp_pids - pers_pids
+            print(f"   painting_persons → persons: {len(pp_pids - orphan_pers):,} valid, {len(orphan_pers):,} orphan")
+    
+    if 'paintings' in loaded_tables and 'buildings' in loaded_tables:
+        paint = loaded_tables['paintings']
+        build = loaded_tables['buildings']
+        
+        if 'building_id' in paint.columns and 'building_id' in build.columns:
+            p_bids = set(paint['building_id'].dropna())
+            b_bids = set(build['building_id'].dropna())
+            matched = p_bids & b_bids
+            print(f"   paintings → buildings: {len(matched):,} matched, {len(p_bids - b_bids):,} unmatched")
+    
+    # Coverage Statistics
+    print("\n\n📈 Coverage Statistics:")
+    print("-" * 60)
+    
+    if 'paintings' in loaded_tables:
+        df = loaded_tables['paintings']
+        total = len(df)
+        
+        coverage = {}
+        # Check for NFDI URI (should always be present as primary key)
+        if 'nfdi_uri' in df.columns:
+            coverage['Has NFDI URI (primary)'] = df['nfdi_uri'].notna().sum()
+        if 'cbdd_painting_id' in df.columns:
+            coverage['CbDD Graph Match'] = df['cbdd_painting_id'].notna().sum()
+        if 'building_id' in df.columns:
+            coverage['Has Building'] = df['building_id'].notna().sum()
+        if 'room_id' in df.columns:
+            coverage['Has Room'] = df['room_id'].notna().sum()
+        if 'lat' in df.columns:
+            coverage['Has Coordinates'] = df['lat'].notna().sum()
+        if 'location_state' in df.columns:
+            coverage['Has Location State'] = df['location_state'].notna().sum()
+        
+        for metric, count in coverage.items():
+            pct = 100 * count / total if total > 0 else 0
+            print(f"   {metric:25} {count:>6,} / {total:,} ({pct:.1f}%)")
+    
+    if 'painting_persons' in loaded_tables:
+        pp = loaded_tables['painting_persons']
+        if 'role' in pp.columns:
+            print("\n   Role Distribution (painting_persons):")
+            for role, count in pp['role'].value_counts().head(5).items():
+                print(f"      {role:20} {count:>6,}")
+    
+    # Sample SPARQL Reconstruction Query
+    print("\n\n🔍 Sample SPARQL Reconstruction (using NFDI4Culture URI):")
+    print("-" * 60)
+    if 'paintings' in loaded_tables:
+        df = loaded_tables['paintings']
+        uri_col = 'nfdi_uri' if 'nfdi_uri' in df.columns else 'painting_uri'
+        if uri_col in df.columns and len(df) > 0:
+            sample_uri = df[uri_col].iloc[0]
+            print(f"   Primary source: NFDI4Culture Knowledge Graph")
+            print(f"   To fetch original painting from SPARQL:")
+            print(f"   SELECT * WHERE {{ <{sample_uri}> ?p ?o }}")
+    
+    return loaded_tables
@@ -0,0 +1,1181 @@
+"""CbDD graph loader (graphData.json): indices, traversal and painting enrichment."""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Optional, Dict, List, Any
+from collections import defaultdict
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# CbDD Graph Data Loader (Enhanced)
+# =============================================================================
+# Loads the pre-exported CbDD graph data (graphData.json) and provides
+# comprehensive functions to enrich painting data with:
+#   - People: painters, commissioners, architects, plasterers, sculptors, etc.
+#   - Locations: room → building → state hierarchy
+#   - Building metadata: function, architects, commissioners
+#   - Relationships: painter networks, template providers
+#
+# Link types extracted: PAINTERS, COMMISSIONERS, ARCHITECTS, PLASTERERS,
+#   SCULPTORS, DESIGNERS, TEMPLATE_PROVIDERS, BUILDERS, FUNCTION, LOCATION,
+#   DATE, METHOD, MATERIAL, PART, and more.
+
+
+
+# =============================================================================
+# Load and Parse CbDD Graph
+# =============================================================================
+CBDD_GRAPH_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'graphData.json')
+
+# Global cache for the graph data and indices
+_cbdd_graph = None
+_cbdd_nodes_by_id = None
+_cbdd_nodes_by_name = None
+_cbdd_paintings_by_name = None
+_cbdd_links_by_source = None
+_cbdd_links_by_target = None
+_cbdd_out_adjacency = None   # (node_id, link_type) -> tuple of target ids
+_cbdd_in_adjacency = None    # (node_id, link_type) -> tuple of source ids
+_cbdd_buildings_by_name = None
+_cbdd_painter_to_paintings = None
+_cbdd_painter_ranking = None   # (name, painting count), most prolific first
+_cbdd_graph_loaded = False
+_cbdd_graph_lock = threading.RLock()   # one load at a time (pipeline stages run in threads)
+
+# Normalized painting-name index for fuzzy matching:
+#   _cbdd_paintings_by_norm_name: normalized name -> [painting nodes]
+#   _cbdd_name_trigrams:          trigram -> set of normalized names
+#   _cbdd_name_trigram_sizes:     normalized name -> number of trigrams
+#   _cbdd_ancestor_names:         painting_id -> tuple of normalized ancestor names
+_cbdd_paintings_by_norm_name = None
+_cbdd_name_trigrams = None
+_cbdd_name_trigram_sizes = None
+_cbdd_ancestor_names = None
+
+# Minimum trigram (Dice) similarity for a fuzzy painting-name match
+FUZZY_NAME_MIN_SIMILARITY = 0.85
+
+# Sparse painting x {painter, commissioner, building} incidence matrices,
+# built lazily by build_painter_incidence_matrices()
+_cbdd_incidence = None
+
+# Painting -> person link types: link type -> (junction role, enrichment column)
+PAINTING_PERSON_ROLES = {
+    'PAINTERS': ('PAINTER', 'painters'),
+    'COMMISSIONERS': ('COMMISSIONER', 'commissioners'),
+    'ARCHITECTS': ('ARCHITECT', 'architects'),
+    'PLASTERERS': ('PLASTERER', 'plasterers'),
+    'SCULPTORS': ('SCULPTOR', 'sculptors'),
+    'DESIGNERS': ('DESIGNER', 'designers'),
+    'TEMPLATE_PROVIDERS': ('TEMPLATE_PROVIDER', 'template_providers'),
+    'ARTISTS': ('OTHER_ARTIST', 'other_artists'),
+    'IMAGE_CARVERS': ('OTHER_ARTIST', 'other_artists'),
+    'CABINETMAKERS': ('OTHER_ARTIST', 'other_artists'),
+    'CARPENTERS': ('OTHER_ARTIST', 'other_artists'),
+    'REFERENCE_PERSONS': ('REFERENCE_PERSON', 'reference_persons'),
+    'DONORS': ('DONOR', 'donors'),
+}
+PAINTING_PERSON_COLUMNS = list(dict.fromkeys(col for _, col in PAINTING_PERSON_ROLES.values()))
+
+# Per-entity attribute records (building_id / room_id -> read-only record).
+# Filled lazily by get_building_info() / get_room_info() and cleared whenever
+# the graph is (re)loaded, so every caller shares one derivation per entity.
+_cbdd_building_info_cache = {}
+_cbdd_room_info_cache = {}
+
+def load_cbdd_graph(force_reload: bool = False) -> dict:
+    """
+    Load the CbDD graph data from graphData.json and build lookup indices.
+    
+    Thread-safe: concurrent callers wait for a load in progress instead of
+    rebuilding the indices (and clearing the attribute caches) under each other.
+    
+    Returns:
+        dict with 'nodes', 'links', 'exportDate' and lookup indices
+    """
+    if _cbdd_graph_loaded and not force_reload:
+        return _cbdd_graph
+    with _cbdd_graph_lock:
+        # Another thread may have finished loading while this one waited
+        if _cbdd_graph_loaded and not force_reload:
+            return _cbdd_graph
+        return _load_cbdd_graph()
+
+
+def _load_cbdd_graph() -> dict:
+    """Read CBDD_GRAPH_PATH and rebuild all indices (caller holds _cbdd_graph_lock)."""
+    global _cbdd_graph, _cbdd_nodes_by_id, _cbdd_nodes_by_name
+    global _cbdd_paintings_by_name, _cbdd_links_by_source, _cbdd_links_by_target
+    global _cbdd_out_adjacency, _cbdd_in_adjacency
+    global _cbdd_buildings_by_name, _cbdd_painter_to_paintings, _cbdd_painter_ranking, _cbdd_graph_loaded
+    global _cbdd_paintings_by_norm_name, _cbdd_name_trigrams, _cbdd_name_trigram_sizes
+    global _cbdd_ancestor_names, _cbdd_incidence
+    
+    print(f"📥 Loading CbDD graph data from {CBDD_GRAPH_PATH}...")
+    
+    try:
+        with open(CBDD_GRAPH_PATH, encoding='utf-8') as f:
+            _cbdd_graph = json.load(f)
+        
+        # Build lookup indices for fast access
+        _cbdd_nodes_by_id = {n['id']: n for n in _cbdd_graph['nodes']}
+        
+        # Build name lookup (case-insensitive, normalized)
+        _cbdd_nodes_by_name = {}
+        for n in _cbdd_graph['nodes']:
+            name = n.get('name', '').strip()
+            if name:
+                key = name.lower()
+                if key not in _cbdd_nodes_by_name:
+                    _cbdd_nodes_by_name[key] = []
+                _cbdd_nodes_by_name[key].append(n)
+        
+        # Build painting-specific lookup by exact name
+        _cbdd_paintings_by_name = {}
+        paintings = [n for n in _cbdd_graph['nodes'] if n.get('type') == 'OBJECT_PAINTING']
+        for p in paintings:
+            name = p.get('name', '').strip()
+            if name:
+                if name not in _cbdd_paintings_by_name:
+                    _cbdd_paintings_by_name[name] = []
+                _cbdd_paintings_by_name[name].append(p)
+        
+        # Build building lookup by name
+        _cbdd_buildings_by_name = {}
+        buildings = [n for n in _cbdd_graph['nodes'] if n.get('type') == 'OBJECT_BUILDING']
+        for b in buildings:
+            name = b.get('name', '').strip()
+            if name:
+                _cbdd_buildings_by_name[name] = b
+        
+        # Build links index by source AND target for fast lookup
+        _cbdd_links_by_source = {}
+        _cbdd_links_by_target = {}
+        for link in _cbdd_graph['links']:
+            src, tgt = link['source'], link['target']
+            if src not in _cbdd_links_by_source:
+                _cbdd_links_by_source[src] = []
+            _cbdd_links_by_source[src].append(link)
+            if tgt not in _cbdd_links_by_target:
+                _cbdd_links_by_target[tgt] = []
+            _cbdd_links_by_target[tgt].append(link)
+        
+        # Type-partitioned adjacency: one contiguous tuple per (node, link type),
+        # in link order, queried through neighbors() / parents() / follow()
+        out_adjacency = defaultdict(list)
+        in_adjacency = defaultdict(list)
+        for link in _cbdd_graph['links']:
+            out_adjacency[(link['source'], link['type'])].append(link['target'])
+            in_adjacency[(link['target'], link['type'])].append(link['source'])
+        _cbdd_out_adjacency = {key: tuple(ids) for key, ids in out_adjacency.items()}
+        _cbdd_in_adjacency = {key: tuple(ids) for key, ids in in_adjacency.items()}
+        
+        # Build painter -> paintings index for network analysis
+        _cbdd_painter_to_paintings = defaultdict(list)
+        for link in _cbdd_graph['links']:
+            if link['type'] == 'PAINTERS':
+                painter_id = link['target']
+                painting_id = link['source']
+                painter = _cbdd_nodes_by_id.get(painter_id)
+                painting = _cbdd_nodes_by_id.get(painting_id)
+                if painter and painting:
+                    _cbdd_painter_to_paintings[painter.get('name', '')].append({
+                        'id': painting_id,
+                        'name': painting.get('name', '')
+                    })
+        # Painter ranking, materialized once per graph load for get_top_painters()
+        _cbdd_painter_ranking = sorted(((name, len(works)) for name, works in _cbdd_painter_to_paintings.items()),
+                                       key=lambda x: -x[1])
+        
+        # Build normalized name + trigram index and precompute ancestor names
+        _cbdd_paintings_by_norm_name = {}
+        _cbdd_name_trigrams = defaultdict(set)
+        _cbdd_name_trigram_sizes = {}
+        for key, nodes in _cbdd_paintings_by_name.items():
+            norm = normalize_name(key)
+            if not norm:
+                continue
+            _cbdd_paintings_by_norm_name.setdefault(norm, []).extend(nodes)
+            grams = _name_trigrams(norm)
+            _cbdd_name_trigram_sizes[norm] = len(grams)
+            for gram in grams:
+                _cbdd_name_trigrams[gram].add(norm)
+        _cbdd_ancestor_names = {
+            p['id']: tuple(normalize_name(n) for n in _get_cbdd_parent_names(p['id']))
+            for p in paintings
+        }
+        
+        # Drop attribute records derived from the previous graph
+        _cbdd_building_info_cache.clear()
+        _cbdd_room_info_cache.clear()
+        _cbdd_incidence = None
+        
+        _cbdd_graph_loaded = True
+        
+        # Statistics
+        node_types = {}
+        link_types = {}
+        for n in _cbdd_graph['nodes']:
+            t = n.get('type', 'UNKNOWN')
+            node_types[t] = node_types.get(t, 0) + 1
+        for l in _cbdd_graph['links']:
+            t = l['type']
+            link_types[t] = link_types.get(t, 0) + 1
+        
+        print(f"   ✓ Loaded {len(_cbdd_graph['nodes']):,} nodes, {len(_cbdd_graph['links']):,} links")
+        print(f"   ✓ Export date: {_cbdd_graph.get('exportDate', 'unknown')}")
+        print(f"\n   Node types:")
+        for t, count in sorted(node_types.items(), key=lambda x: -x[1])[:8]:
+            print(f"      {t}: {count:,}")
+        print(f"\n   Key link types:")
+        for t in ['PAINTERS', 'COMMISSIONERS', 'ARCHITECTS', 'FUNCTION', 'LOCATION', 'PART', 'TEMPLATE_PROVIDERS']:
+            print(f"      {t}: {link_types.get(t, 0):,}")
+        print(f"\n   ✓ Indices built: {len(_cbdd_paintings_by_name):,} paintings, {len(_cbdd_buildings_by_name):,} buildings")
+        print(f"   ✓ Painter network: {len(_cbdd_painter_to_paintings):,} painters tracked")
+        
+        return _cbdd_graph
+        
+    except FileNotFoundError:
+        print(f"   ⚠ {CBDD_GRAPH_PATH} not found! Download graphData.json from the CbDD portal.")
+        _cbdd_graph_loaded = False
+        return None
+    except Exception as e:
+        print(f"   ⚠ Error loading graph: {e}")
+        _cbdd_graph_loaded = False
+        return None
+
+
+# =============================================================================
+# Typed Graph Query API (type-partitioned adjacency)
+# =============================================================================
+def _resolve_nodes(node_ids, node_type=None) -> List[Dict]:
+    """Node dicts for ``node_ids`` (unknown IDs dropped), optionally filtered by type."""
+    if isinstance(node_type, str):
+        node_type = (node_type,)
+    nodes = []
+    for node_id in node_ids:
+        node = _cbdd_nodes_by_id.get(node_id)
+        if node and (node_type is None or node.get('type') in node_type):
+            nodes.append(node)
+    return nodes
+
+
+def neighbors(node_id: str, link_type: str, node_type=None) -> List[Dict]:
+    """
+    Outgoing neighbors of a node over one link type, e.g.
+    ``neighbors(painting_id, 'PAINTERS')``.
+    
+    Args:
+        node_id:   Source node UUID
+        link_type: Link type (PAINTERS, FUNCTION, PART, ...)
+        node_type: Optional node type or tuple of types to keep
+    
+    Returns:
+        list of target node dicts, in link order
+    """
+    return _resolve_nodes(_cbdd_out_adjacency.get((node_id, link_type), ()), node_type)
+
+
+def parents(node_id: str, link_type: str = 'PART', node_type=None) -> List[Dict]:
+    """
+    Incoming neighbors of a node over one link type, e.g.
+    ``parents(room_id, 'PART')`` (PART links go parent(source) → child(target)).
+    
+    Args:
+        node_id:   Target node UUID
+        link_type: Link type (default: PART)
+        node_type: Optional node type or tuple of types to keep
+    
+    Returns:
+        list of source node dicts, in link order
+    """
+    return _resolve_nodes(_cbdd_in_adjacency.get((node_id, link_type), ()), node_type)
+
+
+def follow(node_id: str, *steps, node_type=None) -> List[Dict]:
+    """
+    Multi-hop query: apply ``steps`` one after another, each an
+    ``('out' | 'in', link_type)`` tuple, e.g.
+    ``follow(painting_id, ('in', 'PART'), ('in', 'PART'), node_type='OBJECT_BUILDING')``.
+    
+    Returns:
+        unique node dicts reached by the last step (first-seen order),
+        optionally filtered by node_type
+    """
+    frontier = [node_id]
+    for direction, link_type in steps:
+        adjacency = _cbdd_out_adjacency if direction == 'out' else _cbdd_in_adjacency
+        frontier = list(dict.fromkeys(
+            next_id for current in frontier for next_id in adjacency.get((current, link_type), ())
+        ))
+    return _resolve_nodes(frontier, node_type)
+
+
+def ancestors(node_id: str, link_type: str = 'PART', node_type=None, max_depth: int = 10) -> List[Dict]:
+    """
+    All nodes reachable upward over ``link_type`` (breadth-first, nearest
+    first, each node once), optionally filtered by node_type.
+    """
+    found, visited, frontier = [], {node_id}, [node_id]
+    for _ in range(max_depth):
+        next_frontier = []
+        for current in frontier:
+            for parent_id in _cbdd_in_adjacency.get((current, link_type), ()):
+                if parent_id not in visited:
+                    visited.add(parent_id)
+                    next_frontier.append(parent_id)
+        found.extend(next_frontier)
+        frontier = next_frontier
+        if not frontier:
+            break
+    return _resolve_nodes(found, node_type)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a name for matching: casefold, umlauts/ß spelled out,
+    accents stripped, punctuation collapsed to single spaces.
+    
+    e.g. "Würzburg, Residenz – Treppenhaus" -> "wuerzburg residenz treppenhaus"
+    """
+    if not name:
+        return ''
+    text = unicodedata.normalize('NFC', str(name)).casefold()
+    for src, dst in (('ä', 'ae'), ('ö', 'oe'), ('ü', 'ue')):
+        text = text.replace(src, dst)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^\w]+', ' ', text).split())
+
+
+def _name_trigrams(norm_name: str) -> set:
+    """Character trigrams of a normalized name (padded at word boundaries)."""
+    padded = f"  {norm_name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _trigram_similarity(grams_a: set, grams_b: set) -> float:
+    """Dice coefficient between two trigram sets."""
+    if not grams_a or not grams_b:
+        return 0.0
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def _fuzzy_painting_keys(norm_name: str, min_similarity: float = FUZZY_NAME_MIN_SIMILARITY) -> List[str]:
+    """
+    Candidate generation via the trigram inverted index.
+    
+    Returns the normalized painting names with the highest trigram
+    similarity to ``norm_name`` (ties kept, sorted), or [] if none reaches
+    ``min_similarity``.
+    """
+    grams = _name_trigrams(norm_name)
+    shared = defaultdict(int)
+    for gram in grams:
+        for key in _cbdd_name_trigrams.get(gram, ()):
+            shared[key] += 1
+    
+    best_keys, best_score = [], 0.0
+    for key, count in shared.items():
+        score = 2 * count / (len(grams) + _cbdd_name_trigram_sizes[key])
+        if score > best_score:
+            best_keys, best_score = [key], score
+        elif score == best_score:
+            best_keys.append(key)
+    
+    if best_score < min_similarity:
+        return []
+    return sorted(best_keys)
+
+
+def _get_cbdd_parent_names(painting_id: str) -> List[str]:
+    """
+    Get the names of ALL ancestor nodes (room, building, ensemble) for a painting
+    by traversing the PART hierarchy upward.  Used for disambiguation.
+    """
+    return [node.get('name', '') for node in ancestors(painting_id, 'PART') if node.get('name')]
+
+
+def get_painting_from_graph(painting_name: str, parent_label: str = None) -> Optional[Dict]:
+    """
+    Find a painting in the CbDD graph by its name.
+    
+    Lookup order: exact name, normalized name (see ``normalize_name``),
+    then the closest names from the character-trigram index.  Fuzzy hits
+    are only accepted when their numbers equal the query's and `parent_label`
+    confirms them - sibling titles ("..., Szene 1" / "..., Szene 2") are
+    more similar than most typos.
+    
+    When multiple paintings share the same name (e.g. 'Apoll', 'Mars',
+    'Die Nebenbilder'), uses `parent_label` (the SPARQL parentLabel from
+    the CTO_0001019 "is part of" relationship) to disambiguate by matching
+    against the painting's room / building / ensemble hierarchy in the
+    CbDD graph.
+    
+    Args:
+        painting_name:  The painting label (rdfs:label from NFDI4Culture)
+        parent_label:   Optional parent label from SPARQL for disambiguation
+    
+    Returns:
+        The best-matching painting node dict, or None
+    """
+    if not _cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    if not _cbdd_paintings_by_name:
+        return None
+    
+    name = painting_name.strip()
+    
+    # --- locate candidate list: exact, normalized, then trigram fuzzy ---
+    fuzzy = False
+    candidates = _cbdd_paintings_by_name.get(name)
+    if not candidates:
+        norm = normalize_name(name)
+        candidates = _cbdd_paintings_by_norm_name.get(norm)
+        if not candidates and norm:
+            digits = re.findall(r'\d+', norm)
+            candidates = [
+                node
+                for key in _fuzzy_painting_keys(norm)
+                if re.findall(r'\d+', key) == digits
+                for node in _cbdd_paintings_by_norm_name[key]
+            ]
+            fuzzy = True
+    
+    if not candidates:
+        return None
+    
+    # Only one candidate → no ambiguity (a fuzzy hit still needs its parent)
+    if len(candidates) == 1 and not fuzzy:
+        return candidates[0]
+    
+    # --- multiple candidates: disambiguate via parent context ---
+    if parent_label and parent_label.strip():
+        parent_norm = normalize_name(parent_label)
+        parent_grams = _name_trigrams(parent_norm)
+        
+        best_match = None
+        best_score = 0.0
+        
+        for candidate in candidates:
+            for ancestor_norm in _cbdd_ancestor_names.get(candidate['id'], ()):
+                # Exact match with any ancestor
+                if ancestor_norm == parent_norm:
+                    return candidate  # perfect match
+                
+                # Substring containment (e.g. SPARQL parent "Augsburg, Rathaus"
+                # matches CbDD building "Augsburg, Rathaus, Goldener Saal"),
+                # scored by the length of the contained part; otherwise fall
+                # back to trigram similarity (< 1 so containment wins)
+                if parent_norm in ancestor_norm:
+                    score = float(len(parent_norm))
+                elif ancestor_norm in parent_norm:
+                    score = float(len(ancestor_norm))
+                else:
+                    similarity = _trigram_similarity(parent_grams, _name_trigrams(ancestor_norm))
+                    score = similarity if similarity >= 0.5 else 0.0
+                
+                if score > best_score:
+                    best_score = score
+                    best_match = candidate
+        
+        if best_match and best_score > 0:
+            return best_match
+    
+    # No parent context or no match found → return None to avoid
+    # silently assigning the wrong painting's data.
+    # This is safer than returning candidates[0] which caused the
+    # original bug (wrong painter attributions).
+    return None
+
+
+def _freeze_info_record(record: Dict[str, Any]) -> MappingProxyType:
+    """
+    Turn a building/room attribute dict into a read-only record.
+    
+    List values become tuples so that a cached record can be handed to any
+    number of callers without one of them mutating it for the others.
+    """
+    return MappingProxyType({
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in record.items()
+    })
+
+
+def _clean_function_name(func: str) -> str:
+    """Clean up function name (e.g., "Funktion: Kirche -> Abteikirche" -> "Abteikirche")."""
+    if func.startswith('Funktion: '):
+        func = func[10:]
+    if ' -> ' in func:
+        func = func.split(' -> ')[-1]  # Take most specific function
+    return func
+
+
+def get_building_info(building_id: str) -> MappingProxyType:
+    """
+    Extract comprehensive information about a building from the CbDD graph.
+    
+    The record is derived once per building and memoized in
+    ``_cbdd_building_info_cache`` until the graph is reloaded.
+    
+    Args:
+        building_id: The UUID of the building in the CbDD graph
+    
+    Returns:
+        read-only mapping with building details: name, function, location,
+        architects, commissioners, etc. (multi-valued fields are tuples)
+    """
+    if not _cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    cached = _cbdd_building_info_cache.get(building_id)
+    if cached is not None:
+        return cached
+    
+    result = {
+        'building_name': None,
+        'building_id': building_id,
+        'function': None,
+        'location_state': None,
+        'architects': [],
+        'building_commissioners': [],
+        'builders': [],
+        'sculptors': [],
+        'owners': [],
+        'construction_date': None,
+        'ensemble': None,
+        'ensemble_id': None,
+    }
+    
+    building = _cbdd_nodes_by_id.get(building_id)
+    if not building:
+        return _freeze_info_record(result)
+    
+    result['building_name'] = building.get('name')
+    
+    def names(link_type):
+        return [node.get('name', '') for node in neighbors(building_id, link_type)]
+    
+    functions = names('FUNCTION')
+    if functions:
+        result['function'] = _clean_function_name(functions[-1])
+    locations = names('LOCATION')
+    if locations:
+        result['location_state'] = locations[-1]
+    result['architects'] = names('ARCHITECTS')
+    result['building_commissioners'] = names('COMMISSIONERS')
+    result['sculptors'] = names('SCULPTORS')
+    result['owners'] = names('OWNERS')
+    result['builders'] = names('BUILDERS')
+    dates = names('DATE')
+    if dates:
+        # Get construction date (first one)
+        result['construction_date'] = dates[0]
+    
+    # Check if building is part of an ensemble
+    ensembles = parents(building_id, 'PART', node_type='OBJECT_ENSEMBLE')
+    if ensembles:
+        result['ensemble'] = ensembles[0].get('name')
+        result['ensemble_id'] = ensembles[0]['id']
+    
+    record = _freeze_info_record(result)
+    _cbdd_building_info_cache[building_id] = record
+    return record
+
+
+def get_room_info(room_id: str) -> MappingProxyType:
+    """
+    Extract information about a room from the CbDD graph.
+    
+    The record is derived once per room and memoized in
+    ``_cbdd_room_info_cache`` until the graph is reloaded.
+    
+    Args:
+        room_id: The UUID of the room in the CbDD graph
+    
+    Returns:
+        read-only mapping with room details: name, function, architects,
+        commissioners, etc. (multi-valued fields are tuples)
+    """
+    if not _cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    cached = _cbdd_room_info_cache.get(room_id)
+    if cached is not None:
+        return cached
+    
+    result = {
+        'room_name': None,
+        'room_id': room_id,
+        'function': None,
+        'architects': [],
+        'commissioners': [],
+        'plasterers': [],
+        'painters': [],
+        'sculptors': [],
+        'designers': [],
+    }
+    
+    room = _cbdd_nodes_by_id.get(room_id)
+    if not room:
+        return _freeze_info_record(result)
+    
+    result['room_name'] = room.get('name')
+    
+    def names(link_type):
+        return [node.get('name', '') for node in neighbors(room_id, link_type)]
+    
+    functions = names('FUNCTION')
+    if functions:
+        result['function'] = _clean_function_name(functions[-1])
+    result['architects'] = names('ARCHITECTS')
+    result['commissioners'] = names('COMMISSIONERS')
+    result['plasterers'] = names('PLASTERERS')
+    result['painters'] = names('PAINTERS')
+    result['sculptors'] = names('SCULPTORS')
+    result['designers'] = names('DESIGNERS')
+    
+    record = _freeze_info_record(result)
+    _cbdd_room_info_cache[room_id] = record
+    return record
+
+
+def _traverse_to_building(node_id: str, depth: int = 0, max_depth: int = 10) -> Optional[Dict]:
+    """
+    Recursively traverse up the PART hierarchy to find the building.
+    
+    PART links go from PARENT → CHILD (source → target).
+    Hierarchy can be: PAINTING -> ROOM -> ROOM -> ... -> BUILDING -> ENSEMBLE
+    """
+    if depth >= max_depth:
+        return None
+    
+    for parent in parents(node_id, 'PART'):
+        parent_type = parent.get('type', '')
+        
+        if parent_type == 'OBJECT_BUILDING':
+            return parent
+        elif parent_type in ('OBJECT_ROOM', 'OBJECT_ENSEMBLE'):
+            # Continue traversing up
+            found = _traverse_to_building(parent['id'], depth + 1, max_depth)
+            if found:
+                return found
+    
+    return None
+
+
+def _get_painting_building(painting_id: str) -> Optional[Dict]:
+    """
+    Building node of a painting, resolved the same way as in
+    get_painting_relations(): via the first room or building parent.
+    """
+    for parent in parents(painting_id, 'PART', node_type=('OBJECT_ROOM', 'OBJECT_BUILDING')):
+        if parent.get('type') == 'OBJECT_ROOM':
+            return _traverse_to_building(parent['id'])
+        return parent
+    return None
+
+
+def _person_names_by_column(edges: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Group person edges into the enrichment name columns (painters, donors, ...)."""
+    column_of_role = {role: col for role, col in PAINTING_PERSON_ROLES.values()}
+    names = {col: [] for col in PAINTING_PERSON_COLUMNS}
+    for edge in edges:
+        names[column_of_role[edge['role']]].append(edge['person_name'])
+    return names
+
+
+def get_painting_person_edges(painting_id: str) -> List[Dict[str, Any]]:
+    """
+    Long-format person edges of a painting, read directly from its links.
+    
+    Args:
+        painting_id: The UUID of the painting in the CbDD graph
+    
+    Returns:
+        list of dicts with: cbdd_painting_id, person_id, person_name, role
+        (role as in PAINTING_PERSON_ROLES, e.g. 'PAINTER', 'COMMISSIONER')
+    """
+    edges = []
+    for link_type, (role, _) in PAINTING_PERSON_ROLES.items():
+        for target in neighbors(painting_id, link_type):
+            edges.append({
+                'cbdd_painting_id': painting_id,
+                'person_id': target['id'],
+                'person_name': target.get('name', ''),
+                'role': role,
+            })
+    return edges
+
+
+def get_painting_relations(painting_id: str) -> Dict[str, Any]:
+    """
+    Extract ALL relationships for a painting from the CbDD graph.
+    
+    Args:
+        painting_id: The UUID of the painting in the CbDD graph
+    
+    Returns:
+        dict with comprehensive relationship data
+    """
+    if not _cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    result = {
+        # People (from painting directly)
+        'painters': [],
+        'commissioners': [],
+        'architects': [],
+        'plasterers': [],
+        'sculptors': [],
+        'designers': [],
+        'template_providers': [],
+        'other_artists': [],
+        'reference_persons': [],
+        'donors': [],
+        # Long-format (painting, person, role) edges behind the lists above
+        'person_edges': [],
+        # Room data
+        'room': None,
+        'room_id': None,
+        'room_function': None,
+        'room_architects': [],
+        'room_commissioners': [],
+        'room_plasterers': [],
+        'room_painters': [],
+        # Building data
+        'building': None,
+        'building_id': None,
+        'building_function': None,
+        'location_state': None,
+        'building_architects': [],
+        'building_commissioners': [],
+        'building_builders': [],
+        'building_sculptors': [],
+        'building_owners': [],
+        'building_date': None,
+        # Ensemble data
+        'ensemble': None,
+        'ensemble_id': None,
+        # Artwork metadata
+        'date': None,
+        'method': None,
+        'material': None,
+    }
+    
+    if not _cbdd_out_adjacency or not _cbdd_nodes_by_id:
+        return result
+    
+    # People relationships, derived from the person edge list
+    result['person_edges'] = get_painting_person_edges(painting_id)
+    for column, names in _person_names_by_column(result['person_edges']).items():
+        result[column] = names
+    
+    # Metadata (last link of each type wins)
+    for node in neighbors(painting_id, 'DATE'):
+        result['date'] = node.get('name', '')
+    for node in neighbors(painting_id, 'METHOD'):
+        method = node.get('name', '')
+        if method.startswith('Technik: '):
+            method = method[9:]
+        result['method'] = method
+    for node in neighbors(painting_id, 'MATERIAL'):
+        result['material'] = node.get('name', '')
+    
+    def apply_building_info(building_id: str) -> None:
+        """Copy the memoized building record into the painting's result."""
+        building_info = get_building_info(building_id)
+        result['building_function'] = building_info.get('function')
+        result['location_state'] = building_info.get('location_state')
+        result['building_architects'] = list(building_info.get('architects', ()))
+        result['building_commissioners'] = list(building_info.get('building_commissioners', ()))
+        result['building_builders'] = list(building_info.get('builders', ()))
+        result['building_sculptors'] = list(building_info.get('sculptors', ()))
+        result['building_owners'] = list(building_info.get('owners', ()))
+        result['building_date'] = building_info.get('construction_date')
+        result['ensemble'] = building_info.get('ensemble')
+        result['ensemble_id'] = building_info.get('ensemble_id')
+    
+    # Find room/building via PART links: immediate parent (room) first, then
+    # _traverse_to_building() ALL the way up the hierarchy
+    for parent in parents(painting_id, 'PART'):
+        parent_type = parent.get('type', '')
+        
+        if parent_type == 'OBJECT_ROOM':
+            result['room'] = parent.get('name')
+            result['room_id'] = parent['id']
+            
+            # Get room info (function, architects, etc.) from the shared cache
+            room_info = get_room_info(parent['id'])
+            result['room_function'] = room_info.get('function')
+            result['room_architects'] = list(room_info.get('architects', ()))
+            result['room_commissioners'] = list(room_info.get('commissioners', ()))
+            result['room_plasterers'] = list(room_info.get('plasterers', ()))
+            result['room_painters'] = list(room_info.get('painters', ()))
+            
+            # Traverse ALL the way up to find the building
+            building = _traverse_to_building(parent['id'])
+            if building:
+                result['building'] = building.get('name')
+                result['building_id'] = building['id']
+                apply_building_info(building['id'])
+            break
+        
+        elif parent_type == 'OBJECT_BUILDING':
+            # Painting directly in building (no room)
+            result['building'] = parent.get('name')
+            result['building_id'] = parent['id']
+            apply_building_info(parent['id'])
+            break
+    
+    return result
+
+
+def enrich_painting_from_graph(painting_name: str, parent_label: str = None,
+                               painting_uri: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Get all enrichment data for a painting from the CbDD graph.
+    
+    Matching strategy (in order):
+      1. **UUID from URI** – The NFDI4Culture painting URI embeds the CbDD
+         UUID (e.g. ``https://www.deckenmalerei.eu/<uuid>``).  If the UUID
+         exists in the CbDD graph this gives a perfect, unambiguous match.
+      2. **Name + parentLabel** – Fall back to name-based lookup with
+         optional parent-context disambiguation.
+    
+    Args:
+        painting_name:  The painting label (rdfs:label from NFDI4Culture)
+        parent_label:   Optional parent label (SPARQL CTO_0001019) for disambiguation
+        painting_uri:   The NFDI4Culture painting URI (contains CbDD UUID)
+    
+    Returns:
+        dict with all available data, or None if painting not found in graph
+    """
+    import re
+    
+    if not _cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    painting = None
+    
+    # --- Strategy 1: Direct UUID lookup from the NFDI URI ---
+    if painting_uri:
+        uuid_match = re.search(
+            r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
+            str(painting_uri),
+        )
+        if uuid_match:
+            node = _cbdd_nodes_by_id.get(uuid_match.group(0))
+            if node and node.get('type') == 'OBJECT_PAINTING':
+                painting = node
+    
+    # --- Strategy 2: Name-based lookup (with disambiguation) ---
+    if not painting:
+        painting = get_painting_from_graph(painting_name, parent_label=parent_label)
+    
+    if not painting:
+        return None
+    
+    relations = get_painting_relations(painting['id'])
+    
+    return {
+        'cbdd_id': painting['id'],
+        'cbdd_name': painting.get('name'),
+        **relations
+    }
+
+
+def build_painter_incidence_matrices(force_rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Build sparse incidence matrices between paintings and the entities that
+    define a painter's network.
+    
+    Rows are paintings (plus any other node with PAINTERS links, e.g. rooms,
+    which ``_cbdd_painter_to_paintings`` also counts as works); columns are
+    painter names, commissioner names and building names (names, to match
+    ``_cbdd_painter_to_paintings``):
+      - ``painters``:      painting × painter (PAINTERS links)
+      - ``commissioners``: painting × commissioner (COMMISSIONERS links)
+      - ``buildings``:     painting × building (via the PART hierarchy)
+    
+    Built once per loaded graph and cached in ``_cbdd_incidence``.
+    
+    Returns:
+        dict with the three CSR matrices and their column labels / indices
+    """
+    global _cbdd_incidence
+    from scipy import sparse
+    
+    if not _cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    if _cbdd_incidence is not None and not force_rebuild:
+        return _cbdd_incidence
+    
+    painting_ids = [n['id'] for n in _cbdd_graph['nodes'] if n.get('type') == 'OBJECT_PAINTING']
+    row_of = {pid: i for i, pid in enumerate(painting_ids)}
+    for link in _cbdd_graph['links']:
+        if link['type'] == 'PAINTERS' and link['source'] not in row_of:
+            row_of[link['source']] = len(painting_ids)
+            painting_ids.append(link['source'])
+    
+    def incidence(entries):
+        """entries: iterable of (painting_id, column name) -> (matrix, labels, index)"""
+        labels, index, rows, cols = [], {}, [], []
+        for painting_id, name in entries:
+            if name not in index:
+                index[name] = len(labels)
+                labels.append(name)
+            rows.append(row_of[painting_id])
+            cols.append(index[name])
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(painting_ids), len(labels)),
+        )
+        return matrix, labels, index
+    
+    def linked(link_type):
+        for painting_id in painting_ids:
+            for target in neighbors(painting_id, link_type):
+                yield painting_id, target.get('name', '')
+    
+    def located():
+        for painting_id in painting_ids:
+            building = _get_painting_building(painting_id)
+            if building and building.get('name'):
+                yield painting_id, building['name']
+    
+    painters, painter_names, painter_index = incidence(linked('PAINTERS'))
+    commissioners, commissioner_names, _ = incidence(linked('COMMISSIONERS'))
+    buildings, building_names, _ = incidence(located())
+    
+    _cbdd_incidence = {
+        'painting_ids': painting_ids,
+        'painters': painters,
+        'painter_names': painter_names,
+        'painter_index': painter_index,
+        'commissioners': commissioners,
+        'commissioner_names': commissioner_names,
+        'buildings': buildings,
+        'building_names': building_names,
+    }
+    return _cbdd_incidence
+
+
+def _painter_network_from_rows(painter_name: str, co_row, commissioner_row, building_row,
+                               incidence: Dict[str, Any]) -> Dict[str, Any]:
+    """Assemble the get_painter_network() result from one row of each product matrix."""
+    paintings = _cbdd_painter_to_paintings.get(painter_name, [])
+    
+    co_painters = {
+        incidence['painter_names'][j]: int(count)
+        for j, count in zip(co_row.indices, co_row.data)
+        if count and incidence['painter_names'][j] != painter_name
+    }
+    
+    return {
+        'painter_name': painter_name,
+        'painting_count': len(paintings),
+        'paintings': paintings[:20],  # Limit for display
+        'co_painters': dict(sorted(co_painters.items(), key=lambda x: (-x[1], x[0]))),
+        'buildings_worked_in': sorted(
+            incidence['building_names'][j] for j, v in zip(building_row.indices, building_row.data) if v
+        ),
+        'commissioners_worked_for': sorted(
+            incidence['commissioner_names'][j] for j, v in zip(commissioner_row.indices, commissioner_row.data) if v
+        ),
+    }
+
+
+def get_painter_network(painter_name: str) -> Dict[str, Any]:
+    """
+    Get network information for a painter: their paintings and co-painters.
+    
+    Co-painters, commissioners and buildings come from sparse products of
+    the painter's incidence column with the precomputed matrices (see
+    build_painter_incidence_matrices()).
+    
+    Args:
+        painter_name: Name of the painter
+        
+    Returns:
+        dict with paintings list, co_painters, building_count, etc.
+    """
+    from scipy import sparse
+    incidence = build_painter_incidence_matrices()
+    
+    j = incidence['painter_index'].get(painter_name)
+    if j is None:
+        return _painter_network_from_rows(
+            painter_name, sparse.csr_matrix((1, 0)), sparse.csr_matrix((1, 0)),
+            sparse.csr_matrix((1, 0)), incidence,
+        )
+    
+    painter_col = incidence['painters'][:, j].T.tocsr()  # 1 × paintings
+    return _painter_network_from_rows(
+        painter_name,
+        (painter_col @ incidence['painters']).tocsr(),
+        (painter_col @ incidence['commissioners']).tocsr(),
+        (painter_col @ incidence['buildings']).tocsr(),
+        incidence,
+    )
+
+
+def get_all_painter_networks() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the network (see get_painter_network) of EVERY painter in one call.
+    
+    Computes the three painter × {painter, commissioner, building} products
+    once and slices one row per painter.
+    
+    Returns:
+        dict painter name -> network dict
+    """
+    incidence = build_painter_incidence_matrices()
+    painters_t = incidence['painters'].T.tocsr()
+    
+    co_painting = (painters_t @ incidence['painters']).tocsr()
+    painter_commissioner = (painters_t @ incidence['commissioners']).tocsr()
+    painter_building = (painters_t @ incidence['buildings']).tocsr()
+    
+    return {
+        name: _painter_network_from_rows(
+            name, co_painting[j], painter_commissioner[j], painter_building[j], incidence
+        )
+        for j, name in enumerate(incidence['painter_names'])
+    }
+
+
+def enrich_dataframe_from_graph(df: pd.DataFrame, name_column: str = 'label',
+                                return_person_edges: bool = False):
+    """
+    Enrich a DataFrame of paintings with comprehensive data from the CbDD graph.
+    
+    Extracts ALL available data from graphData.json including:
+    - People: painters, commissioners, architects, plasterers, sculptors, designers, 
+              template_providers, reference_persons, donors
+    - Room: room name, function, architects, commissioners, plasterers, painters
+    - Building: name, function, architects, commissioners, builders, sculptors, owners, date
+    - Location: state (Bundesland), ensemble
+    - Artwork: date, method, material
+    
+    People are collected as a long-format edge table (one row per painting,
+    person and role, straight from the graph links); the ' | '-joined name
+    columns are derived from it for display.
+    
+    Args:
+        df: DataFrame with painting data (must have a name/label column)
+        name_column: Name of the column containing painting names
+        return_person_edges: Also return the person edge table
+    
+    Returns:
+        DataFrame with additional columns from CbDD graph, or
+        (DataFrame, edges) if return_person_edges is set, where edges has:
+        nfdi_uri, cbdd_painting_id, person_id, person_name, role
+    """
+    if not _cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    edge_columns = ['nfdi_uri', 'cbdd_painting_id', 'person_id', 'person_name', 'role']
+    if df.empty:
+        return (df, pd.DataFrame(columns=edge_columns)) if return_person_edges else df
+    
+    # Initialize ALL new columns
+    enrichment_cols = [
+        # People from painting
+        'painters', 'commissioners', 'architects', 'plasterers', 'sculptors',
+        'designers', 'template_providers', 'other_artists', 'reference_persons', 'donors',
+        # Room data
+        'room', 'room_function', 'room_architects', 'room_commissioners', 
+        'room_plasterers', 'room_painters',
+        # Building data
+        'building', 'building_address', 'building_function', 'building_architects',
+        'building_commissioners', 'building_builders', 'building_sculptors', 
+        'building_owners', 'building_date',
+        # Location
+        'location_state', 'ensemble',
+        # Artwork metadata
+        'date_cbdd', 'method', 'material',
+        # ID
+        'cbdd_id'
+    ]
+    for col in enrichment_cols:
+        if col not in df.columns:
+            df[col] = None
+    
+    matched = 0
+    person_edges = []
+    for idx, row in df.iterrows():
+        name = row.get(name_column)
+        if not name:
+            continue
+        
+        # Pass parentLabel from SPARQL for disambiguation of duplicate names
+        parent_label = row.get('parentLabel')
+        # Pass painting URI for direct UUID-based matching (most reliable)
+        painting_uri = row.get('painting')
+        enrichment = enrich_painting_from_graph(
+            name, parent_label=parent_label, painting_uri=painting_uri
+        )
+        if enrichment:
+            matched += 1
+            
+            # ID
+            df.at[idx, 'cbdd_id'] = enrichment.get('cbdd_id')
+            
+            # People from painting: long-format edges, names derived per role
+            # NOTE: Use ' | ' as separator to avoid splitting German names like 'Harms, Johann Oswald'
+            edges = enrichment['person_edges']
+            for edge in edges:
+                person_edges.append({'nfdi_uri': painting_uri, **edge})
+            for column, names in _person_names_by_column(edges).items():
+                df.at[idx, column] = ' | '.join(names) or None
+            
+            # Room data
+            df.at[idx, 'room'] = enrichment.get('room')
+            df.at[idx, 'room_architects'] = ' | '.join(enrichment.get('room_architects', [])) or None
+            df.at[idx, 'room_commissioners'] = ' | '.join(enrichment.get('room_commissioners', [])) or None
+            df.at[idx, 'room_plasterers'] = ' | '.join(enrichment.get('room_plasterers', [])) or None
+            df.at[idx, 'room_painters'] = ' | '.join(enrichment.get('room_painters', [])) or None
+            df.at[idx, 'room_painters'] = ', '.join(enrichment.get('room_painters', [])) or None
+            
+            # Building data
+            df.at[idx, 'building'] = enrichment.get('building')
+            df.at[idx, 'building_address'] = enrichment.get('building')  # Building name IS the address
+            df.at[idx, 'building_architects'] = ' | '.join(enrichment.get('building_architects', [])) or None
+            df.at[idx, 'building_commissioners'] = ' | '.join(enrichment.get('building_commissioners', [])) or None
+            df.at[idx, 'building_builders'] = ' | '.join(enrichment.get('building_builders', [])) or None
+            df.at[idx, 'building_sculptors'] = ' | '.join(enrichment.get('building_sculptors', [])) or None
+            df.at[idx, 'building_owners'] = ' | '.join(enrichment.get('building_owners', [])) or None
+            df.at[idx, 'building_owners'] = ', '.join(enrichment.get('building_owners', [])) or None
+            df.at[idx, 'building_date'] = enrichment.get('building_date')
+            
+            # Location
+            df.at[idx, 'location_state'] = enrichment.get('location_state')
+            df.at[idx, 'ensemble'] = enrichment.get('ensemble')
+            
+            # Artwork metadata
+            df.at[idx, 'date_cbdd'] = enrichment.get('date')
+            df.at[idx, 'method'] = enrichment.get('method')
+            df.at[idx, 'material'] = enrichment.get('material')
+    
+    print(f"   ✓ Matched {matched}/{len(df)} paintings ({100*matched/len(df):.1f}%) with CbDD graph")
+    if return_person_edges:
+        return df, pd.DataFrame(person_edges, columns=edge_columns)
+    return df
+
+
+def get_top_painters(limit: int = 20) -> List[Dict]:
+    """Get list of most prolific painters with their painting counts."""
+    if not _cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    return [{'name': name, 'count': count} for name, count in _cbdd_painter_ranking[:limit]]
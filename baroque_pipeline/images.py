@@ -0,0 +1,315 @@
+"""Local image cache: content-addressed originals, thumbnails, prefetch and LRU eviction."""
+
+import base64
+import hashlib
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Optional
+
+from . import parquet
+from .sparql import record_metric
+
+try:
+    from PIL import Image  # thumbnails (optional: without Pillow the original is used)
+except ImportError:
+    Image = None
+
+
+# =============================================================================
+# Image Cache
+# =============================================================================
+# Painting images (CTO_0001021) are downloaded once and stored under the
+# SHA-256 of their content, so the same photograph behind several URLs is
+# kept once:
+#
+#   .image_cache/objects/ab/ab12....jpg       originals
+#   .image_cache/thumbs/320/ab12....jpg       thumbnails (longest side 320 px)
+#   .image_cache/index.sqlite                 url -> hash, sizes, last access
+#
+# Painting cards embed the local thumbnail as a data URI, so renders need no
+# network and also work offline.  Cards never download themselves: an image
+# that prefetch_images() has not cached yet is shown from its remote URL.
+# The cache is bounded by
+# IMAGE_CACHE_MAX_BYTES: least recently used images (with their thumbnails)
+# are evicted first.  With local_only=True nothing is downloaded.
+
+IMAGE_CACHE_DIR = None                    # None = <PARQUET_OUTPUT_DIR>/.image_cache
+IMAGE_CACHE_MAX_BYTES = 2 * 1024 ** 3     # 2 GB
+IMAGE_CACHE_LOCAL_ONLY = False            # offline mode: only serve what is cached
+THUMBNAIL_SIZE = 320
+THUMBNAIL_QUALITY = 85
+IMAGE_DOWNLOAD_TIMEOUT = 30
+IMAGE_PREFETCH_WORKERS = 4
+IMAGE_USER_AGENT = 'Mozilla/5.0'
+
+_IMAGE_EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif',
+                     'image/webp': '.webp', 'image/tiff': '.tif'}
+
+
+def get_image_cache_dir() -> str:
+    return IMAGE_CACHE_DIR or os.path.join(parquet.PARQUET_OUTPUT_DIR, '.image_cache')
+
+
+class ImageCache:
+    """
+    Content-addressed store of downloaded images and their thumbnails.
+
+    Args:
+        directory: Cache directory (default: get_image_cache_dir())
+        max_bytes: Size bound; least recently used images are evicted beyond it
+        local_only: Never download, only serve cached images
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+                 local_only: bool = False):
+        self.directory = directory or get_image_cache_dir()
+        self.max_bytes = max_bytes
+        self.local_only = local_only
+        os.makedirs(self.directory, exist_ok=True)
+        # Shared by the prefetch threads
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), check_same_thread=False)
+        self._con.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS objects (
+                sha256 TEXT PRIMARY KEY,
+                ext TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS urls_sha256 ON urls (sha256);
+        """)
+        self._con.commit()
+
+    # -- paths ---------------------------------------------------------------
+
+    def _object_path(self, sha256: str, ext: str) -> str:
+        return os.path.join(self.directory, 'objects', sha256[:2], f"{sha256}{ext}")
+
+    def _thumbnail_path(self, sha256: str, size: int) -> str:
+        return os.path.join(self.directory, 'thumbs', str(size), f"{sha256}.jpg")
+
+    def _lookup(self, url: str):
+        """(sha256, ext) of a cached URL, marking it as used; None if not cached."""
+        with self._lock:
+            row = self._con.execute("""
+                SELECT o.sha256, o.ext FROM urls u JOIN objects o ON o.sha256 = u.sha256
+                WHERE u.url = ?""", [url]).fetchone()
+            if row is None:
+                return None
+            self._con.execute("UPDATE objects SET last_access = ? WHERE sha256 = ?", [time.time(), row[0]])
+            self._con.commit()
+        if not os.path.exists(self._object_path(*row)):
+            return None
+        return row
+
+    # -- originals -----------------------------------------------------------
+
+    def _download(self, url: str):
+        request = urllib.request.Request(url, headers={'User-Agent': IMAGE_USER_AGENT})
+        record_metric('images.requests')
+        with urllib.request.urlopen(request, timeout=IMAGE_DOWNLOAD_TIMEOUT) as response:
+            content_type = response.headers.get_content_type()
+            body = response.read()
+        record_metric('images.bytes', len(body))
+        if not content_type.startswith('image/'):
+            # Error pages are not images - don't store them under the URL
+            guessed = mimetypes.guess_type(url)[0] or ''
+            if content_type != 'application/octet-stream' or not guessed.startswith('image/'):
+                return None, None
+            content_type = guessed
+        ext = _IMAGE_EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type) or '.img'
+        return body, ext
+
+    def get(self, url: str, download: bool = True) -> Optional[str]:
+        """
+        Local path of the image at ``url``, downloading it on first use
+        (None if unavailable, or not cached and ``download=False``).
+        """
+        if not url:
+            return None
+        cached = self._lookup(url)
+        if cached is not None:
+            record_metric('images.cache_hits')
+            return self._object_path(*cached)
+        record_metric('images.cache_misses')
+        if self.local_only or not download:
+            return None
+        try:
+            body, ext = self._download(url)
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+        if body is None:
+            return None
+
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha256, ext)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            self._con.execute("""
+                INSERT INTO objects (sha256, ext, bytes, last_access) VALUES (?, ?, ?, ?)
+                ON CONFLICT (sha256) DO UPDATE SET last_access = excluded.last_access""",
+                [sha256, ext, len(body), now])
+            self._con.execute("INSERT OR REPLACE INTO urls (url, sha256, fetched_at) VALUES (?, ?, ?)",
+                              [url, sha256, now])
+            self._con.commit()
+        # Never evict the image just stored, even if it alone exceeds max_bytes
+        self.evict(keep=[sha256])
+        return path
+
+    # -- thumbnails ----------------------------------------------------------
+
+    def thumbnail(self, url: str, size: int = THUMBNAIL_SIZE, download: bool = True) -> Optional[str]:
+        """
+        Local path of a JPEG thumbnail (longest side ``size`` px) of the image.
+
+        Without Pillow the original is returned.
+        """
+        original = self.get(url, download)
+        if original is None or Image is None:
+            return original
+        sha256 = os.path.basename(original).split('.')[0]
+        path = self._thumbnail_path(sha256, size)
+        if os.path.exists(path):
+            return path
+        try:
+            with Image.open(original) as image:
+                image.thumbnail((size, size))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                image.convert('RGB').save(tmp_path, 'JPEG', quality=THUMBNAIL_QUALITY)
+                os.replace(tmp_path, path)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return original
+        with self._lock:
+            self._con.execute("UPDATE objects SET bytes = bytes + ? WHERE sha256 = ?",
+                              [os.path.getsize(path), sha256])
+            self._con.commit()
+        return path
+
+    def data_uri(self, url: str, size: int = THUMBNAIL_SIZE, download: bool = True) -> Optional[str]:
+        """The thumbnail as a data: URI for HTML (None if the image is unavailable)."""
+        path = self.thumbnail(url, size, download)
+        if path is None:
+            return None
+        mime = mimetypes.guess_type(path)[0] or 'image/jpeg'
+        with open(path, 'rb') as f:
+            return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+    # -- bulk and housekeeping -----------------------------------------------
+
+    def prefetch(self, urls: Iterable[str], size: int = THUMBNAIL_SIZE,
+                 max_workers: int = IMAGE_PREFETCH_WORKERS, verbose: bool = True) -> Dict[str, Optional[str]]:
+        """
+        Download and thumbnail a whole result set concurrently.
+
+        Returns:
+            dict url -> thumbnail path (None if unavailable)
+        """
+        urls = list(dict.fromkeys(u for u in urls if isinstance(u, str) and u))
+        paths = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.thumbnail, url, size): url for url in urls}
+            for future in as_completed(futures):
+                paths[futures[future]] = future.result()
+        if verbose:
+            available = sum(path is not None for path in paths.values())
+            print(f"🖼️ Images: {available}/{len(urls)} available locally"
+                  f"{' (local only)' if self.local_only else ''}")
+        return paths
+
+    def evict(self, max_bytes: int = None, keep: Iterable[str] = ()) -> int:
+        """
+        Remove least recently used images until the cache fits ``max_bytes``
+        (images whose sha256 is in ``keep`` stay); returns the count.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        keep = set(keep)
+        removed = 0
+        with self._lock:
+            total = self._con.execute("SELECT COALESCE(SUM(bytes), 0) FROM objects").fetchone()[0]
+            if total <= max_bytes:
+                return 0
+            for sha256, ext, size in self._con.execute(
+                    "SELECT sha256, ext, bytes FROM objects ORDER BY last_access").fetchall():
+                if total <= max_bytes:
+                    break
+                if sha256 in keep:
+                    continue
+                paths = [self._object_path(sha256, ext)]
+                thumbs_dir = os.path.join(self.directory, 'thumbs')
+                if os.path.isdir(thumbs_dir):
+                    paths += [self._thumbnail_path(sha256, int(s)) for s in os.listdir(thumbs_dir)]
+                for path in paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._con.execute("DELETE FROM urls WHERE sha256 = ?", [sha256])
+                self._con.execute("DELETE FROM objects WHERE sha256 = ?", [sha256])
+                total -= size
+                removed += 1
+            self._con.commit()
+        record_metric('images.evicted', removed)
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        """Cached URLs, distinct images and their size in MB."""
+        with self._lock:
+            urls = self._con.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            images, size = self._con.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM objects").fetchone()
+        return {'urls': urls, 'images': images, 'mb': round(size / 1024 ** 2, 1),
+                'max_mb': round(self.max_bytes / 1024 ** 2, 1)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+
+_default_cache = None
+
+
+def get_image_cache() -> ImageCache:
+    """The shared cache (IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_CACHE_LOCAL_ONLY)."""
+    global _default_cache
+    if _default_cache is None or _default_cache.directory != get_image_cache_dir():
+        _default_cache = ImageCache(get_image_cache_dir(), IMAGE_CACHE_MAX_BYTES)
+    _default_cache.local_only = IMAGE_CACHE_LOCAL_ONLY
+    _default_cache.max_bytes = IMAGE_CACHE_MAX_BYTES
+    return _default_cache
+
+
+def prefetch_images(urls: Iterable[str], size: int = THUMBNAIL_SIZE,
+                    max_workers: int = IMAGE_PREFETCH_WORKERS) -> Dict[str, Optional[str]]:
+    """Prefetch the images of a result set into the shared cache, see ImageCache.prefetch()."""
+    return get_image_cache().prefetch(urls, size=size, max_workers=max_workers)
+
+
+def card_image_src(url: str, size: int = THUMBNAIL_SIZE) -> Optional[str]:
+    """
+    ``src`` for an <img> in a painting card: the cached thumbnail as a data
+    URI, otherwise the remote URL (None in local-only mode).  Never downloads -
+    rendering a card must not wait for the network; prefetch_images() fills
+    the cache.
+    """
+    if not url or not isinstance(url, str):
+        return None
+    src = get_image_cache().data_uri(url, size, download=False)
+    if src is None and not IMAGE_CACHE_LOCAL_ONLY:
+        return url
+    return src
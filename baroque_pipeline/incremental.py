@@ -0,0 +1,235 @@
+"""Incremental export: upsert changed rows as delta files, tombstones, change log and compaction."""
+
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import parquet
+from .parquet import (DELTA_OP_COLUMN, DELTA_RUN_COLUMN, PARQUET_PRIMARY_KEYS, PARQUET_TABLE_SCHEMAS,
+                      dataframe_to_arrow, get_dataset_path, get_delta_dir, get_parquet_path, key_hashes, key_strings,
+                      list_delta_files, read_current_table, save_parquet_with_metadata, write_parquet_file)
+from .sparql import record_metric
+
+
+# =============================================================================
+# Incremental Export: Upserts, Tombstones and Change Log
+# =============================================================================
+# The feed has no modification dates, so every run still builds the complete
+# tables; apply_upsert() then compares them with the current state by key
+# and row hash and writes only the difference:
+#
+#   baroque_delta/<table>/<run_id>.parquet      changed rows + tombstones
+#   baroque_changelog/<run_id>.parquet          one row per inserted /
+#                                               updated / deleted key
+#
+# Unchanged tables cost one hash pass and no writes.  After
+# UPSERT_COMPACT_AFTER delta files, a table is compacted: the current state
+# is written as the new base file and its delta files are removed.  The
+# change log is kept; its op == 'delete' rows are the tombstones of removed
+# paintings, persons, links, ...
+
+UPSERT_COMPACT_AFTER = 8   # delta files per table before compaction
+CHANGELOG_NAME = "changelog"
+CHANGELOG_KEY_SEPARATOR = ' | '
+
+
+def new_run_id() -> str:
+    """Run id: timestamp with microseconds, sorts chronologically."""
+    return datetime.now().strftime('%Y%m%dT%H%M%S_%f')
+
+
+def get_changelog_dir() -> str:
+    """Directory with one change log file per run."""
+    return os.path.join(parquet.PARQUET_OUTPUT_DIR, f"{parquet.PARQUET_PREFIX}{CHANGELOG_NAME}")
+
+
+def _row_hashes(df: pd.DataFrame, table_name: str, columns: List[str]) -> np.ndarray:
+    """
+    64-bit hash of every row over ``columns``, after conversion to the
+    declared schema (so a re-read file and a fresh DataFrame hash the same).
+    """
+    table = dataframe_to_arrow(df[[c for c in columns if c in df.columns]], table_name, sort=False)
+    hashed = {}
+    for name in columns:
+        column = table.column(name) if name in table.column_names else pa.nulls(len(df), pa.string())
+        # list<string> values are not hashable by pandas - hash their joined form
+        hashed[name] = pc.binary_join(column, '\x1f') if pa.types.is_list(column.type) else column
+    table = pa.table(hashed)
+    return pd.util.hash_pandas_object(table.to_pandas(), index=False).to_numpy()
+
+
+def _key_group_hashes(key_hashes_: np.ndarray, row_hashes: np.ndarray) -> pd.Series:
+    """
+    Key hash -> order-independent hash of the multiset of its rows (sum of the
+    row hashes, wrapping at 2**64).
+    """
+    order = np.argsort(key_hashes_, kind='stable')
+    sorted_keys = key_hashes_[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    return pd.Series(np.add.reduceat(row_hashes[order], starts), index=sorted_keys[starts])
+
+
+def diff_table(current: pd.DataFrame, new: pd.DataFrame, table_name: str) -> Dict[str, pd.DataFrame]:
+    """
+    Compare two versions of a table by primary key.
+
+    Keys are not unique in every table - the feed repeats a few nfdi_uris,
+    and their junction rows with them - so a key stands for the multiset of
+    its rows: if any of them changed, all rows of the key in ``new`` are
+    returned as its update.
+
+    Returns:
+        dict with 'insert', 'update' (rows of ``new``) and 'delete' (key
+        columns of ``current``, one row per deleted key)
+    """
+    keys = PARQUET_PRIMARY_KEYS[table_name]
+    new = new.reset_index(drop=True)
+    if current.empty:
+        return {'insert': new, 'update': new.iloc[0:0], 'delete': new[keys].iloc[0:0]}
+    current = current.reset_index(drop=True)
+
+    declared = PARQUET_TABLE_SCHEMAS[table_name].names if table_name in PARQUET_TABLE_SCHEMAS else []
+    columns = list(dict.fromkeys(declared + list(new.columns) + list(current.columns)))
+    new_keys, current_keys = key_hashes(new, keys), key_hashes(current, keys)
+    new_groups = _key_group_hashes(new_keys, _row_hashes(new, table_name, columns))
+    current_groups = _key_group_hashes(current_keys, _row_hashes(current, table_name, columns))
+
+    is_new = ~np.isin(new_keys, current_keys)
+    changed = ~is_new
+    changed[changed] = (new_groups.reindex(new_keys[changed]).to_numpy()
+                        != current_groups.reindex(new_keys[changed]).to_numpy())
+    deleted = ~np.isin(current_keys, new_keys)
+    first_of_key = ~pd.Series(current_keys).duplicated().to_numpy()
+    return {
+        'insert': new[is_new],
+        'update': new[changed],
+        'delete': current.loc[deleted & first_of_key, keys],
+    }
+
+
+def compact_table(table_name: str, metadata: dict = None) -> bool:
+    """
+    Fold the delta files of a table into its base file.
+
+    Returns:
+        True if there was anything to compact
+    """
+    delta_files = list_delta_files(table_name)
+    if not delta_files:
+        return False
+    save_parquet_with_metadata(read_current_table(table_name), table_name,
+                               {**(metadata or {}), 'compacted_runs': len(delta_files)})
+    for path in delta_files:
+        os.remove(path)
+    record_metric('parquet.deltas_compacted', len(delta_files))
+    return True
+
+
+def compact_all(metadata: dict = None) -> List[str]:
+    """Compact every table that has delta files; returns the compacted table names."""
+    return [name for name in PARQUET_PRIMARY_KEYS if compact_table(name, metadata)]
+
+
+def apply_upsert(tables: Dict[str, pd.DataFrame], run_id: str = None, metadata: dict = None,
+                 compact_after: int = UPSERT_COMPACT_AFTER, verbose: bool = True) -> pd.DataFrame:
+    """
+    Apply a complete new version of the exported tables as an upsert.
+
+    Tables without a base file are written in full (every row an insert).
+    Otherwise only inserted/updated rows and tombstones of deleted keys are
+    written, as one delta file per changed table.
+
+    Args:
+        tables: dict table name -> complete new DataFrame (as from the export)
+        run_id: Id of this run (default: new_run_id())
+        metadata: Extra footer metadata for the written files
+        compact_after: Compact a table once it has this many delta files
+        verbose: Print one line per table
+
+    Returns:
+        Change log of this run: run_id, run_at, table, key, op
+    """
+    run_id = run_id or new_run_id()
+    run_at = datetime.now().isoformat()
+    metadata = {**(metadata or {}), 'run_id': run_id}
+    changes = []
+
+    if verbose:
+        print(f"🔁 Incremental export (run {run_id})...")
+    for table_name, new in tables.items():
+        keys = PARQUET_PRIMARY_KEYS[table_name]
+        has_base = os.path.exists(get_parquet_path(table_name)) or bool(list_delta_files(table_name))
+        diff = diff_table(read_current_table(table_name) if has_base else pd.DataFrame(), new, table_name)
+
+        if not has_base:
+            save_parquet_with_metadata(diff['insert'], table_name, metadata)
+        elif any(len(df) for df in diff.values()):
+            upserts = pd.concat([diff['insert'], diff['update']], ignore_index=True)
+            upserts[DELTA_OP_COLUMN] = 'upsert'
+            tombstones = diff['delete'].reset_index(drop=True)
+            tombstones[DELTA_OP_COLUMN] = 'delete'
+            delta = pd.concat([upserts, tombstones], ignore_index=True)
+            delta[DELTA_RUN_COLUMN] = run_id
+            os.makedirs(get_delta_dir(table_name), exist_ok=True)
+            path = write_parquet_file(delta, os.path.join(get_delta_dir(table_name), f"{run_id}.parquet"),
+                                      table_name, {**metadata, 'delta': True, 'primary_key': keys})
+            record_metric('parquet.files_written')
+            record_metric('parquet.bytes_written', os.path.getsize(path))
+            # A partitioned copy of this table would now be stale
+            if os.path.isdir(get_dataset_path(table_name)):
+                shutil.rmtree(get_dataset_path(table_name))
+                print(f"   ⚠ Removed outdated partitioned {table_name} (rewrite with write_partitioned_dataset())")
+
+        if any(len(df) for df in diff.values()):
+            # Base file + deltas must hold exactly the rows of the full export
+            current_rows = len(read_current_table(table_name))
+            if current_rows != len(new):
+                raise RuntimeError(f"Incremental export of {table_name} is inconsistent: "
+                                   f"{current_rows:,} rows after the merge, {len(new):,} in the full export")
+
+        for op, df in diff.items():
+            if len(df):
+                changed_keys = key_strings(df, keys).drop_duplicates()
+                changes.append(pd.DataFrame({'table': table_name, 'op': op,
+                                             'key': changed_keys.str.replace(
+                                                 '\x1f', CHANGELOG_KEY_SEPARATOR).str.replace('\x00', '')}))
+        if verbose:
+            counts = (', '.join(f"{op} {len(df):,}" for op, df in diff.items() if len(df))
+                      or 'unchanged')
+            print(f"   {'✓' if has_base else '+'} {table_name:20} {counts}")
+
+        if has_base and len(list_delta_files(table_name)) >= compact_after:
+            compact_table(table_name, metadata)
+            if verbose:
+                print(f"   🗜 Compacted {table_name}")
+
+    changelog = (pd.concat(changes, ignore_index=True) if changes
+                 else pd.DataFrame(columns=['table', 'op', 'key']))
+    changelog.insert(0, 'run_id', run_id)
+    changelog.insert(1, 'run_at', run_at)
+    os.makedirs(get_changelog_dir(), exist_ok=True)
+    write_parquet_file(changelog, os.path.join(get_changelog_dir(), f"{run_id}.parquet"), CHANGELOG_NAME,
+                       metadata)
+    return changelog
+
+
+def load_changelog(run_id: str = None) -> pd.DataFrame:
+    """
+    The change log of all runs (or of one run).
+
+    Returns:
+        DataFrame with: run_id, run_at, table, key, op ('insert' | 'update' | 'delete')
+    """
+    directory = get_changelog_dir()
+    files = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+    if run_id:
+        files = [f for f in files if f == f"{run_id}.parquet"]
+    if not files:
+        return pd.DataFrame(columns=PARQUET_TABLE_SCHEMAS[CHANGELOG_NAME].names)
+    return pd.concat([pd.read_parquet(os.path.join(directory, f)) for f in files], ignore_index=True)
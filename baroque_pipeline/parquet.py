@@ -0,0 +1,703 @@
+"""Parquet output configuration, writers and coordinate enrichment of the export."""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from . import graph
+from .coordinates import get_building_coordinates_from_kg
+from .graph import load_cbdd_graph
+from .sparql import record_metric
+from .tables import split_multi_value
+from .years import parse_year_record
+
+
+# =============================================================================
+# Parquet Database Configuration and Helpers
+# =============================================================================
+
+# Parquet output configuration
+PARQUET_OUTPUT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARQUET_PREFIX = "baroque_"
+
+# Batch sizes and rate limiting
+SPARQL_BATCH_SIZE = 500  # Paintings per SPARQL query
+SUBJECT_BATCH_SIZE = 50   # Subjects to resolve before progress update
+API_DELAY_SECONDS = 0.05  # Delay between external API calls
+
+def get_parquet_path(table_name: str) -> str:
+    """Get the full path for a Parquet file."""
+    return os.path.join(PARQUET_OUTPUT_DIR, f"{PARQUET_PREFIX}{table_name}.parquet")
+
+
+# =============================================================================
+# Parquet Writer Settings: Declared Schemas, Encodings and Sort Order
+# =============================================================================
+# Every exported table has a declared Arrow schema, so types do not depend on
+# what pandas infers from one run's data (no null-typed or mixed columns).
+# Files are zstd-compressed; only low-cardinality columns are dictionary
+# encoded (URIs and labels are nearly unique, a dictionary only costs space).
+# Rows are sorted by the table's main join key so that the row-group min/max
+# statistics (DuckDB zone maps) can skip row groups on joins and lookups.
+# The export metadata is stored in the file footer (see read_parquet_metadata).
+
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_COMPRESSION_LEVEL = 9
+PARQUET_ROW_GROUP_SIZE = 16_384   # rows; several row groups per table -> zone maps prune
+PARQUET_METADATA_KEY = b'baroque_pipeline'
+
+_STR = pa.string()
+_STR_LIST = pa.list_(pa.string())  # multi-value columns, see tables.PAINTING_LIST_COLUMNS
+
+PARQUET_TABLE_SCHEMAS = {
+    'paintings': pa.schema([
+        ('nfdi_uri', _STR), ('cbdd_id', _STR), ('room_id', _STR), ('building_id', _STR),
+        ('label', _STR), ('year', _STR), ('lat', pa.float64()), ('lon', pa.float64()),
+        ('building_address', _STR), ('location_state', _STR), ('imageUrl', _STR), ('license', _STR),
+        ('subjects', _STR_LIST), ('room_name', _STR), ('building_name', _STR), ('building_function', _STR),
+        ('parentUri', _STR), ('parentLabel', _STR), ('painters', _STR_LIST), ('commissioners', _STR_LIST),
+        ('method', _STR), ('creatorGnds', _STR_LIST), ('locationGnds', _STR_LIST), ('painting_uri', _STR),
+        ('cbdd_painting_id', _STR),
+    ]),
+    'persons': pa.schema([('person_id', _STR), ('name', _STR), ('person_type', _STR), ('val', pa.float64())]),
+    'buildings': pa.schema([('building_id', _STR), ('name', _STR), ('function', _STR),
+                            ('location_state', _STR), ('construction_date', _STR), ('ensemble_id', _STR)]),
+    'rooms': pa.schema([('room_id', _STR), ('name', _STR), ('function', _STR), ('building_id', _STR)]),
+    'ensembles': pa.schema([('ensemble_id', _STR), ('name', _STR)]),
+    'painting_persons': pa.schema([('nfdi_uri', _STR), ('cbdd_painting_id', _STR), ('person_id', _STR),
+                                   ('person_name', _STR), ('role', _STR)]),
+    'painting_subjects': pa.schema([('nfdi_uri', _STR), ('cbdd_painting_id', _STR), ('subject_uri', _STR),
+                                    ('subject_label', _STR), ('subject_source', _STR)]),
+    'subjects': pa.schema([('subject_uri', _STR), ('subject_label', _STR), ('subject_source', _STR)]),
+    'building_persons': pa.schema([('building_id', _STR), ('person_id', _STR), ('person_name', _STR),
+                                   ('role', _STR)]),
+    'room_persons': pa.schema([('room_id', _STR), ('person_id', _STR), ('person_name', _STR), ('role', _STR)]),
+    'changelog': pa.schema([('run_id', _STR), ('run_at', _STR), ('table', _STR), ('key', _STR), ('op', _STR)]),
+}
+
+# Main join key first; the rest makes the order deterministic
+PARQUET_SORT_KEYS = {
+    'paintings': ['nfdi_uri'],
+    'persons': ['person_id'],
+    'buildings': ['building_id'],
+    'rooms': ['building_id', 'room_id'],
+    'ensembles': ['ensemble_id'],
+    'painting_persons': ['nfdi_uri', 'role', 'person_id'],
+    'painting_subjects': ['nfdi_uri', 'subject_uri'],
+    'subjects': ['subject_uri'],
+    'building_persons': ['building_id', 'role', 'person_id'],
+    'room_persons': ['room_id', 'role', 'person_id'],
+    'changelog': ['table', 'op', 'key'],
+}
+
+# Natural key of every exported table, used by the incremental export to
+# match rows between runs.  Not unique everywhere: the feed lists a few
+# paintings twice, so paintings and the painting junctions can hold several
+# rows per key (the incremental export treats them as one unit)
+PARQUET_PRIMARY_KEYS = {
+    'paintings': ['nfdi_uri'],
+    'persons': ['person_id'],
+    'buildings': ['building_id'],
+    'rooms': ['room_id'],
+    'ensembles': ['ensemble_id'],
+    'painting_persons': ['nfdi_uri', 'person_id', 'role'],
+    'painting_subjects': ['nfdi_uri', 'subject_uri'],
+    'subjects': ['subject_uri'],
+    'building_persons': ['building_id', 'person_id', 'role'],
+    'room_persons': ['room_id', 'person_id', 'role'],
+}
+
+# Low-cardinality columns (tens of distinct values) -> dictionary encoding
+PARQUET_DICTIONARY_COLUMNS = {
+    'role', 'person_type', 'subject_source', 'location_state', 'function', 'building_function',
+    'license', 'method', 'collection_method', 'validation_status', 'source', 'n4c_feed',
+    'gnd_type', 'coord_match_type', 'op', 'table', 'run_id', '_op', '_run_id',
+}
+
+
+def _writable_type(arrow_type: pa.DataType) -> pa.DataType:
+    """Replace null types (a column that is empty in this run) by string."""
+    if pa.types.is_null(arrow_type):
+        return pa.string()
+    if pa.types.is_list(arrow_type):
+        return pa.list_(_writable_type(arrow_type.value_type))
+    return arrow_type
+
+
+def _arrow_column(values: pd.Series, arrow_type: pa.DataType) -> pa.Array:
+    """
+    Convert a pandas column to ``arrow_type``.
+
+    Non-string values are stringified for string columns; list columns
+    accept both lists and the legacy pipe-joined strings ('a | b').
+    """
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        values = values.map(split_multi_value)
+    try:
+        return pa.array(values, type=arrow_type, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if not pa.types.is_string(arrow_type):
+            raise
+        return pa.array([None if v is None or (isinstance(v, float) and v != v) else str(v)
+                         for v in values], type=arrow_type)
+
+
+def dataframe_to_arrow(df: pd.DataFrame, table_name: str = None, sort: bool = True) -> pa.Table:
+    """
+    Convert a DataFrame to an Arrow table with the declared schema of ``table_name``.
+
+    Declared columns missing from ``df`` become null columns; columns that are
+    not declared are kept with their inferred type (null types become string).
+    Rows are sorted by PARQUET_SORT_KEYS[table_name] if ``sort`` is set.
+    """
+    declared = PARQUET_TABLE_SCHEMAS.get(table_name, pa.schema([]))
+    df = df.reset_index(drop=True)
+    if sort and table_name in PARQUET_SORT_KEYS and len(df):
+        keys = [k for k in PARQUET_SORT_KEYS[table_name] if k in df.columns]
+        if keys:
+            df = df.sort_values(keys, kind='stable', na_position='last', ignore_index=True)
+
+    fields, arrays = [], []
+    for field in declared:
+        if field.name in df.columns:
+            arrays.append(_arrow_column(df[field.name], field.type))
+        else:
+            arrays.append(pa.nulls(len(df), field.type))
+        fields.append(field)
+    extra = [c for c in df.columns if c not in declared.names]
+    if extra:
+        inferred = pa.Table.from_pandas(df[extra], preserve_index=False)
+        for field, column in zip(inferred.schema, inferred.columns):
+            arrow_type = _writable_type(field.type)
+            fields.append(pa.field(field.name, arrow_type))
+            arrays.append(column.cast(arrow_type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def parquet_write_options(schema: pa.Schema) -> dict:
+    """Keyword arguments for pq.write_table / pq.ParquetWriter."""
+    return {
+        'compression': PARQUET_COMPRESSION,
+        'compression_level': PARQUET_COMPRESSION_LEVEL,
+        'use_dictionary': [name for name in schema.names if name in PARQUET_DICTIONARY_COLUMNS],
+        'write_statistics': True,
+    }
+
+
+def write_parquet_file(df: pd.DataFrame, path: str, table_name: str = None,
+                       metadata: dict = None) -> str:
+    """
+    Write a DataFrame with the tuned settings (declared schema, sort order,
+    encodings, row groups) and ``metadata`` in the file footer.
+
+    Returns:
+        Path to the written file
+    """
+    table = dataframe_to_arrow(df, table_name)
+    metadata = {
+        **(metadata or {}),
+        'table': table_name,
+        'export_date': datetime.now().isoformat(),
+        'row_count': table.num_rows,
+        'columns': table.schema.names,
+        'sorted_by': [k for k in PARQUET_SORT_KEYS.get(table_name, []) if k in table.schema.names],
+    }
+    table = table.replace_schema_metadata({PARQUET_METADATA_KEY: json.dumps(metadata, default=str)})
+    pq.write_table(table, path, row_group_size=PARQUET_ROW_GROUP_SIZE, **parquet_write_options(table.schema))
+    return path
+
+
+def read_parquet_metadata(path_or_table: str) -> dict:
+    """Export metadata from a Parquet footer (a path or an exported table name)."""
+    path = path_or_table if path_or_table.endswith('.parquet') else get_parquet_path(path_or_table)
+    raw = (pq.read_metadata(path).metadata or {}).get(PARQUET_METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def save_parquet_with_metadata(df: pd.DataFrame, table_name: str, metadata: dict = None) -> str:
+    """
+    Save DataFrame to Parquet with export metadata.
+    
+    The metadata (export_date, row_count, columns, sort order and anything
+    passed in ``metadata``) is stored in the file footer.
+    
+    Args:
+        df: DataFrame to save
+        table_name: Name for the table (without prefix/extension)
+        metadata: Optional additional metadata
+    
+    Returns:
+        Path to the saved file
+    """
+    path = write_parquet_file(df, get_parquet_path(table_name), table_name, metadata)
+    record_metric('parquet.files_written')
+    record_metric('parquet.bytes_written', os.path.getsize(path))
+    
+    print(f"   ✓ Saved {table_name}: {len(df):,} rows → {os.path.basename(path)}")
+    return path
+
+
+def load_parquet_table(table_name: str) -> pd.DataFrame:
+    """Load a Parquet table by name (with pending incremental deltas applied)."""
+    path = get_parquet_path(table_name)
+    if os.path.exists(path) or list_delta_files(table_name):
+        return read_current_table(table_name)
+    else:
+        print(f"   ⚠ Table not found: {path}")
+        return pd.DataFrame()
+
+
+# =============================================================================
+# Delta Files of the Incremental Export
+# =============================================================================
+# An incremental export (see baroque_pipeline.incremental) leaves the base
+# file untouched and writes only the changed rows of a run:
+#
+#   baroque_delta/<table>/<run_id>.parquet
+#
+# Delta rows carry _run_id and _op: 'upsert' rows are complete new row
+# versions, 'delete' rows (tombstones) hold only the key columns.  The
+# current state of a table is the base file, minus every key that occurs in
+# a delta, plus the latest 'upsert' version of those keys.  Compaction folds
+# the deltas back into the base file.
+
+PARQUET_DELTA_NAME = "delta"
+DELTA_OP_COLUMN = '_op'
+DELTA_RUN_COLUMN = '_run_id'
+
+
+def get_delta_dir(table_name: str) -> str:
+    """Directory with the delta files of a table."""
+    return os.path.join(PARQUET_OUTPUT_DIR, f"{PARQUET_PREFIX}{PARQUET_DELTA_NAME}", table_name)
+
+
+def list_delta_files(table_name: str) -> List[str]:
+    """Delta files of a table, oldest run first (run ids sort chronologically)."""
+    directory = get_delta_dir(table_name)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.parquet'))
+
+
+def key_strings(df: pd.DataFrame, keys: List[str]) -> pd.Series:
+    """One string per row for a (composite) key; missing values are kept distinct from ''."""
+    joined = None
+    for key in keys:
+        part = df[key].astype('string').fillna('\x00')
+        joined = part if joined is None else joined + '\x1f' + part
+    return joined.reset_index(drop=True)
+
+
+def key_hashes(df: pd.DataFrame, keys: List[str]) -> np.ndarray:
+    """64-bit hash of every row's (composite) key - fast to compare and look up."""
+    return pd.util.hash_pandas_object(df[keys].astype('string'), index=False).to_numpy()
+
+
+def read_current_table(table_name: str) -> pd.DataFrame:
+    """
+    Current state of an exported table: base file with all delta files applied.
+
+    Base files written before the list columns existed hold pipe-joined
+    strings there; they are split so that base and delta rows agree.
+
+    Returns:
+        DataFrame sorted like the base file (empty if neither exists)
+    """
+    path = get_parquet_path(table_name)
+    base = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame()
+    for field in PARQUET_TABLE_SCHEMAS.get(table_name, ()):
+        if pa.types.is_list(field.type) and field.name in base.columns and \
+                base[field.name].map(lambda v: isinstance(v, str)).any():
+            base[field.name] = base[field.name].map(split_multi_value)
+    delta_files = list_delta_files(table_name)
+    if not delta_files:
+        return base
+
+    keys = PARQUET_PRIMARY_KEYS[table_name]
+    deltas = pd.concat([pd.read_parquet(f) for f in delta_files], ignore_index=True)
+    # The latest run that touched a key holds all of its rows (keys can
+    # repeat, e.g. a painting listed twice in the feed) or its tombstone
+    delta_keys = key_hashes(deltas, keys)
+    latest_run = deltas[DELTA_RUN_COLUMN].groupby(delta_keys).transform('max')
+    deltas = deltas[(deltas[DELTA_RUN_COLUMN] == latest_run).to_numpy()]
+    if len(base):
+        base = base[~np.isin(key_hashes(base, keys), delta_keys)]
+
+    upserts = deltas[deltas[DELTA_OP_COLUMN] == 'upsert'].drop(columns=[DELTA_OP_COLUMN, DELTA_RUN_COLUMN])
+    frames = [df for df in (base, upserts) if len(df)]
+    if not frames:
+        return base.iloc[0:0] if len(base.columns) else upserts
+    current = pd.concat(frames, ignore_index=True)
+    sort_keys = [k for k in PARQUET_SORT_KEYS.get(table_name, []) if k in current.columns]
+    if sort_keys:
+        current = current.sort_values(sort_keys, kind='stable', na_position='last', ignore_index=True)
+    return current
+
+
+# =============================================================================
+# Partitioned Dataset Layout (optional)
+# =============================================================================
+# Besides the single files, the export can write paintings and the painting
+# junctions as a Hive-partitioned dataset:
+#
+#   baroque_dataset/paintings/location_state=Bayern/decade=1730/part-0.parquet
+#   baroque_dataset/painting_persons/location_state=Bayern/decade=1730/...
+#
+# The junction tables are co-partitioned: each junction row lands in the
+# partition of its painting.  DuckDB reads the directories with
+# read_parquet('.../**/*.parquet', hive_partitioning = true) and skips all
+# files whose location_state / decade do not match a filter.  Missing values
+# go to the __HIVE_DEFAULT_PARTITION__ directory (read back as NULL).
+
+PARQUET_DATASET_NAME = "dataset"
+PARQUET_PARTITION_COLUMNS = ['location_state', 'decade']
+PARQUET_PARTITIONED_TABLES = ['paintings', 'painting_persons', 'painting_subjects']
+
+_PARTITION_SCHEMA = pa.schema([('location_state', pa.string()), ('decade', pa.int32())])
+
+
+def get_dataset_path(table_name: str) -> str:
+    """Directory of a table in the partitioned dataset."""
+    return os.path.join(PARQUET_OUTPUT_DIR, f"{PARQUET_PREFIX}{PARQUET_DATASET_NAME}", table_name)
+
+
+def painting_decade(years: pd.Series) -> pd.Series:
+    """
+    Partition decade of the free-text ``year`` values.
+
+    Same definition as the ``decade`` column of the DuckDB notebook: the
+    decade of year_start (of year_end if there is no start) as parsed by
+    years.parse_year_record() ("um 1732-1742" -> 1730, "2. Hälfte 17. Jh."
+    -> 1650).  Unparseable values give NA.
+    """
+    decades = {value: parse_year_record(value)[6] for value in years.dropna().unique()}
+    return years.map(decades).astype('Int32')
+
+
+def _partition_keys(paintings: pa.Table) -> pa.Table:
+    """
+    nfdi_uri -> (location_state, decade), one row per painting.
+
+    The feed repeats a few nfdi_uris; only their first row decides the
+    partition, so joining the keys never multiplies junction rows.
+    """
+    decade = painting_decade(paintings.column('year').to_pandas())
+    keys = pa.table({
+        'nfdi_uri': paintings.column('nfdi_uri'),
+        'location_state': paintings.column('location_state'),
+        'decade': pa.array(decade, type=pa.int32(), from_pandas=True),
+    })
+    first_rows = pc.index_in(pc.unique(keys.column('nfdi_uri')), keys.column('nfdi_uri'))
+    return keys.take(first_rows)
+
+
+def write_partitioned_dataset(verbose: bool = True) -> Dict[str, int]:
+    """
+    Write PARQUET_PARTITIONED_TABLES as a Hive-partitioned dataset
+    (location_state / decade) from the exported single-file tables.
+
+    Reads and writes Arrow tables only, so it also runs after the streaming
+    export.  An existing dataset is replaced.
+
+    Returns:
+        dict table name -> number of partition files
+    """
+    import shutil
+    import pyarrow.dataset as ds
+
+    def read_table(table_name: str) -> pa.Table:
+        if list_delta_files(table_name):
+            return dataframe_to_arrow(read_current_table(table_name), table_name)
+        return pq.read_table(get_parquet_path(table_name))
+
+    paintings = read_table('paintings')
+    keys = _partition_keys(paintings)
+    partitions = len(keys.select(PARQUET_PARTITION_COLUMNS).group_by(PARQUET_PARTITION_COLUMNS).aggregate([]))
+
+    if verbose:
+        print(f"🗂 Writing partitioned dataset ({' / '.join(PARQUET_PARTITION_COLUMNS)}, "
+              f"{partitions:,} partitions)...")
+    files = {}
+    for table_name in PARQUET_PARTITIONED_TABLES:
+        if table_name == 'paintings':
+            decade = painting_decade(paintings.column('year').to_pandas())
+            table = paintings.append_column('decade', pa.array(decade, type=pa.int32(), from_pandas=True))
+        else:
+            table = read_table(table_name)
+            table = table.join(keys, 'nfdi_uri', join_type='left outer', use_threads=False)
+        sort_keys = [k for k in PARQUET_SORT_KEYS.get(table_name, []) if k in table.schema.names]
+        table = table.sort_by([(k, 'ascending') for k in sort_keys])
+        metadata = read_parquet_metadata(get_parquet_path(table_name))
+        metadata.pop('row_count', None)  # per file it would be wrong
+        metadata = {
+            **metadata,
+            'partitioned_by': PARQUET_PARTITION_COLUMNS,
+            'export_date': datetime.now().isoformat(),
+        }
+        table = table.replace_schema_metadata({PARQUET_METADATA_KEY: json.dumps(metadata, default=str)})
+
+        directory = get_dataset_path(table_name)
+        shutil.rmtree(directory, ignore_errors=True)
+        written = []
+        ds.write_dataset(
+            table, directory, format='parquet',
+            partitioning=ds.partitioning(_PARTITION_SCHEMA, flavor='hive'),
+            file_options=ds.ParquetFileFormat().make_write_options(
+                **parquet_write_options(table.schema)),
+            basename_template='part-{i}.parquet',
+            max_partitions=max(partitions + 1, 1024),
+            max_rows_per_group=PARQUET_ROW_GROUP_SIZE,
+            preserve_order=True,
+            existing_data_behavior='delete_matching',
+            file_visitor=lambda f: written.append(f.path),
+        )
+        files[table_name] = len(written)
+        record_metric('parquet.files_written', len(written))
+        if verbose:
+            print(f"   ✓ {table_name}: {table.num_rows:,} rows → {len(written):,} files")
+    return files
+
+
+def benchmark_parquet_layout(tables: Dict[str, pd.DataFrame], directory: str,
+                             repeats: int = 5) -> pd.DataFrame:
+    """
+    Compare the default writer (df.to_parquet) with write_parquet_file():
+    file size, and DuckDB time for a full scan and a key lookup per table.
+
+    Args:
+        tables: dict table name -> DataFrame (e.g. the pipeline result)
+        directory: Scratch directory for the two sets of files
+        repeats: Runs per query (best time is reported)
+
+    Returns:
+        DataFrame with: table, layout, bytes, scan_ms, lookup_ms
+    """
+    import duckdb
+
+    os.makedirs(directory, exist_ok=True)
+    con = duckdb.connect()
+
+    def best_ms(sql: str) -> float:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            con.execute(sql).fetchall()
+            times.append(time.perf_counter() - start)
+        return round(1000 * min(times), 2)
+
+    rows = []
+    for table_name, df in tables.items():
+        if len(df) == 0:
+            continue
+        key = (PARQUET_SORT_KEYS.get(table_name) or [df.columns[0]])[0]
+        # A key from the middle of the key range
+        probe = sorted(df[key].dropna().astype(str))[len(df) // 2].replace("'", "''")
+        for layout in ('default', 'tuned'):
+            path = os.path.join(directory, f"{layout}_{table_name}.parquet")
+            if layout == 'default':
+                df.to_parquet(path, index=False, engine='pyarrow')
+            else:
+                write_parquet_file(df, path, table_name)
+            rows.append({
+                'table': table_name,
+                'layout': layout,
+                'bytes': os.path.getsize(path),
+                'scan_ms': best_ms(f"SELECT COUNT(*), COUNT(DISTINCT {key}) FROM read_parquet('{path}')"),
+                'lookup_ms': best_ms(f"SELECT * FROM read_parquet('{path}') WHERE {key} = '{probe}'"),
+            })
+    con.close()
+    return pd.DataFrame(rows)
+
+
+# =============================================================================
+# Streaming Parquet Writer (one row group per chunk)
+# =============================================================================
+# Used by the streaming export: every chunk of paintings is appended as a row
+# group as soon as it is processed, so nothing but the current chunk stays in
+# memory.  Files are written as <name>.parquet.tmp and renamed on close, so an
+# aborted run never replaces a complete table with a partial one.  Chunks
+# follow the SPARQL page order (ORDER BY ?painting), so the paintings and
+# painting_* files are in nfdi_uri order across row groups as well.
+
+class ParquetChunkWriter:
+    """
+    Append DataFrame chunks to Parquet tables, one row group per chunk.
+
+    Chunks are written with the tuned settings of write_parquet_file() (each
+    chunk is sorted on its own).  Tables without a declared schema get the
+    schema of their first non-empty chunk; later chunks are cast to it
+    (missing columns are written as nulls).
+
+    Usage:
+        with ParquetChunkWriter() as writer:
+            for chunk in chunks:
+                writer.write('paintings', chunk)
+        writer.rows  # {'paintings': 6228}
+    """
+
+    def __init__(self, directory: str = None, metadata: dict = None):
+        self.directory = directory
+        self.metadata = metadata or {}
+        self.rows = {}
+        self._writers = {}
+        self._schemas = {}
+        self._empty_columns = {}
+
+    def path(self, table_name: str) -> str:
+        if self.directory:
+            return os.path.join(self.directory, f"{PARQUET_PREFIX}{table_name}.parquet")
+        return get_parquet_path(table_name)
+
+    def _open(self, table_name: str, schema: pa.Schema) -> None:
+        self._schemas[table_name] = schema
+        self._writers[table_name] = pq.ParquetWriter(self.path(table_name) + '.tmp', schema,
+                                                     **parquet_write_options(schema))
+
+    def write(self, table_name: str, df: pd.DataFrame) -> int:
+        """Append ``df`` as a row group of ``table_name``; returns rows written."""
+        if df is None or len(df) == 0:
+            self.rows.setdefault(table_name, 0)
+            if df is not None and len(df.columns):
+                self._empty_columns.setdefault(table_name, list(df.columns))
+            return 0
+        table = dataframe_to_arrow(df, table_name)
+        schema = self._schemas.get(table_name)
+        if schema is None:
+            self._open(table_name, table.schema)
+        else:
+            columns = [table.column(f.name) if f.name in table.column_names
+                       else pa.nulls(len(table), f.type) for f in schema]
+            table = pa.Table.from_arrays(columns, schema=schema.remove_metadata()).cast(schema)
+        self._writers[table_name].write_table(table, row_group_size=PARQUET_ROW_GROUP_SIZE)
+        self.rows[table_name] = self.rows.get(table_name, 0) + len(table)
+        return len(table)
+
+    def close(self, commit: bool = True) -> Dict[str, str]:
+        """
+        Finish all files; with commit=False (after an error) drop them instead.
+
+        Returns:
+            dict table name -> path of the written file
+        """
+        paths = {}
+        if commit:
+            # Tables that never got a row are still written (empty)
+            for table_name, columns in self._empty_columns.items():
+                if table_name not in self._writers:
+                    self._open(table_name, dataframe_to_arrow(pd.DataFrame(columns=columns), table_name).schema)
+        for table_name, writer in self._writers.items():
+            tmp_path = self.path(table_name) + '.tmp'
+            if commit:
+                writer.add_key_value_metadata({PARQUET_METADATA_KEY: json.dumps({
+                    **self.metadata,
+                    'table': table_name,
+                    'export_date': datetime.now().isoformat(),
+                    'row_count': self.rows.get(table_name, 0),
+                    'columns': self._schemas[table_name].names,
+                    'sorted_by': [k for k in PARQUET_SORT_KEYS.get(table_name, [])
+                                  if k in self._schemas[table_name].names],
+                    'sorted_within': 'row_group',
+                }, default=str)})
+            writer.close()
+            if commit:
+                os.replace(tmp_path, self.path(table_name))
+                paths[table_name] = self.path(table_name)
+                record_metric('parquet.files_written')
+                record_metric('parquet.bytes_written', os.path.getsize(paths[table_name]))
+            else:
+                os.remove(tmp_path)
+        self._writers.clear()
+        return paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+        return False
+
+
+def enrich_coordinates(df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+    """
+    Enrich DataFrame with coordinates from buildings.
+    
+    Fills missing lat/lon using (all local, no per-building network calls):
+    1. CbDD graph building coordinates (join on building_id)
+    2. The NFDI4Culture gazetteer (harvested once, matched per unique building name)
+    
+    Args:
+        df: DataFrame with 'building_name' or 'building_id' column
+        verbose: Print progress
+    
+    Returns:
+        DataFrame with enriched 'lat' and 'lon' columns and a
+        'coord_match_type' column (graph / exact / normalized / partial / city)
+    """
+    if 'lat' not in df.columns:
+        df['lat'] = None
+    if 'lon' not in df.columns:
+        df['lon'] = None
+    if 'coord_match_type' not in df.columns:
+        df['coord_match_type'] = None
+    
+    # Count initial state
+    initial_coords = df['lat'].notna().sum()
+    
+    if verbose:
+        print(f"   Starting with {initial_coords:,}/{len(df):,} coordinates")
+    
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    def missing() -> pd.Series:
+        return df['lat'].isna() | df['lon'].isna()
+    
+    # 1. CbDD building coordinates, resolved once per building id
+    if 'building_id' in df.columns:
+        graph_coords = {}
+        for building_id in df.loc[missing(), 'building_id'].dropna().unique():
+            node = graph._cbdd_nodes_by_id.get(building_id) or {}
+            lat = node.get('lat') or node.get('latitude')
+            lon = node.get('lon') or node.get('longitude')
+            if lat and lon:
+                graph_coords[building_id] = (float(lat), float(lon))
+        if graph_coords:
+            mask = missing() & df['building_id'].isin(graph_coords.keys())
+            coords = df.loc[mask, 'building_id'].map(graph_coords)
+            df.loc[mask, 'lat'] = coords.str[0]
+            df.loc[mask, 'lon'] = coords.str[1]
+            df.loc[mask, 'coord_match_type'] = 'graph'
+    
+    # 2. Gazetteer match, resolved once per unique building name
+    if 'building_name' in df.columns:
+        names = df.loc[missing(), 'building_name'].dropna().astype(str).str.strip()
+        matches = {}
+        for name in names[names != ''].unique():
+            match = get_building_coordinates_from_kg(name)
+            if match:
+                matches[name] = match
+        if matches:
+            mask = missing() & df['building_name'].astype(str).str.strip().isin(matches.keys())
+            matched = df.loc[mask, 'building_name'].astype(str).str.strip().map(matches)
+            df.loc[mask, 'lat'] = matched.map(lambda m: m['lat'])
+            df.loc[mask, 'lon'] = matched.map(lambda m: m['lon'])
+            df.loc[mask, 'coord_match_type'] = matched.map(lambda m: m['match_type'])
+    
+    final_coords = df['lat'].notna().sum()
+    
+    if verbose:
+        print(f"   Enriched {final_coords - initial_coords:,} additional coordinates")
+        print(f"   Final: {final_coords:,}/{len(df):,} ({100*final_coords/len(df):.1f}%)")
+        match_counts = df['coord_match_type'].value_counts()
+        if not match_counts.empty:
+            print(f"   Match types: {match_counts.to_dict()}")
+    
+    return df
@@ -0,0 +1,204 @@
+"""Named, parameterized DuckDB queries: parsed once per connection, results cached per dataset version."""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+
+from .sparql import record_metric
+
+
+# =============================================================================
+# Query Registry and Result Cache
+# =============================================================================
+# The painter notebooks run the same handful of lookups (paintings,
+# buildings, collaborators, subjects, ... of one painter) again and again.
+# A QueryRegistry holds them by name:
+#
+#   queries = QueryRegistry(con, {'painter_works': "SELECT ... WHERE pp.person_name = ?"})
+#   works = queries.pl('painter_works', [name])
+#
+# Each SQL text is parsed once per connection (DuckDB Statement objects;
+# parameters are bound at execution) and every result is kept as an Arrow
+# table under (query name, parameters, dataset version).  The dataset version
+# is the size and mtime of the database file and its WAL, so every committed
+# write invalidates the cache without bookkeeping.  An in-memory database has
+# no such signal (an UPDATE keeps all sizes), so its results are not cached.
+# Neither do writes inside an open BEGIN ... COMMIT or to TEMP tables reach
+# the files: while a transaction is open, and for queries that name a TEMP
+# table or view, results are not cached either.
+# stats() reports calls, cache hits/misses and execution latency per query.
+
+QUERY_CACHE_MAX_ENTRIES = 512   # cached results per registry (least recently used dropped)
+
+# Transaction id of this statement and the names of the TEMP tables/views.
+# Two calls of txid_current() return the same id only inside an explicit
+# transaction (every autocommit statement gets a new one).
+_CONNECTION_STATE_SQL = """
+    SELECT txid_current(),
+           coalesce((SELECT list(table_name) FROM duckdb_tables() WHERE temporary), [])
+           || coalesce((SELECT list(view_name) FROM duckdb_views() WHERE temporary AND NOT internal), [])
+"""
+
+
+def _freeze(value):
+    """Hashable form of a query parameter (lists become tuples)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class QueryRegistry:
+    """
+    Named, parameterized queries on one DuckDB connection with a result cache.
+
+    Results are cached only where a change of the data is visible in the
+    database files (see dataset_version()): not for in-memory databases, not
+    while an explicit transaction is open, and not for queries that read TEMP
+    tables or views.  After other writes that bypass the files, call clear().
+
+    Args:
+        con: DuckDB connection (can be set later with bind())
+        queries: dict name -> SQL with ``?`` parameters
+        max_entries: Size bound of the result cache
+    """
+
+    def __init__(self, con=None, queries: Dict[str, str] = None,
+                 max_entries: int = QUERY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._sql = {}
+        self._statements = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'calls': 0, 'hits': 0, 'misses': 0,
+                                           'exec_ms_total': 0.0, 'exec_ms_max': 0.0})
+        self.con = None
+        self._db_files = []
+        for name, sql in (queries or {}).items():
+            self.register(name, sql)
+        if con is not None:
+            self.bind(con)
+
+    def register(self, name: str, sql: str) -> None:
+        """Add (or replace) the query ``name``; cached results of a replaced query are dropped."""
+        with self._lock:
+            if self._sql.get(name) not in (None, sql):
+                self._statements.pop(name, None)
+                for key in [k for k in self._cache if k[0] == name]:
+                    del self._cache[key]
+            self._sql[name] = sql
+
+    def bind(self, con) -> None:
+        """Use connection ``con``: statements are parsed again, cached results stay valid per version."""
+        with self._lock:
+            self.con = con
+            self._statements = {}
+            path = con.execute("""
+                SELECT path FROM duckdb_databases() WHERE database_name = current_database()
+            """).fetchone()[0]
+            self._db_files = [path, f"{path}.wal"] if path else []
+
+    def dataset_version(self) -> Optional[str]:
+        """
+        Version of the data behind the connection: size and mtime of the
+        database file and its WAL, which change with every committed write.
+        None for an in-memory database (results are then not cached).
+        """
+        if not self._db_files:
+            return None
+        return ';'.join(f"{st.st_size}:{st.st_mtime_ns}"
+                        for st in (os.stat(p) for p in self._db_files if os.path.exists(p)))
+
+    def _cacheable(self, name: str) -> bool:
+        """False while a transaction is open or if query ``name`` names a TEMP table/view."""
+        txid, temp_names = self.con.execute(_CONNECTION_STATE_SQL).fetchone()
+        if self.con.execute("SELECT txid_current()").fetchone()[0] == txid:
+            return False
+        sql = self._sql[name]
+        return not any(re.search(rf'\b{re.escape(temp_name)}\b', sql, re.IGNORECASE)
+                       for temp_name in temp_names)
+
+    def _statement(self, name: str):
+        statement = self._statements.get(name)
+        if statement is None:
+            statement = self._statements[name] = self.con.extract_statements(self._sql[name])[0]
+        return statement
+
+    def run(self, name: str, params: Sequence = ()) -> pa.Table:
+        """Result of query ``name`` for ``params`` as an Arrow table (from the cache if possible)."""
+        if self.con is None:
+            raise RuntimeError("QueryRegistry has no connection - call bind(con) first")
+        if name not in self._sql:
+            raise KeyError(f"Unknown query {name!r} (registered: {', '.join(sorted(self._sql))})")
+        params = list(params)
+        version = self.dataset_version()
+        cacheable = version is not None and self._cacheable(name)
+        key = (name, _freeze(params), version) if cacheable else None
+        stats = self._stats[name]
+        with self._lock:
+            stats['calls'] += 1
+            result = self._cache.get(key) if key is not None else None
+            if result is not None:
+                self._cache.move_to_end(key)
+                stats['hits'] += 1
+        if result is not None:
+            record_metric('queries.cache_hits')
+            return result
+
+        record_metric('queries.cache_misses')
+        start = time.perf_counter()
+        cursor = self.con.execute(self._statement(name), params)
+        # to_arrow_table() replaces fetch_arrow_table() in DuckDB >= 1.4
+        result = cursor.to_arrow_table() if hasattr(cursor, 'to_arrow_table') else cursor.fetch_arrow_table()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            stats['misses'] += 1
+            stats['exec_ms_total'] += elapsed_ms
+            stats['exec_ms_max'] = max(stats['exec_ms_max'], elapsed_ms)
+            if key is not None:
+                self._cache[key] = result
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return result
+
+    def pl(self, name: str, params: Sequence = ()):
+        """Result as a polars DataFrame (zero-copy view of the cached Arrow table)."""
+        import polars as pl
+        return pl.from_arrow(self.run(name, params))
+
+    def df(self, name: str, params: Sequence = ()) -> pd.DataFrame:
+        """Result as a pandas DataFrame."""
+        return self.run(name, params).to_pandas()
+
+    def fetchone(self, name: str, params: Sequence = ()) -> Optional[tuple]:
+        """First row of the result as a tuple (None if empty)."""
+        result = self.run(name, params)
+        if result.num_rows == 0:
+            return None
+        return tuple(column[0].as_py() for column in result.columns)
+
+    def clear(self) -> None:
+        """Drop all cached results (statements and statistics are kept)."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> pd.DataFrame:
+        """Per query: calls, cache hits/misses, hit rate and execution latency of the misses."""
+        with self._lock:
+            rows = [{'query': name, **values} for name, values in self._stats.items()]
+        if not rows:
+            return pd.DataFrame(columns=['query', 'calls', 'hits', 'misses', 'hit_rate',
+                                         'exec_ms_mean', 'exec_ms_max'])
+        df = pd.DataFrame(rows)
+        df['hit_rate'] = (df['hits'] / df['calls']).round(3)
+        df['exec_ms_mean'] = (df['exec_ms_total'] / df['misses'].where(df['misses'] > 0)).round(2)
+        df['exec_ms_max'] = df['exec_ms_max'].round(2)
+        return (df[['query', 'calls', 'hits', 'misses', 'hit_rate', 'exec_ms_mean', 'exec_ms_max']]
+                .sort_values('calls', ascending=False).reset_index(drop=True))
@@ -0,0 +1,113 @@
+"""SPARQL access to the NFDI4Culture knowledge graph and run instrumentation."""
+
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+# NFDI4Culture SPARQL endpoint
+ENDPOINT_URL = "https://nfdi4culture.de/sparql"
+
+# Prefixes used in queries
+# NOTE: The KG uses http://schema.org/ (not https://)
+PREFIXES = """\
+PREFIX fabio: <http://purl.org/spar/fabio/>
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX nfdicore: <https://nfdi.fiz-karlsruhe.de/ontology/>
+PREFIX schema:  <http://schema.org/>
+PREFIX dcterms: <http://purl.org/dc/terms/>
+PREFIX dcat:    <http://www.w3.org/ns/dcat#>
+PREFIX n4c:     <https://nfdi4culture.de/id/>
+PREFIX cto:     <https://nfdi4culture.de/ontology/>
+"""
+
+# Feed URIs of the two NFDI4Culture datasets used here
+CBDD_FEED_URI = "n4c:E6077"       # Corpus der barocken Deckenmalerei
+BILDINDEX_FEED_URI = "n4c:E6161"  # Bildindex der Kunst und Architektur
+
+# Run instrumentation: network helpers count requests, retries, bytes and cache
+# hits via record_metric().  Counters go to a process-wide total and to every
+# metrics_scope() open in the calling thread (one scope per pipeline stage).
+
+_metrics_lock = threading.Lock()
+_metrics_totals = defaultdict(float)
+_metrics_local = threading.local()
+
+
+def record_metric(name: str, value: float = 1) -> None:
+    """Add ``value`` to counter ``name`` (e.g. 'sparql.requests', 'sparql.bytes')."""
+    with _metrics_lock:
+        _metrics_totals[name] += value
+    for scope in getattr(_metrics_local, 'scopes', ()):
+        scope[name] += value
+
+
+@contextmanager
+def metrics_scope():
+    """Collect the counters recorded in this thread while the block runs."""
+    scope = defaultdict(float)
+    scopes = getattr(_metrics_local, 'scopes', None)
+    if scopes is None:
+        scopes = _metrics_local.scopes = []
+    scopes.append(scope)
+    try:
+        yield scope
+    finally:
+        scopes.remove(scope)
+
+
+def run_sparql(query: str, max_retries: int = 3, timeout: int = 30) -> pd.DataFrame:
+    """Run a SPARQL query against the NFDI4Culture endpoint and return a pandas DataFrame.
+
+    The query body should *not* include prefixes, they are automatically prepended.
+    Includes retry logic with exponential backoff for transient network errors.
+    """
+    import time as _time
+    from SPARQLWrapper import SPARQLWrapper, JSON
+    from urllib.error import URLError
+
+    sparql = SPARQLWrapper(ENDPOINT_URL)
+    sparql.setReturnFormat(JSON)
+    sparql.setTimeout(timeout)
+    sparql.setQuery(PREFIXES + "\n" + query)
+
+    last_error = None
+    for attempt in range(max_retries):
+        try:
+            record_metric('sparql.requests')
+            body = sparql.query().response.read()
+            record_metric('sparql.bytes', len(body))
+            results = json.loads(body)
+
+            # Be defensive: ensure results is a dict and extract bindings safely
+            if not isinstance(results, dict):
+                return pd.DataFrame()
+
+            bindings = results.get("results", {}).get("bindings", [])
+            rows = []
+            for binding in bindings:
+                # each binding is a dict of variable -> { "type": ..., "value": ... }
+                row = {var: val.get("value") for var, val in binding.items()}
+                rows.append(row)
+            return pd.DataFrame(rows)
+
+        except (URLError, ConnectionError, TimeoutError, OSError) as e:
+            last_error = e
+            record_metric('sparql.retries')
+            wait = 2 ** attempt * 5  # 5s, 10s, 20s
+            print(f"   ⚠ SPARQL request failed (attempt {attempt+1}/{max_retries}): {e}")
+            print(f"     Retrying in {wait}s...")
+            _time.sleep(wait)
+        except Exception as e:
+            # Non-retryable error
+            record_metric('sparql.errors')
+            print(f"   ❌ SPARQL query error: {e}")
+            return pd.DataFrame()
+
+    record_metric('sparql.errors')
+    print(f"   ❌ SPARQL query failed after {max_retries} retries: {last_error}")
+    return pd.DataFrame()
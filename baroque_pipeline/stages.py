@@ -0,0 +1,476 @@
+"""Pipeline stage DAG: content-hashed checkpoints, resume and JSON run reports."""
+
+import cProfile
+import hashlib
+import importlib
+import json
+import os
+import pstats
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import parquet
+from .parquet import PARQUET_PREFIX
+from .sparql import _metrics_totals, metrics_scope
+
+# =============================================================================
+# Pipeline Stages: Content-Hashed Checkpoints and Resume
+# =============================================================================
+# The export pipeline is a DAG of named stages.  Every stage writes its output
+# tables as Parquet artifacts under PIPELINE_CHECKPOINT_DIR/<stage>/<key>/,
+# where <key> hashes the stage name and version, its parameters, any external
+# inputs (e.g. graphData.json) and the *content hashes* of its upstream
+# outputs.  Consequences:
+#   - a stage whose inputs did not change is loaded instead of recomputed
+#   - an interrupted run resumes after the last completed stage
+#   - if an upstream stage re-runs but produces identical data, downstream
+#     stages are still skipped
+# Artifacts are written to a temporary directory and renamed when complete,
+# so a crash mid-stage never leaves a half-written checkpoint behind.
+# Stages whose dependencies are satisfied run concurrently in a thread pool.
+#
+# Every stage is measured (wall/CPU time including process-pool workers, peak
+# RSS, rows in/out and the record_metric() counters of the network helpers it
+# called); the pipeline writes these as a JSON run report next to the Parquet
+# files, and diff_run_reports() compares two reports to spot regressions.
+
+
+try:
+    import resource  # peak RSS, child process CPU time (Unix only)
+except ImportError:
+    resource = None
+
+PIPELINE_CHECKPOINT_DIR = os.path.join(parquet.PARQUET_OUTPUT_DIR, '.pipeline_checkpoints')
+
+# lru_cache'd helpers whose hit rates go into the run report
+REPORT_LRU_CACHES = ['coordinates.get_building_coordinates_from_kg', 'vocab.resolve_gnd_uri',
+                     'vocab.resolve_ontology_code']
+
+
+def hash_file(path: str) -> Optional[str]:
+    """SHA-256 of a file's content (None if the file does not exist)."""
+    if not path or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_stage_artifact(df: pd.DataFrame, path: str) -> str:
+    """
+    Write one stage table as Parquet and return its content hash.
+
+    Object columns Arrow cannot type (mixed lists/dicts) are stored as JSON
+    strings; their names are kept in the file metadata for read_stage_artifact().
+    """
+    df = df.reset_index(drop=True)
+    json_columns = []
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object and df[col].map(lambda v: isinstance(v, (list, dict))).any():
+                df[col] = df[col].map(lambda v: json.dumps(v, ensure_ascii=False, default=str))
+                json_columns.append(col)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'json_columns'] = json.dumps(json_columns).encode()
+    pq.write_table(table.replace_schema_metadata(metadata), path)
+    return hash_file(path)
+
+
+def read_stage_artifact(path: str) -> pd.DataFrame:
+    """Read a table written by write_stage_artifact() (list columns come back as lists)."""
+    table = pq.read_table(path)
+    df = table.to_pandas()
+    for i, field in enumerate(table.schema):
+        if pa.types.is_list(field.type) or pa.types.is_large_list(field.type):
+            df[field.name] = table.column(i).to_pylist()
+    json_columns = json.loads((table.schema.metadata or {}).get(b'json_columns', b'[]'))
+    for col in json_columns:
+        df[col] = df[col].map(lambda v: json.loads(v) if isinstance(v, str) else v)
+    return df
+
+
+def stage_key(name: str, stage: dict, params: dict, input_hashes: Dict[str, str]) -> str:
+    """Checkpoint key of a stage: hash of name, version, parameters and input hashes."""
+    external = stage.get('external')
+    payload = {
+        'stage': name,
+        'version': stage.get('version', '1'),
+        'params': {p: params.get(p) for p in stage.get('params', [])},
+        'inputs': {dep: input_hashes[dep] for dep in stage.get('deps', [])},
+        'external': external() if external else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+
+def _load_checkpoint(stage_dir: str) -> Optional[Tuple[Dict[str, pd.DataFrame], str]]:
+    """Load a completed checkpoint -> (tables, output hash), or None."""
+    manifest_path = os.path.join(stage_dir, '_manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    tables = {name: read_stage_artifact(os.path.join(stage_dir, f"{name}.parquet"))
+              for name in manifest['tables']}
+    return tables, manifest['output_hash']
+
+
+def _save_checkpoint(stage_dir: str, name: str, key: str,
+                     tables: Dict[str, pd.DataFrame], seconds: float) -> str:
+    """Write a stage's tables atomically and return the combined output hash."""
+    tmp_dir = stage_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    table_hashes = {table_name: write_stage_artifact(df, os.path.join(tmp_dir, f"{table_name}.parquet"))
+                    for table_name, df in tables.items()}
+    output_hash = hashlib.sha256(json.dumps(table_hashes, sort_keys=True).encode()).hexdigest()
+    manifest = {
+        'stage': name,
+        'key': key,
+        'tables': table_hashes,
+        'output_hash': output_hash,
+        'seconds': round(seconds, 3),
+        'completed_at': datetime.now().isoformat(),
+    }
+    with open(os.path.join(tmp_dir, '_manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(stage_dir, ignore_errors=True)
+    os.replace(tmp_dir, stage_dir)
+    return output_hash
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _count_rows(tables: Dict[str, pd.DataFrame]) -> int:
+    return int(sum(len(df) for df in tables.values()))
+
+
+def _cache_hit_rates(counters: Dict[str, float]) -> Dict[str, float]:
+    """'<name>.cache_hits' / '<name>.cache_misses' counters -> hit rate per name."""
+    rates = {}
+    for key in counters:
+        if key.endswith('.cache_hits'):
+            name = key[:-len('.cache_hits')]
+            hits, misses = counters[key], counters.get(f"{name}.cache_misses", 0)
+            rates[name] = round(hits / (hits + misses), 3) if hits + misses else None
+    return rates
+
+
+def _profile_breakdown(profiler: cProfile.Profile, top: int = 15) -> List[Dict[str, Any]]:
+    """Top functions of a stage by cumulative time (the stage -> function layer of a flame graph)."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{func} ({os.path.basename(filename)}:{line})",
+            'calls': calls,
+            'tottime_s': round(tottime, 4),
+            'cumtime_s': round(cumtime, 4),
+        })
+    rows.sort(key=lambda r: (-r['cumtime_s'], r['function']))
+    return rows[:top]
+
+
+def _children_cpu_s() -> float:
+    """User + system CPU time of terminated child processes (0 where unsupported)."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _measure_stage(fn, profile: bool = False) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run fn() and return (result, metrics): wall/CPU time, peak RSS, counters.
+
+    cpu_s is the CPU time of the calling thread plus that of the child
+    processes reaped meanwhile (the extractor process pool); children_cpu_s
+    is the latter alone.  Child time is process-wide, so stages running
+    concurrently with a pool stage may share its attribution.
+    """
+    rss_before = _peak_rss_mb()
+    profiler = cProfile.Profile() if profile else None
+    wall_start, cpu_start, children_start = time.perf_counter(), time.thread_time(), _children_cpu_s()
+    with metrics_scope() as counters:
+        if profiler:
+            profiler.enable()
+        try:
+            result = fn()
+        finally:
+            if profiler:
+                profiler.disable()
+    rss_after = _peak_rss_mb()
+    children_cpu = _children_cpu_s() - children_start
+    metrics = {
+        'wall_s': round(time.perf_counter() - wall_start, 3),
+        'cpu_s': round(time.thread_time() - cpu_start + children_cpu, 3),
+        'children_cpu_s': round(children_cpu, 3),
+        'peak_rss_mb': rss_after,
+        'peak_rss_delta_mb': round(rss_after - rss_before, 1) if rss_after is not None else None,
+        'counters': {k: counters[k] for k in sorted(counters)},
+        'cache_hit_rates': _cache_hit_rates(counters),
+    }
+    if profiler:
+        metrics['profile'] = _profile_breakdown(profiler)
+    return result, metrics
+
+
+def _merge_stage_metrics(stage_reports: Dict[str, dict], name: str, metrics: Dict[str, Any],
+                         rows_in: int, rows_out: int) -> None:
+    """
+    Add one measurement of a stage to its report entry (summing over repeated
+    runs, e.g. the chunks of the streaming export).
+    """
+    entry = stage_reports.setdefault(name, {
+        'status': 'ran', 'runs': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'children_cpu_s': 0.0, 'peak_rss_mb': None,
+        'peak_rss_delta_mb': 0.0, 'counters': {}, 'rows_in': 0, 'rows_out': 0,
+    })
+    entry['runs'] += 1
+    entry['wall_s'] = round(entry['wall_s'] + metrics['wall_s'], 3)
+    entry['cpu_s'] = round(entry['cpu_s'] + metrics['cpu_s'], 3)
+    entry['children_cpu_s'] = round(entry['children_cpu_s'] + metrics['children_cpu_s'], 3)
+    if metrics['peak_rss_mb'] is not None:
+        entry['peak_rss_mb'] = max(entry['peak_rss_mb'] or 0, metrics['peak_rss_mb'])
+        entry['peak_rss_delta_mb'] = round(entry['peak_rss_delta_mb'] + metrics['peak_rss_delta_mb'], 1)
+    for key, value in metrics['counters'].items():
+        entry['counters'][key] = entry['counters'].get(key, 0) + value
+    entry['cache_hit_rates'] = _cache_hit_rates(entry['counters'])
+    entry['rows_in'] += rows_in
+    entry['rows_out'] += rows_out
+    if 'profile' in metrics:
+        merged = {row['function']: dict(row) for row in entry.get('profile', [])}
+        for row in metrics['profile']:
+            if row['function'] in merged:
+                for field in ('calls', 'tottime_s', 'cumtime_s'):
+                    merged[row['function']][field] = round(merged[row['function']][field] + row[field], 4)
+            else:
+                merged[row['function']] = dict(row)
+        entry['profile'] = sorted(merged.values(), key=lambda r: (-r['cumtime_s'], r['function']))[:15]
+
+
+def run_stage_dag(stages: Dict[str, dict], params: dict,
+                  checkpoint_dir: str = PIPELINE_CHECKPOINT_DIR,
+                  resume: bool = True, force: List[str] = None,
+                  max_concurrent: int = 2, report: dict = None,
+                  profile: bool = False) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Run a DAG of stages with content-hashed checkpoints.
+
+    Each stage is a dict:
+        deps:     names of upstream stages
+        run:      callable(inputs, params) -> {table_name: DataFrame};
+                  inputs maps each dep to its tables (treat them as read-only)
+        params:   names of the entries of ``params`` that affect the stage
+        version:  bump to invalidate old checkpoints after a code change
+        external: optional callable returning extra hash input (e.g. a file hash)
+        cache:    False for stages with side effects only (never checkpointed)
+
+    Args:
+        stages: Stage definitions (name -> dict), in any order
+        params: Pipeline parameters
+        checkpoint_dir: Root directory for stage artifacts
+        resume: Reuse completed checkpoints with a matching key
+        force: Stage names to recompute even if a checkpoint exists
+        max_concurrent: Stages run at the same time (1 = sequential)
+        report: Optional dict; per-stage metrics are stored in report['stages']
+        profile: Add a cProfile breakdown per stage to the report (runs stages
+                 sequentially - only one profiler can be active at a time)
+
+    Returns:
+        dict stage name -> {table_name: DataFrame}
+    """
+    force = set(force or [])
+    unknown = force - set(stages)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}")
+
+    if profile:
+        max_concurrent = 1
+    stage_reports = report.setdefault('stages', {}) if report is not None else {}
+
+    results, output_hashes = {}, {}
+    pending = dict(stages)
+    running = {}
+
+    def execute(name: str, key: str) -> Tuple[Dict[str, pd.DataFrame], str, str]:
+        stage = stages[name]
+        stage_dir = os.path.join(checkpoint_dir, name, key)
+        inputs = {dep: results[dep] for dep in stage.get('deps', [])}
+
+        def run() -> Tuple[Dict[str, pd.DataFrame], str, str]:
+            if stage.get('cache', True) and resume and name not in force:
+                loaded = _load_checkpoint(stage_dir)
+                if loaded:
+                    return loaded[0], loaded[1], 'cached'
+            start = time.perf_counter()
+            tables = stage['run'](inputs, params) or {}
+            if not stage.get('cache', True):
+                return tables, key, 'ran'
+            output_hash = _save_checkpoint(stage_dir, name, key, tables, time.perf_counter() - start)
+            return tables, output_hash, 'ran'
+
+        (tables, output_hash, status), metrics = _measure_stage(run, profile=profile)
+        stage_reports[name] = {
+            'status': status,
+            'key': key,
+            'deps': list(stage.get('deps', [])),
+            **metrics,
+            'rows_in': sum(_count_rows(tables_in) for tables_in in inputs.values()),
+            'rows_out': _count_rows(tables),
+            'tables_out': {table_name: len(df) for table_name, df in tables.items()},
+        }
+        return tables, output_hash, status
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as pool:
+        while pending or running:
+            ready = [name for name, stage in pending.items()
+                     if all(dep in output_hashes for dep in stage.get('deps', []))]
+            for name in sorted(ready):
+                key = stage_key(name, pending.pop(name), params, output_hashes)
+                print(f"\n▶ Stage '{name}' [{key[:8]}]")
+                running[pool.submit(execute, name, key)] = name
+
+            if not running:
+                missing = {n: [d for d in s.get('deps', []) if d not in stages] for n, s in pending.items()}
+                raise ValueError(f"Unresolvable stage dependencies: {missing}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                tables, output_hash, status = future.result()
+                results[name] = tables
+                output_hashes[name] = output_hash
+                icon = '⏭' if status == 'cached' else '✓'
+                print(f"   {icon} Stage '{name}' {status} in {stage_reports[name]['wall_s']:.1f}s "
+                      f"({', '.join(tables) or 'no tables'})")
+
+    return results
+
+
+def write_run_report(report: dict, directory: str = None) -> str:
+    """
+    Complete a run report (totals, lru cache stats) and write it as JSON.
+
+    Reports are named <prefix>run_report_<timestamp>.json so consecutive runs
+    can be compared with diff_run_reports().
+
+    Returns:
+        Path of the written report
+    """
+    directory = directory or parquet.PARQUET_OUTPUT_DIR
+    os.makedirs(directory, exist_ok=True)
+    stages = report.get('stages', {})
+    report['totals'] = {
+        'stage_wall_s': round(sum(s['wall_s'] for s in stages.values()), 3),
+        'cpu_s': round(sum(s['cpu_s'] for s in stages.values()), 3),
+        'peak_rss_mb': _peak_rss_mb(),
+        'counters': {k: v for k, v in sorted(_metrics_totals.items())},
+    }
+    report['lru_caches'] = {}
+    for qualname in REPORT_LRU_CACHES:
+        module, name = qualname.rsplit('.', 1)
+        fn = getattr(importlib.import_module(f'.{module}', __package__), name, None)
+        if fn is not None and hasattr(fn, 'cache_info'):
+            info = fn.cache_info()
+            lookups = info.hits + info.misses
+            report['lru_caches'][name] = {
+                'hits': info.hits, 'misses': info.misses, 'size': info.currsize,
+                'hit_rate': round(info.hits / lookups, 3) if lookups else None,
+            }
+
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+    path = os.path.join(directory, f"{PARQUET_PREFIX}run_report_{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    return path
+
+
+def run_report_summary(report: dict) -> pd.DataFrame:
+    """One row per stage: status, wall/CPU time, RSS delta, rows, requests, bytes."""
+    rows = []
+    for name, stage in report.get('stages', {}).items():
+        counters = stage.get('counters', {})
+        rows.append({
+            'stage': name,
+            'status': stage['status'],
+            'wall_s': stage['wall_s'],
+            'cpu_s': stage['cpu_s'],
+            'rss_delta_mb': stage.get('peak_rss_delta_mb'),
+            'rows_in': stage['rows_in'],
+            'rows_out': stage['rows_out'],
+            'requests': sum(v for k, v in counters.items() if k.endswith('.requests')),
+            'retries': sum(v for k, v in counters.items() if k.endswith('.retries')),
+            'bytes': sum(v for k, v in counters.items() if k.endswith('.bytes')),
+        })
+    return pd.DataFrame(rows)
+
+
+def diff_run_reports(old, new, min_change: float = 0.1) -> pd.DataFrame:
+    """
+    Compare two run reports (paths or dicts) stage by stage.
+
+    Args:
+        old, new: Run reports (JSON paths or loaded dicts)
+        min_change: Relative change above which a metric is flagged
+
+    Returns:
+        DataFrame with: stage, metric, old, new, change (relative), flagged
+    """
+    def load(report):
+        if isinstance(report, dict):
+            return report
+        with open(report, encoding='utf-8') as f:
+            return json.load(f)
+
+    old_report, new_report = load(old), load(new)
+    old_summary = run_report_summary(old_report).set_index('stage')
+    new_summary = run_report_summary(new_report).set_index('stage')
+
+    rows = []
+    metrics = ['wall_s', 'cpu_s', 'rss_delta_mb', 'rows_in', 'rows_out', 'requests', 'retries', 'bytes']
+    for stage in sorted(set(old_summary.index) | set(new_summary.index)):
+        for metric in metrics:
+            a = old_summary[metric].get(stage) if stage in old_summary.index else None
+            b = new_summary[metric].get(stage) if stage in new_summary.index else None
+            if pd.isna(a) or pd.isna(b):
+                change = None
+            elif a == 0:
+                change = 0.0 if b == 0 else float('inf')
+            else:
+                change = round((b - a) / abs(a), 3)
+            rows.append({'stage': stage, 'metric': metric, 'old': a, 'new': b, 'change': change,
+                         'flagged': change is not None and abs(change) >= min_change})
+    return pd.DataFrame(rows)
+
+
+def clear_pipeline_checkpoints(stage_names: List[str] = None,
+                               checkpoint_dir: str = PIPELINE_CHECKPOINT_DIR) -> None:
+    """Delete checkpoints of the given stages (default: all)."""
+    if stage_names is None:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        return
+    for name in stage_names:
+        shutil.rmtree(os.path.join(checkpoint_dir, name), ignore_errors=True)
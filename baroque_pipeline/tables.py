@@ -0,0 +1,604 @@
+"""Entity and junction tables extracted from the CbDD graph (sequential or in a process pool)."""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from . import graph
+from .graph import (_traverse_to_building, get_building_info, get_painting_person_edges, get_room_info,
+                    load_cbdd_graph, neighbors, parents)
+
+
+# =============================================================================
+# Extract Normalized Entity Tables from CbDD Graph
+# =============================================================================
+# These functions extract standalone entity tables from the CbDD graph,
+# preserving all node IDs for relational integrity.
+
+def extract_persons_table() -> pd.DataFrame:
+    """
+    Extract all unique persons from the CbDD graph.
+    
+    Returns DataFrame with: person_id, name, person_type, val
+    """
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    persons = []
+    for node in graph._cbdd_graph['nodes']:
+        if node.get('type') in ('ACTOR_PERSON', 'ACTOR_SOCIETY'):
+            persons.append({
+                'person_id': node['id'],
+                'name': node.get('name', ''),
+                'person_type': node.get('type'),
+                'val': node.get('val')  # Network centrality value
+            })
+    
+    df = pd.DataFrame(persons)
+    print(f"   ✓ Extracted {len(df):,} persons ({(df['person_type'] == 'ACTOR_PERSON').sum():,} individuals, {(df['person_type'] == 'ACTOR_SOCIETY').sum():,} organizations)")
+    return df
+
+
+def extract_buildings_table() -> pd.DataFrame:
+    """
+    Extract all buildings with their metadata from CbDD graph.
+    
+    Returns DataFrame with: building_id, name, function, location_state, 
+                           construction_date, ensemble_id
+    """
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    buildings = []
+    for node in graph._cbdd_graph['nodes']:
+        if node.get('type') == 'OBJECT_BUILDING':
+            # Shared with get_painting_relations() via the building info cache
+            info = get_building_info(node['id'])
+            buildings.append({
+                'building_id': node['id'],
+                'name': node.get('name', ''),
+                'function': info.get('function'),
+                'location_state': info.get('location_state'),
+                'construction_date': info.get('construction_date'),
+                'ensemble_id': info.get('ensemble_id'),
+            })
+    
+    df = pd.DataFrame(buildings)
+    print(f"   ✓ Extracted {len(df):,} buildings")
+    print(f"      With function: {df['function'].notna().sum():,}")
+    print(f"      With location: {df['location_state'].notna().sum():,}")
+    return df
+
+
+def extract_rooms_table() -> pd.DataFrame:
+    """
+    Extract all rooms with their metadata from CbDD graph.
+    
+    Returns DataFrame with: room_id, name, function, building_id
+    """
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    rooms = []
+    for node in graph._cbdd_graph['nodes']:
+        if node.get('type') == 'OBJECT_ROOM':
+            # Shared with get_painting_relations() via the room info cache
+            room_info = get_room_info(node['id'])
+            
+            # Find parent building via PART links
+            building_id = None
+            for parent in parents(node['id'], 'PART', node_type=('OBJECT_BUILDING', 'OBJECT_ROOM')):
+                if parent.get('type') == 'OBJECT_BUILDING':
+                    building_id = parent['id']
+                else:
+                    # Room inside room - traverse up
+                    building = _traverse_to_building(parent['id'])
+                    if building:
+                        building_id = building['id']
+                break
+            
+            rooms.append({
+                'room_id': node['id'],
+                'name': node.get('name', ''),
+                'function': room_info.get('function'),
+                'building_id': building_id,
+            })
+    
+    df = pd.DataFrame(rooms)
+    print(f"   ✓ Extracted {len(df):,} rooms")
+    print(f"      Linked to buildings: {df['building_id'].notna().sum():,}")
+    return df
+
+
+def extract_ensembles_table() -> pd.DataFrame:
+    """
+    Extract all ensembles (building complexes) from CbDD graph.
+    
+    Returns DataFrame with: ensemble_id, name
+    """
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    ensembles = []
+    for node in graph._cbdd_graph['nodes']:
+        if node.get('type') == 'OBJECT_ENSEMBLE':
+            ensembles.append({
+                'ensemble_id': node['id'],
+                'name': node.get('name', ''),
+            })
+    
+    df = pd.DataFrame(ensembles)
+    print(f"   ✓ Extracted {len(df):,} ensembles")
+    return df
+
+
+# =============================================================================
+# Extract Junction Tables (Many-to-Many Relationships)
+# =============================================================================
+# These functions create the junction tables that link entities together,
+# preserving the role information from the CbDD graph.
+
+def extract_painting_persons_junction(df_enriched: pd.DataFrame,
+                                      person_edges: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Extract painting-person junction table with roles.
+    
+    The junction IS the long-format person edge table emitted by
+    enrich_dataframe_from_graph(..., return_person_edges=True); person IDs
+    come straight from the graph links, so there is no name -> ID lookup
+    (and no mix-up between actors sharing a name).
+    
+    Args:
+        df_enriched: DataFrame with enriched painting data (from enrich_dataframe_from_graph)
+        person_edges: Optional edge table from enrich_dataframe_from_graph;
+                      rebuilt from df_enriched['cbdd_id'] if not given
+    
+    Returns:
+        DataFrame with: nfdi_uri, cbdd_painting_id, person_id, person_name, role
+    """
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    columns = ['nfdi_uri', 'cbdd_painting_id', 'person_id', 'person_name', 'role']
+    
+    if person_edges is None:
+        junction_rows = []
+        for nfdi_uri, cbdd_id in zip(df_enriched['painting'], df_enriched['cbdd_id']):
+            if not cbdd_id or pd.isna(cbdd_id):
+                continue
+            for edge in get_painting_person_edges(cbdd_id):
+                junction_rows.append({'nfdi_uri': nfdi_uri, **edge})  # Primary: NFDI4Culture
+        person_edges = pd.DataFrame(junction_rows, columns=columns)
+    
+    df = person_edges[columns].reset_index(drop=True)
+    
+    # Show role distribution
+    if len(df) > 0:
+        role_counts = df['role'].value_counts()
+        print(f"   ✓ Extracted {len(df):,} painting-person relationships")
+        for role, count in role_counts.head(5).items():
+            print(f"      {role}: {count:,}")
+    
+    return df
+
+
+def extract_building_persons_junction() -> pd.DataFrame:
+    """
+    Extract building-person relationships directly from CbDD graph.
+    
+    Returns DataFrame with: building_id, person_id, person_name, role
+    """
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    junction_rows = []
+    
+    role_link_types = {
+        'ARCHITECTS': 'ARCHITECT',
+        'BUILDERS': 'BUILDER',
+        'COMMISSIONERS': 'COMMISSIONER',
+        'SCULPTORS': 'SCULPTOR',
+        'OWNERS': 'OWNER',
+        'PLASTERERS': 'PLASTERER',
+        'CONSTRUCTION_MANAGERS': 'CONSTRUCTION_MANAGER',
+        'LANDSCAPE_ARCHITECTS': 'LANDSCAPE_ARCHITECT',
+    }
+    
+    for node in graph._cbdd_graph['nodes']:
+        if node.get('type') != 'OBJECT_BUILDING':
+            continue
+        
+        building_id = node['id']
+        
+        for link_type, role in role_link_types.items():
+            for target in neighbors(building_id, link_type, node_type=('ACTOR_PERSON', 'ACTOR_SOCIETY')):
+                junction_rows.append({
+                    'building_id': building_id,
+                    'person_id': target['id'],
+                    'person_name': target.get('name', ''),
+                    'role': role,
+                })
+    
+    df = pd.DataFrame(junction_rows)
+    print(f"   ✓ Extracted {len(df):,} building-person relationships")
+    return df
+
+
+def extract_room_persons_junction() -> pd.DataFrame:
+    """
+    Extract room-person relationships directly from CbDD graph.
+    
+    Returns DataFrame with: room_id, person_id, person_name, role
+    """
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+    
+    junction_rows = []
+    
+    role_link_types = {
+        'ARCHITECTS': 'ARCHITECT',
+        'COMMISSIONERS': 'COMMISSIONER',
+        'PLASTERERS': 'PLASTERER',
+        'PAINTERS': 'PAINTER',
+        'SCULPTORS': 'SCULPTOR',
+        'DESIGNERS': 'DESIGNER',
+        'BUILDERS': 'BUILDER',
+    }
+    
+    for node in graph._cbdd_graph['nodes']:
+        if node.get('type') != 'OBJECT_ROOM':
+            continue
+        
+        room_id = node['id']
+        
+        for link_type, role in role_link_types.items():
+            for target in neighbors(room_id, link_type, node_type=('ACTOR_PERSON', 'ACTOR_SOCIETY')):
+                junction_rows.append({
+                    'room_id': room_id,
+                    'person_id': target['id'],
+                    'person_name': target.get('name', ''),
+                    'role': role,
+                })
+    
+    df = pd.DataFrame(junction_rows)
+    print(f"   ✓ Extracted {len(df):,} room-person relationships")
+    return df
+
+
+# =============================================================================
+# Create Main Paintings Table and Subjects Junction Table
+# =============================================================================
+
+# Multi-value columns: GROUP_CONCAT'd in the SPARQL query ('|') or joined by
+# the CbDD enrichment (' | ').  The paintings table stores them as lists
+# (Arrow list<string>), split once here instead of in every consumer.
+PAINTING_LIST_COLUMNS = ['subjects', 'painters', 'commissioners', 'creatorGnds', 'locationGnds']
+
+
+def split_multi_value(value) -> Optional[List[str]]:
+    """
+    'a | b|c' -> ['a', 'b', 'c'].  Lists/arrays pass through; missing or
+    empty values become None, so ``IS NOT NULL`` means "has values".
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        items = [item.strip() for item in value.split('|')]
+    elif hasattr(value, '__iter__'):
+        items = [str(item).strip() for item in value if item is not None]
+    elif pd.isna(value):
+        return None
+    else:
+        items = [str(value).strip()]
+    items = [item for item in items if item]
+    return items or None
+
+
+def create_paintings_table(df_enriched: pd.DataFrame) -> pd.DataFrame:
+    """
+    Create the main paintings table with all attributes and foreign keys.
+    
+    This table contains one row per painting with:
+    - Primary key: nfdi_uri (NFDI4Culture Knowledge Graph URI - THE MAIN SOURCE)
+    - Secondary key: cbdd_id (CbDD graphData.json node ID - for enrichment tracing)
+    - Foreign keys: room_id, building_id
+    - All metadata attributes
+    
+    Data Source Hierarchy:
+    1. NFDI4Culture KG (nfdi_uri) - PRIMARY source, provides SPARQL endpoint, images
+    2. CbDD graphData.json (cbdd_id) - Enriches with painters, buildings, rooms
+    3. ICONCLASS/Getty AAT - Enriches subject classifications
+    
+    Args:
+        df_enriched: Enriched DataFrame from the pipeline
+    
+    Returns:
+        Normalized paintings DataFrame
+    """
+    columns_to_keep = [
+        # PRIMARY KEY - NFDI4Culture Knowledge Graph URI
+        'painting',  # Will be renamed to nfdi_uri
+        
+        # Secondary key - CbDD graph node ID (for enrichment tracing)
+        'cbdd_id',
+        
+        # Foreign keys  
+        'room_id', 'building_id',
+        
+        # Basic metadata (from NFDI4Culture)
+        'label', 'year',
+        
+        # Geographic (enriched from building)
+        'lat', 'lon', 'building_address', 'location_state',
+        
+        # Content URLs (from NFDI4Culture)
+        'imageUrl', 'license',
+        
+        # Subjects (from NFDI4Culture, resolved via ICONCLASS/AAT)
+        'subjects',
+        
+        # Room and building context (denormalized for convenience, from CbDD)
+        'room_name', 'building_name', 'building_function',
+        
+        # Original SPARQL parent structure (from NFDI4Culture)
+        'parentUri', 'parentLabel',
+        
+        # CbDD enrichment fields
+        'painters', 'commissioners', 'method',
+        
+        # GNDs for Bildindex cross-referencing (from SPARQL)
+        'creatorGnds', 'locationGnds',
+    ]
+    
+    # Keep only columns that exist
+    existing_cols = [c for c in columns_to_keep if c in df_enriched.columns]
+    df = df_enriched[existing_cols].copy()
+    
+    # Rename primary key for clarity - this is THE NFDI4Culture URI
+    if 'painting' in df.columns:
+        df = df.rename(columns={'painting': 'nfdi_uri'})
+    
+    # Also keep painting_uri as alias for backward compatibility
+    if 'nfdi_uri' in df.columns:
+        df['painting_uri'] = df['nfdi_uri']
+    
+    # Add cbdd_painting_id alias
+    if 'cbdd_id' in df.columns:
+        df['cbdd_painting_id'] = df['cbdd_id']
+    
+    # Ensure numeric types for coordinates
+    for col in ['lat', 'lon']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # Multi-value columns -> lists
+    for col in PAINTING_LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(split_multi_value)
+    
+    print(f"   ✓ Created paintings table with {len(df):,} rows, {len(df.columns)} columns")
+    print(f"      Primary key: nfdi_uri (NFDI4Culture Knowledge Graph)")
+    print(f"      Secondary key: cbdd_id (CbDD graphData.json)")
+    # GND statistics for Bildindex integration
+    if 'creatorGnds' in df.columns:
+        has_creator = df['creatorGnds'].notna().sum()
+        print(f"      With creator GNDs: {has_creator:,} ({100*has_creator/len(df):.1f}%)")
+    if 'locationGnds' in df.columns:
+        has_location = df['locationGnds'].notna().sum()
+        print(f"      With location GNDs: {has_location:,} ({100*has_location/len(df):.1f}%)")
+    
+    return df
+
+
+def extract_painting_subjects_junction(df_enriched: pd.DataFrame) -> pd.DataFrame:
+    """
+    Extract painting-subject junction table from resolved subjects.
+    
+    Args:
+        df_enriched: DataFrame with 'subjects_resolved' column (list of dicts)
+    
+    Returns:
+        DataFrame with: nfdi_uri, cbdd_painting_id, subject_uri, subject_label, subject_source
+    """
+    junction_rows = []
+    
+    for idx, row in df_enriched.iterrows():
+        nfdi_uri = row.get('painting')  # NFDI4Culture URI
+        cbdd_id = row.get('cbdd_id')     # CbDD graph ID
+        subjects = row.get('subjects_resolved', [])
+        
+        if not subjects or not isinstance(subjects, list):
+            continue
+        
+        for subject in subjects:
+            if not isinstance(subject, dict):
+                continue
+            
+            junction_rows.append({
+                'nfdi_uri': nfdi_uri,           # Primary: NFDI4Culture
+                'cbdd_painting_id': cbdd_id,    # Secondary: CbDD
+                'subject_uri': subject.get('uri'),
+                'subject_label': subject.get('label'),
+                'subject_source': subject.get('source'),  # 'ICONCLASS' or 'GETTY_AAT'
+            })
+    
+    df = pd.DataFrame(junction_rows)
+    
+    if len(df) > 0:
+        print(f"   ✓ Extracted {len(df):,} painting-subject relationships")
+        source_counts = df['subject_source'].value_counts()
+        for src, count in source_counts.items():
+            print(f"      {src}: {count:,}")
+    else:
+        print("   ⚠ No subjects found in data")
+    
+    return df
+
+
+def extract_subjects_table(df_subjects_junction: pd.DataFrame) -> pd.DataFrame:
+    """
+    Extract unique subjects table from junction table.
+    
+    Args:
+        df_subjects_junction: The painting-subjects junction table
+    
+    Returns:
+        DataFrame with: subject_uri (PK), subject_label, subject_source
+    """
+    if len(df_subjects_junction) == 0:
+        return pd.DataFrame(columns=['subject_uri', 'subject_label', 'subject_source'])
+    
+    df = df_subjects_junction.drop_duplicates(subset=['subject_uri'])[
+        ['subject_uri', 'subject_label', 'subject_source']
+    ].copy()
+    
+    print(f"   ✓ Extracted {len(df):,} unique subjects")
+    return df
+
+
+# =============================================================================
+# Parallel Extraction of Entity and Junction Tables
+# =============================================================================
+# The entity and junction extractors are independent full passes over the
+# CbDD graph, so step 6 of the pipeline can run them in a process pool.
+#
+# Sharing: workers are forked from the kernel and inherit the loaded graph,
+# its indices and the enriched DataFrame as copy-on-write memory - nothing is
+# pickled on the way in.  Results come back as Arrow tables (Arrow IPC
+# buffers), which are cheap to serialize compared to pickled DataFrames.
+# Where 'fork' is unavailable (Windows) the extractors run sequentially.
+#
+# Logs: a worker process captures its own stdout and sends it back with the
+# result.  The sequential path prints directly - redirect_stdout swaps the
+# process-wide sys.stdout and would swallow the output of other pipeline
+# stages running in threads at the same time.
+
+
+# Inputs visible to forked workers (set right before the pool starts)
+_parallel_inputs = {}
+
+def _extract_painting_persons() -> pd.DataFrame:
+    return extract_painting_persons_junction(_parallel_inputs['df_enriched'],
+                                             _parallel_inputs.get('person_edges'))
+
+
+def _extract_painting_subjects() -> pd.DataFrame:
+    return extract_painting_subjects_junction(_parallel_inputs['df_enriched'])
+
+
+# Extractor name -> module-level function; all of them only read the graph / inputs
+PARALLEL_EXTRACTORS = {
+    'persons': extract_persons_table,
+    'buildings': extract_buildings_table,
+    'rooms': extract_rooms_table,
+    'ensembles': extract_ensembles_table,
+    'painting_persons': _extract_painting_persons,
+    'painting_subjects': _extract_painting_subjects,
+    'building_persons': extract_building_persons_junction,
+    'room_persons': extract_room_persons_junction,
+}
+
+
+def _run_extractor(name: str, capture_output: bool = False) -> Tuple[str, pa.Table, str, float]:
+    """
+    Run one extractor and return (name, Arrow table, captured log, seconds).
+
+    Only pool workers capture their output (``capture_output=True``); the
+    redirect is safe there because the worker process runs nothing else.
+    """
+    log = io.StringIO()
+    start = time.perf_counter()
+    with (contextlib.redirect_stdout(log) if capture_output else contextlib.nullcontext()):
+        df = PARALLEL_EXTRACTORS[name]()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return name, table, log.getvalue(), time.perf_counter() - start
+
+
+def _run_extractor_in_worker(name: str) -> Tuple[str, pa.Table, str, float]:
+    """Pool worker: run one extractor with its output captured."""
+    return _run_extractor(name, capture_output=True)
+
+
+def extract_tables_parallel(df_enriched: pd.DataFrame, person_edges: pd.DataFrame = None,
+                            max_workers: int = None, names: List[str] = None,
+                            verbose: bool = True) -> Dict[str, pa.Table]:
+    """
+    Run the entity/junction extractors in a process pool.
+
+    Args:
+        df_enriched: Enriched paintings (input of the painting junctions)
+        person_edges: Person edge table from enrich_dataframe_from_graph
+        max_workers: Pool size (None = CPU count, 1 = sequential in-process)
+        names: Subset of PARALLEL_EXTRACTORS to run (default: all)
+        verbose: Print each extractor's timing and the logs captured in the workers
+                 (sequential extractors print directly)
+
+    Returns:
+        dict table name -> pyarrow.Table (same keys as ``names``)
+    """
+    if not graph._cbdd_graph_loaded:
+        load_cbdd_graph()
+
+    names = list(names or PARALLEL_EXTRACTORS)
+    _parallel_inputs['df_enriched'] = df_enriched
+    _parallel_inputs['person_edges'] = person_edges
+
+    use_pool = (max_workers is None or max_workers > 1) and \
+        'fork' in multiprocessing.get_all_start_methods()
+
+    results = {}
+    try:
+        if use_pool:
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+                outputs = list(pool.map(_run_extractor_in_worker, names))
+        else:
+            outputs = [_run_extractor(name) for name in names]
+    finally:
+        _parallel_inputs.clear()
+
+    for name, table, log, seconds in outputs:
+        results[name] = table
+        if verbose:
+            print(f"   [{name}] {seconds:.2f}s")
+            print(log, end='')
+    return results
+
+
+def benchmark_parallel_extraction(df_enriched: pd.DataFrame, person_edges: pd.DataFrame = None,
+                                  max_workers: int = None, repeats: int = 1) -> pd.DataFrame:
+    """
+    Scaling benchmark: time extract_tables_parallel() with 1..N workers.
+
+    Args:
+        df_enriched: Enriched paintings DataFrame
+        person_edges: Person edge table from enrich_dataframe_from_graph
+        max_workers: Largest pool size to try (default: CPU count)
+        repeats: Runs per pool size (best time is reported)
+
+    Returns:
+        DataFrame with: workers, seconds, speedup, efficiency
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    rows = []
+    for workers in range(1, max_workers + 1):
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            extract_tables_parallel(df_enriched, person_edges, max_workers=workers, verbose=False)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        rows.append({'workers': workers, 'seconds': round(best, 3)})
+        print(f"   {workers:2d} worker(s): {best:.3f}s")
+
+    df = pd.DataFrame(rows)
+    df['speedup'] = (df['seconds'].iloc[0] / df['seconds']).round(2)
+    df['efficiency'] = (df['speedup'] / df['workers']).round(2)
+    return df
@@ -0,0 +1,387 @@
+"""Async URL validation: HEAD / range requests, per-host concurrency and backoff."""
+
+import asyncio
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import urljoin, urlsplit
+
+from .sparql import record_metric
+
+
+# =============================================================================
+# URL Validation Engine
+# =============================================================================
+# Checking that a page exists does not need the page: every URL gets a HEAD
+# request, or a 0-byte range GET (Range: bytes=0-0) if the server refuses
+# HEAD.  Redirects are followed by hand, so a redirect to the start page -
+# how Bildindex answers for withdrawn objects - counts as a dead link.
+#
+# Requests run on an event loop (the blocking urllib calls in a thread pool):
+#   - at most URL_CHECK_CONCURRENCY_PER_HOST requests per host at a time,
+#   - request starts per host at least URL_CHECK_MIN_INTERVAL seconds apart,
+#   - 429 / 503 and connection errors pause the whole host (Retry-After, or
+#     exponential backoff with jitter) and are retried.
+# Results stream out in completion order (iter_check_urls).
+#
+# With a UrlCheckCache, results are stored in SQLite (status, final URL,
+# ETag / Last-Modified, time of the check).  Entries younger than the TTL are
+# answered from disk; expired entries are revalidated with a conditional
+# request (If-None-Match / If-Modified-Since), where 304 keeps the stored
+# result.  Only new and expired URLs hit the network.
+
+URL_CHECK_CONCURRENCY_PER_HOST = 4
+URL_CHECK_MIN_INTERVAL = 0.2        # seconds between request starts per host
+URL_CHECK_MAX_CONNECTIONS = 16      # requests in flight over all hosts
+URL_CHECK_TIMEOUT = 10
+URL_CHECK_MAX_RETRIES = 4
+URL_CHECK_BACKOFF_SECONDS = 1.0     # 1s, 2s, 4s, 8s (+ up to 50% jitter)
+URL_CHECK_MAX_BACKOFF = 60.0
+URL_CHECK_MAX_REDIRECTS = 5
+URL_CHECK_USER_AGENT = 'Mozilla/5.0'
+URL_CHECK_CACHE_TTL = 7 * 24 * 3600  # seconds a stored result is used without revalidation
+
+RETRY_STATUS_CODES = {429, 503}
+REDIRECT_STATUS_CODES = {301, 302, 303, 307, 308}
+HEAD_REFUSED_STATUS_CODES = {405, 501}
+
+
+class UrlCheckResult(NamedTuple):
+    """Outcome of one URL check."""
+    url: str
+    is_valid: bool
+    status: str
+    final_url: Optional[str] = None      # after redirects
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    checked_at: Optional[float] = None   # unix time; None = not conclusive (network error, 429)
+    source: str = 'network'              # 'network' | 'cache' | 'revalidated'
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Return 3xx responses as HTTPError instead of following them."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirectHandler)
+
+
+def _request_status(url: str, method: str, timeout: float, conditional: Dict[str, str] = None):
+    """One blocking request; returns (status, headers) without reading the body."""
+    headers = {'User-Agent': URL_CHECK_USER_AGENT, **(conditional or {})}
+    if method == 'GET':
+        headers['Range'] = 'bytes=0-0'
+    request = urllib.request.Request(url, headers=headers, method=method)
+    try:
+        with _opener.open(request, timeout=timeout) as response:
+            return response.status, response.headers
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers
+
+
+def _retry_after(headers) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostLimiter:
+    """Concurrency limit, request spacing and backoff state of one host."""
+
+    def __init__(self, concurrency: int, min_interval: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.min_interval = min_interval
+        self.next_start = 0.0
+
+    async def wait_turn(self) -> None:
+        now = time.monotonic()
+        start = max(now, self.next_start)
+        self.next_start = start + self.min_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def back_off(self, seconds: float) -> None:
+        self.next_start = max(self.next_start, time.monotonic() + seconds)
+
+
+async def check_url(url: str, limiters: dict, executor: ThreadPoolExecutor,
+                    concurrency: int = URL_CHECK_CONCURRENCY_PER_HOST,
+                    min_interval: float = URL_CHECK_MIN_INTERVAL,
+                    timeout: float = URL_CHECK_TIMEOUT,
+                    max_retries: int = URL_CHECK_MAX_RETRIES,
+                    previous: UrlCheckResult = None) -> UrlCheckResult:
+    """
+    Check one URL (HEAD, range GET fallback, manual redirects, retries).
+
+    Args:
+        url: URL to check
+        limiters: host -> limiter, shared by all checks of one run
+        executor: Thread pool for the blocking requests
+        previous: Stored result; its ETag / Last-Modified make the request
+                  conditional, and a 304 answer returns it as 'revalidated'
+
+    Returns:
+        UrlCheckResult
+    """
+    if not isinstance(url, str) or not url:
+        return UrlCheckResult(url, False, "Empty URL")
+
+    conditional = {}
+    if previous is not None and previous.etag:
+        conditional['If-None-Match'] = previous.etag
+    if previous is not None and previous.last_modified:
+        conditional['If-Modified-Since'] = previous.last_modified
+
+    loop = asyncio.get_running_loop()
+    current, method, redirects, attempt = url, 'HEAD', 0, 0
+    while True:
+        host = urlsplit(current).netloc.lower()
+        if host not in limiters:
+            limiters[host] = _HostLimiter(concurrency, min_interval)
+        limiter = limiters[host]
+
+        status, headers, error = None, None, None
+        async with limiter.semaphore:
+            await limiter.wait_turn()
+            record_metric('urlcheck.requests')
+            try:
+                status, headers = await loop.run_in_executor(executor, _request_status,
+                                                              current, method, timeout, conditional)
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                error = e
+
+        if isinstance(error, ValueError):
+            return UrlCheckResult(url, False, f"Error: {str(error)[:50]}", checked_at=time.time())
+        if error is not None or status in RETRY_STATUS_CODES:
+            if attempt >= max_retries:
+                record_metric('urlcheck.errors')
+                if error is not None:
+                    reason = getattr(error, 'reason', error)
+                    return UrlCheckResult(url, False, f"URL Error: {str(reason)[:50]}")
+                return UrlCheckResult(url, False, f"HTTP {status}")
+            wait = _retry_after(headers)
+            if wait is None:
+                wait = URL_CHECK_BACKOFF_SECONDS * 2 ** attempt * (1 + random.random() / 2)
+            limiter.back_off(min(wait, URL_CHECK_MAX_BACKOFF))
+            record_metric('urlcheck.retries')
+            attempt += 1
+            continue
+
+        checked_at = time.time()
+        if status == 304 and previous is not None:
+            record_metric('urlcheck.not_modified')
+            return previous._replace(checked_at=checked_at, source='revalidated')
+        if status in HEAD_REFUSED_STATUS_CODES and method == 'HEAD':
+            method = 'GET'
+            continue
+        if status in REDIRECT_STATUS_CODES:
+            location = headers.get('Location')
+            if not location:
+                return UrlCheckResult(url, False, f"HTTP {status} without Location", current,
+                                      checked_at=checked_at)
+            target = urljoin(current, location)
+            if urlsplit(target).path in ('', '/'):
+                return UrlCheckResult(url, False, "Redirect to start page", target, checked_at=checked_at)
+            redirects += 1
+            if redirects > URL_CHECK_MAX_REDIRECTS:
+                return UrlCheckResult(url, False, "Too many redirects", target, checked_at=checked_at)
+            current = target
+            continue
+        is_valid = 200 <= status < 300
+        return UrlCheckResult(url, is_valid, "Valid" if is_valid else f"HTTP {status}", current,
+                              headers.get('ETag'), headers.get('Last-Modified'), checked_at)
+
+
+# =============================================================================
+# Persistent Validation Store (SQLite)
+# =============================================================================
+
+class UrlCheckCache:
+    """
+    On-disk store of URL check results, one row per URL.
+
+    Only conclusive results are stored (a status code other than 429/503, or
+    an invalid URL); network errors are checked again on the next run.
+    """
+
+    COLUMNS = ['url', 'is_valid', 'status', 'final_url', 'etag', 'last_modified', 'checked_at']
+
+    def __init__(self, path: str, ttl: float = URL_CHECK_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Written from the event loop thread of iter_check_urls
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode = WAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS url_checks (
+                url TEXT PRIMARY KEY,
+                is_valid INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                final_url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL NOT NULL
+            )""")
+        self._con.commit()
+
+    def lookup(self, urls: Iterable[str]) -> Dict[str, UrlCheckResult]:
+        """Stored results for ``urls`` (fresh and expired)."""
+        wanted = list(dict.fromkeys(u for u in urls if isinstance(u, str) and u))
+        found = {}
+        with self._lock:
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start:start + 500]
+                rows = self._con.execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM url_checks "
+                    f"WHERE url IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+                for row in rows:
+                    found[row[0]] = UrlCheckResult(row[0], bool(row[1]), *row[2:], source='cache')
+        return found
+
+    def is_fresh(self, result: UrlCheckResult, now: float = None) -> bool:
+        return (now or time.time()) - result.checked_at < self.ttl
+
+    def store(self, results: List[UrlCheckResult]) -> None:
+        rows = [(r.url, int(r.is_valid), r.status, r.final_url, r.etag, r.last_modified, r.checked_at)
+                for r in results if r.checked_at is not None]
+        if not rows:
+            return
+        with self._lock:
+            self._con.executemany(
+                f"INSERT OR REPLACE INTO url_checks ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNS))})", rows)
+            self._con.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Stored, valid and expired entries."""
+        with self._lock:
+            total, valid, expired = self._con.execute(
+                "SELECT COUNT(*), COALESCE(SUM(is_valid), 0), COALESCE(SUM(checked_at < ?), 0) FROM url_checks",
+                [time.time() - self.ttl]).fetchone()
+        return {'entries': total, 'valid': valid, 'expired': expired}
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+
+# =============================================================================
+# Streaming Validation
+# =============================================================================
+
+async def iter_check_urls_async(urls: Iterable[str],
+                                concurrency_per_host: int = URL_CHECK_CONCURRENCY_PER_HOST,
+                                min_interval: float = URL_CHECK_MIN_INTERVAL,
+                                max_connections: int = URL_CHECK_MAX_CONNECTIONS,
+                                timeout: float = URL_CHECK_TIMEOUT,
+                                max_retries: int = URL_CHECK_MAX_RETRIES,
+                                cache: UrlCheckCache = None) -> AsyncIterator[UrlCheckResult]:
+    """
+    Check URLs concurrently; yields a UrlCheckResult as each completes.
+
+    With ``cache``, fresh stored results are yielded first without a request,
+    expired ones are revalidated conditionally, and every conclusive network
+    result is written back.
+    """
+    urls = list(urls)
+    stored = cache.lookup(urls) if cache is not None else {}
+    now = time.time()
+    pending = []
+    for url in urls:
+        previous = stored.get(url)
+        if previous is not None and cache.is_fresh(previous, now):
+            record_metric('urlcheck.cache_hits')
+            yield previous
+        else:
+            pending.append((url, previous))
+    if cache is not None:
+        record_metric('urlcheck.cache_misses', len(pending))
+
+    limiters = {}
+    executor = ThreadPoolExecutor(max_workers=max_connections)
+    tasks = [asyncio.ensure_future(check_url(url, limiters, executor, concurrency_per_host,
+                                             min_interval, timeout, max_retries, previous))
+             for url, previous in pending]
+    checked = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            checked.append(result)
+            if cache is not None and len(checked) >= 100:
+                cache.store(checked)
+                checked = []
+            yield result
+    finally:
+        if cache is not None:
+            cache.store(checked)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_check_urls(urls: Iterable[str], **kwargs) -> Iterator[UrlCheckResult]:
+    """
+    Synchronous version of iter_check_urls_async().
+
+    The event loop runs in a background thread, so this also works inside
+    Jupyter (which already runs a loop).  Stopping the iteration early
+    cancels the outstanding checks.
+
+    Args:
+        urls: URLs to check
+        **kwargs: concurrency_per_host, min_interval, max_connections, timeout,
+                  max_retries, cache
+    """
+    results = queue.Queue()
+    stop = threading.Event()
+    done = object()
+
+    async def pump():
+        async for result in iter_check_urls_async(list(urls), **kwargs):
+            if stop.is_set():
+                break
+            results.put(result)
+
+    def run():
+        try:
+            asyncio.run(pump())
+        except BaseException as e:
+            results.put(e)
+        finally:
+            results.put(done)
+
+    thread = threading.Thread(target=run, name='url-check', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
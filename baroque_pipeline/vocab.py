@@ -0,0 +1,459 @@
+"""Subject vocabularies: ontology labels, Iconclass/Getty AAT subjects and GND persons."""
+
+import re
+import time
+import urllib.parse
+from functools import lru_cache
+
+import pandas as pd
+
+from .sparql import record_metric
+
+
+# =============================================================================
+# Automatic CTO/NFDI Ontology Resolution
+# =============================================================================
+# Dynamically resolve ontology codes to human-readable labels by parsing
+# the official OWL/TTL files from the GitHub repositories.
+#
+# Sources:
+#   - CTO (NFDI4Culture Ontology): https://github.com/ISE-FIZKarlsruhe/nfdi4culture
+#   - NFDIcore (Mid-level Ontology): https://github.com/ISE-FIZKarlsruhe/nfdicore
+#
+# This approach fetches the ontology files once and extracts rdfs:label
+# for all CTO_* and NFDI_* entities, avoiding hardcoded mappings.
+
+
+# =============================================================================
+# Ontology Sources (Raw TTL files from GitHub)
+# =============================================================================
+ONTOLOGY_SOURCES = {
+    'CTO': {
+        'url': 'https://raw.githubusercontent.com/ISE-FIZKarlsruhe/nfdi4culture/main/cto.ttl',
+        'namespace': 'https://nfdi4culture.de/ontology/',
+        'prefix_pattern': r'CTO_\d+',
+    },
+    'NFDIcore': {
+        'url': 'https://raw.githubusercontent.com/ISE-FIZKarlsruhe/nfdicore/main/nfdicore.ttl',
+        'namespace': 'https://nfdi.fiz-karlsruhe.de/ontology/',
+        'prefix_pattern': r'NFDI_\d+',
+    }
+}
+
+# Global cache for resolved ontology labels
+_ontology_cache = {}
+_ontology_loaded = False
+
+def _parse_ttl_labels(ttl_content: str, namespace: str, prefix_pattern: str) -> dict:
+    """
+    Parse a TTL file and extract rdfs:label for entities matching the prefix pattern.
+    Handles both full URI format and prefix notation (used in nfdicore.ttl).
+    
+    Args:
+        ttl_content: The TTL file content as a string
+        namespace: The namespace URI (e.g., 'https://nfdi4culture.de/ontology/')
+        prefix_pattern: Regex pattern for codes (e.g., 'CTO_\\d+')
+    
+    Returns:
+        dict mapping code -> label (e.g., 'CTO_0001009' -> 'has related person')
+    """
+    labels = {}
+    
+    # Pattern 1: Full URI format - <namespace/CODE> ... rdfs:label "Label"@en .
+    entity_pattern = re.compile(
+        rf'<{re.escape(namespace)}({prefix_pattern})>\s+[^;]*?'
+        rf'rdfs:label\s+"([^"]+)"(?:@en)?\s*[;.]',
+        re.MULTILINE | re.DOTALL
+    )
+    
+    for match in entity_pattern.finditer(ttl_content):
+        code = match.group(1)
+        label = match.group(2)
+        labels[code] = label
+    
+    # Pattern 2: Prefix notation - ontology:NFDI_XXXXXX ... rdfs:label "Label"@en
+    # First find the prefix definition
+    prefix_match = re.search(r'@prefix\s+(\w+):\s+<' + re.escape(namespace) + r'>\s*\.', ttl_content)
+    if prefix_match:
+        prefix_name = prefix_match.group(1)
+        # Now find entities using that prefix
+        prefix_entity_pattern = re.compile(
+            rf'{prefix_name}:({prefix_pattern})\s+[^;]*?'
+            rf'rdfs:label\s+"([^"]+)"(?:@en)?\s*[;.]',
+            re.MULTILINE | re.DOTALL
+        )
+        for match in prefix_entity_pattern.finditer(ttl_content):
+            code = match.group(1)
+            label = match.group(2)
+            if code not in labels:
+                labels[code] = label
+    
+    # Pattern 3: Multi-line format with entity definition on one line, label on another
+    lines = ttl_content.split('\n')
+    current_entity = None
+    
+    for line in lines:
+        # Check for full URI entity definition
+        entity_match = re.match(rf'^<{re.escape(namespace)}({prefix_pattern})>', line)
+        if entity_match:
+            current_entity = entity_match.group(1)
+        
+        # Check for prefix notation entity definition (e.g., "ontology:NFDI_0000004")
+        if prefix_match:
+            prefix_name = prefix_match.group(1)
+            prefix_entity_match = re.match(rf'^{prefix_name}:({prefix_pattern})\s', line)
+            if prefix_entity_match:
+                current_entity = prefix_entity_match.group(1)
+        
+        # Check for rdfs:label in the current context
+        if current_entity:
+            label_match = re.search(r'rdfs:label\s+"([^"]+)"(?:@en)?', line)
+            if label_match and current_entity not in labels:
+                labels[current_entity] = label_match.group(1)
+            
+            # Reset current entity on blank line or new entity definition
+            if line.strip() == '':
+                current_entity = None
+    
+    return labels
+
+def load_ontology_labels(force_reload: bool = False) -> dict:
+    """
+    Load and cache all ontology labels from CTO and NFDIcore.
+    
+    Args:
+        force_reload: If True, reload even if already cached
+    
+    Returns:
+        dict mapping code -> {'label': str, 'namespace': str, 'uri': str}
+    """
+    global _ontology_cache, _ontology_loaded
+    import requests
+    
+    if _ontology_loaded and not force_reload:
+        return _ontology_cache
+    
+    print("Loading ontology labels from GitHub...")
+    
+    for source_name, source_info in ONTOLOGY_SOURCES.items():
+        try:
+            print(f"   Fetching {source_name} from {source_info['url'][:50]}...")
+            response = requests.get(source_info['url'], timeout=30)
+            response.raise_for_status()
+            
+            labels = _parse_ttl_labels(
+                response.text,
+                source_info['namespace'],
+                source_info['prefix_pattern']
+            )
+            
+            for code, label in labels.items():
+                _ontology_cache[code] = {
+                    'label': label,
+                    'namespace': source_info['namespace'],
+                    'uri': f"{source_info['namespace']}{code}",
+                    'source': source_name
+                }
+            
+            print(f"   Loaded {len(labels)} labels from {source_name}")
+            
+        except Exception as e:
+            print(f"   Failed to load {source_name}: {e}")
+    
+    _ontology_loaded = True
+    print(f"\nTotal: {len(_ontology_cache)} ontology codes resolved")
+    return _ontology_cache
+
+@lru_cache(maxsize=500)
+def resolve_ontology_code(code: str) -> dict:
+    """
+    Resolve a CTO/NFDI ontology code to its label.
+    
+    Args:
+        code: Ontology code like 'CTO_0001009' or 'NFDI_0001006'
+    
+    Returns:
+        dict with 'code', 'label', 'uri', 'source', 'resolved' keys
+    """
+    result = {'code': code, 'label': code, 'uri': None, 'source': None, 'resolved': False}
+    
+    # Ensure ontology is loaded
+    if not _ontology_loaded:
+        load_ontology_labels()
+    
+    if code in _ontology_cache:
+        cached = _ontology_cache[code]
+        result['label'] = cached['label']
+        result['uri'] = cached['uri']
+        result['source'] = cached['source']
+        result['resolved'] = True
+    else:
+        # Construct URI even if label not found
+        if code.startswith('CTO_'):
+            result['uri'] = f"https://nfdi4culture.de/ontology/{code}"
+            result['source'] = 'CTO'
+        elif code.startswith('NFDI_'):
+            result['uri'] = f"https://nfdi.fiz-karlsruhe.de/ontology/{code}"
+            result['source'] = 'NFDIcore'
+    
+    return result
+
+def resolve_property_name(property_uri: str) -> str:
+    """
+    Convert a full property URI to a human-readable label.
+    
+    Args:
+        property_uri: Full URI like 'https://nfdi4culture.de/ontology/CTO_0001009'
+    
+    Returns:
+        Human-readable label like 'has related person (CTO_0001009)'
+    """
+    # Extract the code from the URI
+    code = property_uri.split('/')[-1] if '/' in property_uri else property_uri
+    
+    # Handle standard vocabularies
+    if 'schema.org' in property_uri:
+        return code
+    if 'w3.org' in property_uri:
+        return code.split('#')[-1] if '#' in code else code
+    
+    # Resolve CTO/NFDI codes
+    if code.startswith('CTO_') or code.startswith('NFDI_'):
+        resolved = resolve_ontology_code(code)
+        if resolved['resolved'] and resolved['label'] != code:
+            return f"{resolved['label']} ({code})"
+    
+    return code
+
+def get_ontology_reference_table() -> pd.DataFrame:
+    """
+    Get a DataFrame with all resolved ontology codes for reference.
+    
+    Returns:
+        DataFrame with columns: code, label, source, uri
+    """
+    if not _ontology_loaded:
+        load_ontology_labels()
+    
+    rows = []
+    for code, info in sorted(_ontology_cache.items()):
+        rows.append({
+            'code': code,
+            'label': info['label'],
+            'source': info['source'],
+            'uri': info['uri']
+        })
+    
+    return pd.DataFrame(rows)
+
+
+# =============================================================================
+# Subject Resolution via External SPARQL Endpoints
+# =============================================================================
+# Resolves subject URIs from CTO_0001026 ("has external classifier") to labels
+# using the official ICONCLASS and Getty AAT SPARQL endpoints.
+#
+# Integrates with the CTO/NFDI ontology resolver for consistent
+# property name resolution throughout the notebook.
+
+
+_iconclass_cache = {}
+
+def query_iconclass_sparql(notation):
+    """Query ICONCLASS SPARQL endpoint for a label, with retry on network errors."""
+    import requests
+    if notation in _iconclass_cache:
+        record_metric('iconclass.cache_hits')
+        return _iconclass_cache[notation]
+    record_metric('iconclass.cache_misses')
+    
+    notation_decoded = urllib.parse.unquote(notation)
+    endpoint = "https://iconclass.org/sparql"
+    query = f"""
+    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+    
+    SELECT ?label
+    WHERE {{
+      <https://iconclass.org/{notation_decoded}> skos:prefLabel ?label .
+      FILTER(LANG(?label) = "en")
+    }}
+    LIMIT 1
+    """.strip()
+    
+    for attempt in range(3):
+        try:
+            record_metric('iconclass.requests')
+            resp = requests.get(
+                endpoint,
+                params={'query': query, 'format': 'json'},
+                headers={'Accept': 'application/sparql-results+json'},
+                timeout=15
+            )
+            record_metric('iconclass.bytes', len(resp.content))
+            if resp.ok:
+                data = resp.json()
+                bindings = data.get("results", {}).get("bindings", [])
+                if bindings:
+                    label = bindings[0].get("label", {}).get("value")
+                    _iconclass_cache[notation] = label
+                    return label
+                # Successful request but no bindings — cache None (not a transient error)
+                _iconclass_cache[notation] = None
+                return None
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, OSError) as e:
+            if attempt < 2:
+                record_metric('iconclass.retries')
+                time.sleep(2 ** attempt * 3)
+                continue
+        except Exception:
+            break
+    return None
+
+_getty_cache = {}
+
+def query_getty_sparql(aat_id):
+    """Query Getty AAT SPARQL endpoint for a label, with retry on network errors."""
+    import requests
+    if aat_id in _getty_cache:
+        record_metric('getty.cache_hits')
+        return _getty_cache[aat_id]
+    record_metric('getty.cache_misses')
+    
+    endpoint = "http://vocab.getty.edu/sparql"
+    query = f"""
+PREFIX gvp: <http://vocab.getty.edu/ontology#>
+PREFIX xl: <http://www.w3.org/2008/05/skos-xl#>
+PREFIX aat: <http://vocab.getty.edu/aat/>
+
+SELECT ?label
+WHERE {{
+  aat:{aat_id} gvp:prefLabelGVP/xl:literalForm ?label .
+}}
+LIMIT 1
+""".strip()
+    
+    for attempt in range(3):
+        try:
+            record_metric('getty.requests')
+            resp = requests.get(
+                endpoint,
+                params={'query': query, 'format': 'json'},
+                headers={'Accept': 'application/sparql-results+json'},
+                timeout=15
+            )
+            record_metric('getty.bytes', len(resp.content))
+            if resp.ok and resp.text:
+                data = resp.json()
+                bindings = data.get("results", {}).get("bindings", [])
+                if bindings:
+                    label = bindings[0].get("label", {}).get("value")
+                    _getty_cache[aat_id] = label
+                    return label
+                # Successful request but no bindings — cache None
+                _getty_cache[aat_id] = None
+                return None
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, OSError) as e:
+            if attempt < 2:
+                record_metric('getty.retries')
+                time.sleep(2 ** attempt * 3)
+                continue
+        except Exception:
+            break
+    return None
+
+def resolve_subject_from_sparql(uri):
+    """
+    Resolve a subject URI to its label using external SPARQL endpoints.
+    
+    Handles subjects from CTO_0001026 ("has external classifier"):
+    - ICONCLASS: iconographic classification for art
+    - Getty AAT: Art & Architecture Thesaurus
+    
+    Args:
+        uri: Subject URI (e.g., 'https://iconclass.org/92D1521' or 'http://vocab.getty.edu/aat/300004792')
+    
+    Returns:
+        dict with 'uri', 'code', 'label', 'source', 'resolved' keys
+    """
+    code = uri.split('/')[-1]
+    
+    if 'iconclass.org' in uri:
+        label = query_iconclass_sparql(code)
+        source = 'ICONCLASS'
+    elif 'vocab.getty.edu' in uri:
+        label = query_getty_sparql(code)
+        source = 'Getty AAT'
+    else:
+        label = None
+        source = 'Unknown'
+    
+    return {
+        'uri': uri,
+        'code': code,
+        'label': label or f'[{code}]',
+        'source': source,
+        'resolved': label is not None
+    }
+
+
+# =============================================================================
+# GND Resolution (Optional - for additional research)
+# =============================================================================
+# NOTE: For painter/commissioner names, we now use the CbDD Graph (graphData.json)
+# which provides direct names without needing GND resolution.
+#
+# These GND functions are kept for optional research purposes:
+#   - Looking up additional person details
+#   - Resolving GND URIs found in other contexts
+#   - Cross-referencing with the German National Library
+
+
+@lru_cache(maxsize=1000)
+def resolve_gnd_uri(gnd_uri: str) -> dict:
+    """
+    Resolve a GND URI to its preferred name using lobid.org API.
+    
+    NOTE: For painter/commissioner names, prefer using the CbDD graph
+    via enrich_painting_from_graph() which is faster and more reliable.
+    
+    Args:
+        gnd_uri: A GND URI like 'https://d-nb.info/gnd/118636960'
+        
+    Returns:
+        dict with 'name', 'type', 'uri', 'resolved' keys
+    """
+    import requests
+    result = {'uri': gnd_uri, 'name': None, 'type': None, 'resolved': False}
+    
+    if not gnd_uri or not isinstance(gnd_uri, str):
+        return result
+    
+    try:
+        gnd_id = gnd_uri.split('/')[-1].strip()
+        if not gnd_id or len(gnd_id) < 3:
+            return result
+        
+        record_metric('gnd.requests')
+        response = requests.get(
+            f'https://lobid.org/gnd/{gnd_id}.json',
+            headers={'Accept': 'application/json'},
+            timeout=10
+        )
+        record_metric('gnd.bytes', len(response.content))
+        
+        if response.ok:
+            data = response.json()
+            result['name'] = data.get('preferredName')
+            type_val = data.get('type', [])
+            if isinstance(type_val, list) and type_val:
+                result['type'] = type_val[0]
+            elif isinstance(type_val, str):
+                result['type'] = type_val
+            else:
+                result['type'] = 'Unknown'
+            result['resolved'] = result['name'] is not None
+            
+    except Exception as e:
+        pass
+    
+    return result
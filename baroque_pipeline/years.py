@@ -0,0 +1,164 @@
+"""German free-text dating ("um 1732-1742", "2. Hälfte 17. Jh.") parsed into year ranges."""
+
+import re
+from typing import Optional, Tuple
+
+import pyarrow as pa
+
+
+# =============================================================================
+# German Year Parsing
+# =============================================================================
+# Handles formats like:
+#   - "1732" → (1732, 1732, False)
+#   - "1732-1742" → (1732, 1742, False)
+#   - "um 1732" / "ca. 1579" → (1732, 1732, True)
+#   - "um 1732-1742" → (1732, 1742, True)
+#   - "17. Jh" / "17. Jahrhundert" → (1600, 1699, False)
+#   - "2. Hälfte 17. Jahrhundert" → (1650, 1699, False)
+#   - "1. Hälfte 18. Jh." → (1700, 1749, False)
+#   - "Anfang 18. Jh." → (1700, 1730, True)
+#   - "Ende 17. Jh." → (1670, 1699, True)
+#   - "Mitte 18. Jahrhundert" → (1740, 1760, True)
+#   - "vor 1750" → (None, 1750, True)
+#   - "nach 1700" → (1700, None, True)
+#   - "bis 1716" → (None, 1716, False)
+#
+# The DuckDB notebook (parse_year UDF) and the partitioned Parquet dataset
+# (parquet.painting_decade) both derive century and decade from
+# parse_year_record(), so a painting falls into the same decade everywhere.
+
+
+def parse_german_year_details(year_str: Optional[str]) -> Tuple[Optional[int], Optional[int], bool, bool, Optional[str]]:
+    """
+    Parse German year strings into structured data.
+    
+    Returns:
+        (year_start, year_end, is_approximate, is_parsed, precision)
+        - year_start: Earliest possible year (or None)
+        - year_end: Latest possible year (or None)
+        - is_approximate: True if "um", "ca.", "circa", etc.
+        - is_parsed: True if successfully parsed, False if unparseable
+        - precision: 'year', 'range', 'century', 'half_century', 'part_century',
+                     'before', 'after', 'until' (None if unparseable)
+    """
+    if year_str is None or str(year_str).strip() == '':
+        return (None, None, False, False, None)
+    
+    text = str(year_str).strip().lower()
+    
+    # Track approximation markers
+    is_approx = False
+    approx_markers = ['um ', 'ca. ', 'ca ', 'circa ', 'etwa ', 'wohl ', 'vermutlich ']
+    for marker in approx_markers:
+        if marker in text:
+            is_approx = True
+            text = text.replace(marker, '')
+    
+    # Remove common noise
+    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
+    text = text.replace('jhd', 'jh').replace('jahrhundert', 'jh')
+    
+    # Pattern 1: Simple year "1732"
+    match = re.search(r'^(\d{4})$', text.strip())
+    if match:
+        year = int(match.group(1))
+        return (year, year, is_approx, True, 'year')
+    
+    # Pattern 2: Year range "1732-1742" or "1732–1742" or "1732/1742"
+    match = re.search(r'(\d{4})\s*[-–/]\s*(\d{4})', text)
+    if match:
+        return (int(match.group(1)), int(match.group(2)), is_approx, True, 'range')
+    
+    # Pattern 3: Century "17. jh" or "17.jh."
+    match = re.search(r'(\d{1,2})\.?\s*jh', text)
+    if match:
+        century = int(match.group(1))
+        base_year = (century - 1) * 100
+        
+        # Check for half-century modifiers
+        if '2. hälfte' in text or 'zweite hälfte' in text:
+            return (base_year + 50, base_year + 99, is_approx, True, 'half_century')
+        elif '1. hälfte' in text or 'erste hälfte' in text:
+            return (base_year, base_year + 49, is_approx, True, 'half_century')
+        elif 'anfang' in text or 'beginn' in text or 'früh' in text:
+            return (base_year, base_year + 30, True, True, 'part_century')
+        elif 'ende' in text or 'spät' in text:
+            return (base_year + 70, base_year + 99, True, True, 'part_century')
+        elif 'mitte' in text:
+            return (base_year + 40, base_year + 60, True, True, 'part_century')
+        else:
+            return (base_year, base_year + 99, is_approx, True, 'century')
+    
+    # Pattern 4: "vor 1750" (before)
+    match = re.search(r'vor\s+(\d{4})', text)
+    if match:
+        return (None, int(match.group(1)), True, True, 'before')
+    
+    # Pattern 5: "nach 1700" (after) or "ab 1700"
+    match = re.search(r'(?:nach|ab)\s+(\d{4})', text)
+    if match:
+        return (int(match.group(1)), None, True, True, 'after')
+    
+    # Pattern 6: "bis 1716" (until)
+    match = re.search(r'bis\s+(\d{4})', text)
+    if match:
+        return (None, int(match.group(1)), is_approx, True, 'until')
+    
+    # Pattern 7: Extract first 4-digit year as fallback
+    match = re.search(r'(\d{4})', text)
+    if match:
+        year = int(match.group(1))
+        # Check if there's a second year
+        all_years = re.findall(r'(\d{4})', text)
+        if len(all_years) >= 2:
+            years = [int(y) for y in all_years]
+            return (min(years), max(years), is_approx, True, 'range')
+        return (year, year, is_approx, True, 'year')
+    
+    # Unparseable
+    return (None, None, False, False, None)
+
+
+def parse_german_year(year_str: Optional[str]) -> Tuple[Optional[int], Optional[int], bool, bool]:
+    """(year_start, year_end, is_approximate, is_parsed), see parse_german_year_details()."""
+    return parse_german_year_details(year_str)[:4]
+
+
+def parse_year_record(year_str: Optional[str]) -> tuple:
+    """parse_german_year_details() plus century (1-based) and decade of the earliest year."""
+    start, end, approx, parsed, precision = parse_german_year_details(year_str)
+    reference = start if start is not None else end
+    century = reference // 100 + 1 if reference is not None else None
+    decade = reference // 10 * 10 if reference is not None else None
+    return (start, end, approx, parsed, precision, century, decade)
+
+
+# =============================================================================
+# DuckDB Arrow UDF
+# =============================================================================
+# The DuckDB notebook registers parse_year_arrow() as parse_year(year) ->
+# STRUCT(...): one call per column batch, each distinct string parsed once.
+# Fields in the order of parse_year_record().
+
+YEAR_STRUCT_FIELDS = {
+    'year_start': 'INTEGER',
+    'year_end': 'INTEGER',
+    'is_approximate': 'BOOLEAN',
+    'is_parsed': 'BOOLEAN',
+    'precision': 'VARCHAR',
+    'century': 'INTEGER',
+    'decade': 'INTEGER',
+}
+YEAR_STRUCT_ARROW_TYPES = {'INTEGER': pa.int32(), 'BOOLEAN': pa.bool_(), 'VARCHAR': pa.string()}
+
+
+def parse_year_arrow(years: pa.Array) -> pa.StructArray:
+    """Arrow UDF: parse a batch of year strings, each distinct value once."""
+    values = years.to_pylist()
+    parsed = {value: parse_year_record(value) for value in set(values)}
+    records = [parsed[value] for value in values]
+    return pa.StructArray.from_arrays(
+        [pa.array([r[i] for r in records], YEAR_STRUCT_ARROW_TYPES[sql_type])
+         for i, sql_type in enumerate(YEAR_STRUCT_FIELDS.values())],
+        names=list(YEAR_STRUCT_FIELDS))
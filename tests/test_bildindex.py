@@ -0,0 +1,38 @@
+"""GND overlaps between CbDD and Bildindex (baroque_pipeline.bildindex)."""
+
+import pandas as pd
+
+from baroque_pipeline.bildindex import _gnd_overlaps_loop, compute_gnd_overlaps
+
+GND = 'https://d-nb.info/gnd/'
+
+
+def _fixture():
+    paintings = pd.DataFrame({
+        'nfdi_uri': ['n1', 'n2', 'n3', 'n4'],
+        # list values, legacy pipe-joined strings, a repeated GND and missing values
+        'locationGnds': [[f'{GND}b1'], f'{GND}b1 | {GND}b2', None, [f'{GND}b2', f'{GND}b2']],
+        'creatorGnds': [f'{GND}p1', [f'{GND}p1', f'{GND}p2'], [], None],
+    })
+    bi_buildings = pd.DataFrame({'bildindex_uri': ['i1', 'i2', 'i3'],
+                                 'building_gnd': [f'{GND}b1', f'{GND}b1', f'{GND}b3']})
+    bi_painters = pd.DataFrame({'bildindex_uri': ['i1', 'i4'], 'painter_gnd': [f'{GND}p2', f'{GND}p3']})
+    shared_location = [f'{GND}b1', f'{GND}b2', f'{GND}b3']
+    shared_creator = [f'{GND}p1', f'{GND}p2', f'{GND}p3']
+    return paintings, bi_buildings, bi_painters, shared_location, shared_creator
+
+
+def test_vectorized_overlaps_equal_loop():
+    args = _fixture()
+    columns = ['gnd_uri', 'gnd_type', 'cbdd_count', 'bildindex_count']
+    vectorized = compute_gnd_overlaps(*args)
+    loop = _gnd_overlaps_loop(*args)
+    pd.testing.assert_frame_equal(vectorized[columns], loop[columns])
+    assert dict(zip(vectorized['gnd_uri'], vectorized['cbdd_count'])) == {
+        f'{GND}b1': 2, f'{GND}b2': 2, f'{GND}b3': 0, f'{GND}p1': 2, f'{GND}p2': 1, f'{GND}p3': 0}
+
+
+def test_overlap_painting_uris():
+    overlaps = compute_gnd_overlaps(*_fixture()).set_index('gnd_uri')
+    assert overlaps.loc[f'{GND}b2', 'cbdd_painting_uris'] == ['n2', 'n4']
+    assert overlaps.loc[f'{GND}p3', 'cbdd_painting_uris'] == []
@@ -0,0 +1,45 @@
+"""Incremental export (baroque_pipeline.incremental) against existing base files."""
+
+import pandas as pd
+import pytest
+
+from baroque_pipeline import incremental, parquet
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(parquet, 'PARQUET_OUTPUT_DIR', str(tmp_path))
+    return tmp_path
+
+
+def _paintings(painters):
+    return pd.DataFrame({
+        'nfdi_uri': ['n1', 'n2', 'n3'],
+        'label': ['Apoll', 'Spes', 'Die vier Erdteile'],
+        'painters': painters,
+        'subjects': [None, None, None],
+    })
+
+
+def test_upsert_onto_legacy_base_file(output_dir):
+    # Base file from before the list columns: pipe-joined VARCHAR values
+    legacy = _paintings(['Tiepolo, Giovanni Battista | Tiepolo, Giovanni Domenico', 'Zick, Johann', None])
+    legacy.to_parquet(parquet.get_parquet_path('paintings'), index=False)
+
+    new = _paintings([['Tiepolo, Giovanni Battista', 'Tiepolo, Giovanni Domenico'], ['Zick, Johann'], None])
+    new.loc[2, 'label'] = 'Die vier Erdteile (Treppenhaus)'
+    new = pd.concat([new, _paintings([['Asam, Cosmas Damian'], None, None]).iloc[[0]].assign(nfdi_uri='n4')],
+                    ignore_index=True)
+
+    log = incremental.apply_upsert({'paintings': new}, run_id='R1', verbose=False)
+
+    # Only the real changes, not every row with a list value
+    assert sorted(zip(log['op'], log['key'])) == [('insert', 'n4'), ('update', 'n3')]
+    current = parquet.read_current_table('paintings').set_index('nfdi_uri')
+    assert list(current.loc['n1', 'painters']) == ['Tiepolo, Giovanni Battista', 'Tiepolo, Giovanni Domenico']
+    assert current.loc['n3', 'label'] == 'Die vier Erdteile (Treppenhaus)'
+
+    incremental.compact_table('paintings')
+    compacted = pd.read_parquet(parquet.get_parquet_path('paintings')).set_index('nfdi_uri')
+    assert list(compacted.loc['n2', 'painters']) == ['Zick, Johann']
+    assert len(compacted) == 4
@@ -0,0 +1,41 @@
+"""Result cache of baroque_pipeline.queries.QueryRegistry."""
+
+import duckdb
+
+from baroque_pipeline.queries import QueryRegistry
+
+
+def _registry(tmp_path):
+    con = duckdb.connect(str(tmp_path / 'test.duckdb'))
+    con.execute("CREATE TABLE paintings AS SELECT 1 AS n")
+    return con, QueryRegistry(con, {'total': "SELECT sum(n) FROM paintings",
+                                    'temp_total': "SELECT sum(n) FROM painter_selection"})
+
+
+def test_no_stale_results_inside_transaction(tmp_path):
+    con, queries = _registry(tmp_path)
+    assert queries.fetchone('total') == (1,)
+    con.begin()
+    con.execute("INSERT INTO paintings VALUES (2)")
+    assert queries.fetchone('total') == (3,)
+    con.execute("INSERT INTO paintings VALUES (4)")
+    assert queries.fetchone('total') == (7,)
+    con.rollback()
+    assert queries.fetchone('total') == (1,)
+
+
+def test_no_stale_results_from_temp_tables(tmp_path):
+    con, queries = _registry(tmp_path)
+    con.execute("CREATE TEMP TABLE painter_selection AS SELECT 1 AS n")
+    assert queries.fetchone('temp_total') == (1,)
+    con.execute("INSERT INTO painter_selection VALUES (2)")
+    assert queries.fetchone('temp_total') == (3,)
+
+
+def test_cache_hit_after_commit(tmp_path):
+    con, queries = _registry(tmp_path)
+    queries.fetchone('total')
+    queries.fetchone('total')
+    con.execute("INSERT INTO paintings VALUES (2)")
+    assert queries.fetchone('total') == (3,)
+    assert queries.stats().set_index('query').loc['total', 'hits'] == 1
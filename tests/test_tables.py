@@ -0,0 +1,38 @@
+"""Table extraction from the CbDD graph (baroque_pipeline.tables)."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from baroque_pipeline import graph
+from baroque_pipeline.graph import enrich_dataframe_from_graph
+from baroque_pipeline.tables import PARALLEL_EXTRACTORS, extract_tables_parallel
+
+GRAPH_FIXTURE = os.path.join(os.path.dirname(__file__), 'data', 'graphData.json')
+
+
+@pytest.fixture
+def enriched(monkeypatch):
+    monkeypatch.setattr(graph, 'CBDD_GRAPH_PATH', GRAPH_FIXTURE)
+    monkeypatch.setattr(graph, '_cbdd_graph_loaded', False)
+    graph.load_cbdd_graph(force_reload=True)
+    df = pd.DataFrame({
+        'painting': ['https://www.deckenmalerei.eu/p1', 'x2', 'x3'],
+        'label': ['Apoll', 'Die vier Erdteile', 'Nicht im Graphen'],
+        'parentLabel': ['Treppenhaus', None, None],
+    })
+    df, person_edges = enrich_dataframe_from_graph(df, return_person_edges=True)
+    df['subjects_resolved'] = [[{'uri': 'https://iconclass.org/11D', 'label': 'Christ', 'source': 'ICONCLASS'}],
+                               [], []]
+    return df, person_edges
+
+
+def test_parallel_extraction_equals_serial(enriched):
+    df, person_edges = enriched
+    serial = extract_tables_parallel(df, person_edges, max_workers=1, verbose=False)
+    parallel = extract_tables_parallel(df, person_edges, max_workers=3, verbose=False)
+    assert list(serial) == list(PARALLEL_EXTRACTORS)
+    for name in serial:
+        assert parallel[name].equals(serial[name]), name
+    assert serial['painting_persons'].num_rows > 0
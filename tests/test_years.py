@@ -0,0 +1,65 @@
+"""German year parsing (baroque_pipeline.years) and its DuckDB Arrow UDF."""
+
+import duckdb
+import pytest
+
+from baroque_pipeline.years import YEAR_STRUCT_FIELDS, parse_german_year, parse_year_arrow, parse_year_record
+
+YEARS = [
+    '1732', '1732-1742', 'um 1732-1742', 'ca. 1579', '17. Jh', '2. Hälfte 17. Jahrhundert',
+    '1. Hälfte 18. Jh.', 'Anfang 18. Jh.', 'Ende 17. Jh.', 'Mitte 18. Jahrhundert', 'vor 1750',
+    'nach 1700', 'bis 1716', 'unbekannt', '', None, '1732',
+]
+
+# The row-by-row UDFs the DuckDB notebook used before parse_year()
+LEGACY_YEAR_UDFS = {
+    'parse_year_start': (0, 'INTEGER'),
+    'parse_year_end': (1, 'INTEGER'),
+    'parse_year_approx': (2, 'BOOLEAN'),
+    'parse_year_success': (3, 'BOOLEAN'),
+}
+
+
+def legacy_year_udf(index: int):
+    return lambda x: parse_german_year(x)[index]
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.create_function('parse_year', parse_year_arrow, ['VARCHAR'], duckdb.struct_type(YEAR_STRUCT_FIELDS),
+                        type='arrow', null_handling='special')
+    for name, (index, sql_type) in LEGACY_YEAR_UDFS.items():
+        con.create_function(name, legacy_year_udf(index), ['VARCHAR'], sql_type, null_handling='special')
+    con.execute("CREATE TABLE paintings (year VARCHAR)")
+    con.executemany("INSERT INTO paintings VALUES (?)", [[year] for year in YEARS])
+    yield con
+    con.close()
+
+
+def test_arrow_udf_equals_legacy_udfs(con):
+    struct_rows = con.execute("""
+        SELECT year, y.year_start, y.year_end, y.is_approximate, y.is_parsed
+        FROM (SELECT year, parse_year(year) AS y FROM paintings)
+        ORDER BY year NULLS FIRST
+    """).fetchall()
+    legacy_rows = con.execute("""
+        SELECT year, parse_year_start(year), parse_year_end(year), parse_year_approx(year), parse_year_success(year)
+        FROM paintings
+        ORDER BY year NULLS FIRST
+    """).fetchall()
+    assert struct_rows == legacy_rows
+    assert len(struct_rows) == len(YEARS)
+
+
+def test_arrow_udf_equals_parse_year_record(con):
+    rows = con.execute("SELECT year, parse_year(year) FROM paintings").fetchall()
+    for year, parsed in rows:
+        assert tuple(parsed.values()) == parse_year_record(year), year
+
+
+def test_parse_year_record_examples():
+    assert parse_year_record('um 1732-1742') == (1732, 1742, True, True, 'range', 18, 1730)
+    assert parse_year_record('vor 1750')[:2] == (None, 1750)
+    assert parse_year_record('vor 1750')[5:] == (18, 1750)
+    assert parse_year_record(None) == (None, None, False, False, None, None, None)